@@ -0,0 +1,193 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on the euclidean distances
+computed by function *onnx_cdist* with operator *Scan*
+or with a matrix multiplication (``optim='gemm'``).
+"""
+# License: MIT
+
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import rand
+from numpy.testing import assert_almost_equal
+import matplotlib.pyplot as plt
+import pandas
+from scipy.spatial.distance import cdist
+from onnx.defs import onnx_opset_version
+from skl2onnx.algebra.complex_functions import onnx_cdist
+from skl2onnx.algebra.onnx_ops import OnnxIdentity
+from skl2onnx.common.data_types import FloatTensorType
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fcts_cdist(Y, metric):
+    "onnx_cdist with both implementations."
+    opv = onnx_opset_version()
+    res = {}
+    for optim in ['scan', 'gemm']:
+        node = OnnxIdentity(
+            onnx_cdist('X', Y, metric=metric, dtype=np.float32,
+                       op_version=opv, optim=optim),
+            output_names=['dist'], op_version=opv)
+        onx = node.to_onnx(
+            inputs=[('X', FloatTensorType([None, Y.shape[1]]))],
+            outputs=[('dist', FloatTensorType())],
+            dtype=np.float32, target_opset=opv)
+        sess = InferenceSession(onx.SerializeToString())
+
+        def predict_onnxrt(X, sess=sess):
+            return sess.run(None, {'X': X})[0]
+
+        res[optim] = predict_onnxrt
+    return res
+
+
+##############################
+# Benchmarks
+##############################
+
+def allow_configuration(**kwargs):
+    return True
+
+
+def bench(n_obs, n_stored, n_features, metrics, repeat=10, verbose=False):
+    res = []
+    for nfeat in n_features:
+        for m in n_stored:
+            Y = rand(m, nfeat).astype(np.float32)
+            for metric in metrics:
+                fcts = fcts_cdist(Y, metric)
+
+                for n in n_obs:
+                    if not allow_configuration(n=n, m=m, nfeat=nfeat):
+                        continue
+
+                    obs = dict(n_obs=n, n_stored=m, nfeat=nfeat,
+                               metric=metric)
+
+                    # creates different inputs to avoid caching in any ways
+                    Xs = []
+                    for r in range(repeat):
+                        Xs.append(rand(n, nfeat).astype(np.float32))
+
+                    # measures the baseline
+                    st = time()
+                    repeated = 0
+                    for X in Xs:
+                        p1 = fcts['scan'](X)
+                        repeated += 1
+                        if time() - st >= 1:
+                            break  # stops if longer than a second
+                    end = time()
+                    obs["time_scan"] = (end - st) / repeated
+
+                    # measures the new implementation
+                    st = time()
+                    r2 = 0
+                    for X in Xs:
+                        p2 = fcts['gemm'](X)
+                        r2 += 1
+                        if r2 >= repeated:
+                            break
+                    end = time()
+                    obs["time_gemm"] = (end - st) / repeated
+                    res.append(obs)
+                    if verbose:
+                        print("bench", len(res), ":", obs)
+
+                    # checks that both produce the same outputs
+                    if n * m <= 1000000:
+                        exp = cdist(X, Y, metric=metric)
+                        assert_almost_equal(exp, p1, decimal=3)
+                        assert_almost_equal(exp, p2, decimal=3)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    nrows = max(len(set(df.metric)) * len(set(df.n_stored)), 2)
+    ncols = max(len(set(df.nfeat)), 2)
+    fig, ax = plt.subplots(nrows, ncols,
+                           figsize=(ncols * 4, nrows * 4))
+    row = 0
+    for n_stored in sorted(set(df.n_stored)):
+        for metric in sorted(set(df.metric)):
+            pos = 0
+            for nfeat in sorted(set(df.nfeat)):
+                a = ax[row, pos]
+                if row == ax.shape[0] - 1:
+                    a.set_xlabel("N observations", fontsize='x-small')
+                if pos == 0:
+                    a.set_ylabel("Time (s) n_stored={}\nmetric={}".format(
+                                 n_stored, metric), fontsize='x-small')
+
+                color = 'b'
+                subset = df[(df.metric == metric) &
+                            (df.n_stored == n_stored) & (df.nfeat == nfeat)]
+                if subset.shape[0] == 0:
+                    continue
+                subset = subset.sort_values("n_obs")
+                if verbose:
+                    print(subset)
+                subset.plot(x="n_obs", y="time_scan", label="scan", ax=a,
+                            logx=True, logy=True, c=color, style='--')
+                subset.plot(x="n_obs", y="time_gemm", label="gemm", ax=a,
+                            logx=True, logy=True, c=color)
+
+                a.legend(loc=0, fontsize='x-small')
+                if row == 0:
+                    a.set_title("nfeat={}".format(nfeat), fontsize='x-small')
+                pos += 1
+            row += 1
+
+    plt.suptitle("Benchmark for onnx_cdist scan/gemm", fontsize=16)
+
+
+def run_bench(repeat=10, verbose=False):
+    n_obs = [1, 10, 100, 1000]
+    n_stored = [1000, 10000, 100000]
+    n_features = [4, 20, 100]
+    metrics = ['sqeuclidean', 'euclidean']
+
+    start = time()
+    results = bench(n_obs, n_stored, n_features, metrics,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_cdist.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_cdist.png")
+    df.to_csv("bench_plot_onnxruntime_cdist.csv", index=False)
+    plt.show()
@@ -0,0 +1,190 @@
+# coding: utf-8
+"""
+Benchmark of onnxruntime on the nearest neighbours retrieved
+by function *onnx_nearest_neighbors_indices*, exact or approximated
+with an inverted file index (options ``n_lists``, ``n_probe``).
+It reports the latency and the recall@k of the approximation.
+"""
+# License: MIT
+
+from time import perf_counter as time
+
+import numpy as np
+from numpy.random import RandomState
+import matplotlib.pyplot as plt
+import pandas
+from sklearn.neighbors import NearestNeighbors
+from onnx.defs import onnx_opset_version
+from skl2onnx.algebra.onnx_ops import OnnxIdentity
+from skl2onnx.common.data_types import FloatTensorType, Int64TensorType
+from skl2onnx.operator_converters.nearest_neighbours import (
+    onnx_nearest_neighbors_indices
+)
+from onnxruntime import InferenceSession
+
+
+##############################
+# Implementations to benchmark.
+##############################
+
+def fct_knn(Y, k, **kwargs):
+    "Returns a function computing the indices of the nearest neighbours."
+    opv = onnx_opset_version()
+    node = OnnxIdentity(
+        onnx_nearest_neighbors_indices(
+            'X', Y, k, metric='euclidean', dtype=np.float32,
+            op_version=opv, **kwargs),
+        output_names=['ind'], op_version=opv)
+    onx = node.to_onnx(
+        inputs=[('X', FloatTensorType([None, Y.shape[1]]))],
+        outputs=[('ind', Int64TensorType())],
+        dtype=np.float32, target_opset=opv)
+    sess = InferenceSession(onx.SerializeToString())
+
+    def predict_onnxrt(X, sess=sess):
+        return sess.run(None, {'X': X})[0]
+
+    return predict_onnxrt
+
+
+def recall(exp, got):
+    "Ratio of the true neighbours found by the approximation."
+    found = [len(set(e) & set(g)) for e, g in zip(exp, got)]
+    return sum(found) * 1. / exp.size
+
+
+def make_data(n, nfeat, rs):
+    "Gaussian clusters, the usual setting for an inverted file index."
+    centers = rs.randn(max(n // 1000, 10), nfeat) * 4
+    return (centers[rs.randint(0, centers.shape[0], n)] +
+            rs.randn(n, nfeat)).astype(np.float32)
+
+
+##############################
+# Benchmarks
+##############################
+
+def measure(fct, Xs, max_time=1):
+    st = time()
+    repeated = 0
+    for X in Xs:
+        fct(X)
+        repeated += 1
+        if time() - st >= max_time:
+            break  # stops if longer than a second
+    return (time() - st) / repeated
+
+
+def bench(n_obs, n_stored, n_features, n_lists, n_probes, k=5,
+          repeat=10, verbose=False):
+    res = []
+    rs = RandomState(0)
+    for nfeat in n_features:
+        for m in n_stored:
+            Y = make_data(m, nfeat, rs)
+            exact = fct_knn(Y, k)
+            nn = NearestNeighbors(n_neighbors=k).fit(Y)
+            for nl in n_lists:
+                fcts = {npr: fct_knn(Y, k, n_lists=nl, n_probe=npr)
+                        for npr in n_probes}
+
+                for n in n_obs:
+                    # creates different inputs to avoid caching in any ways
+                    Xs = [make_data(n, nfeat, rs) for r in range(repeat)]
+                    exp = nn.kneighbors(Xs[0], return_distance=False)
+                    time_exact = measure(exact, Xs)
+
+                    for npr, fct in fcts.items():
+                        obs = dict(n_obs=n, n_stored=m, nfeat=nfeat,
+                                   n_lists=nl, n_probe=npr,
+                                   time_exact=time_exact)
+                        obs["time_ivf"] = measure(fct, Xs)
+                        obs["recall"] = recall(exp, fct(Xs[0]))
+                        res.append(obs)
+                        if verbose:
+                            print("bench", len(res), ":", obs)
+    return res
+
+
+##############################
+# Plots.
+##############################
+
+def plot_results(df, verbose=False):
+    nrows = max(len(set(df.n_stored)), 2)
+    ncols = max(len(set(df.nfeat)), 2)
+    fig, ax = plt.subplots(nrows, ncols,
+                           figsize=(ncols * 4, nrows * 4))
+    row = 0
+    for n_stored in sorted(set(df.n_stored)):
+        pos = 0
+        for nfeat in sorted(set(df.nfeat)):
+            a = ax[row, pos]
+            if row == ax.shape[0] - 1:
+                a.set_xlabel("recall@k", fontsize='x-small')
+            if pos == 0:
+                a.set_ylabel("speedup n_stored={}".format(n_stored),
+                             fontsize='x-small')
+
+            subset = df[(df.n_stored == n_stored) & (df.nfeat == nfeat)]
+            if subset.shape[0] == 0:
+                continue
+            for (nl, n), sub in subset.groupby(["n_lists", "n_obs"]):
+                sub = sub.sort_values("n_probe")
+                if verbose:
+                    print(sub)
+                a.plot(sub.recall, sub.time_exact / sub.time_ivf, 'o-',
+                       label="n_lists={} n_obs={}".format(nl, n))
+
+            a.set_yscale('log')
+            a.legend(loc=0, fontsize='x-small')
+            if row == 0:
+                a.set_title("nfeat={}".format(nfeat), fontsize='x-small')
+            pos += 1
+        row += 1
+
+    plt.suptitle("Benchmark for approximate nearest neighbours",
+                 fontsize=16)
+
+
+def run_bench(repeat=10, verbose=False):
+    n_obs = [1, 100]
+    n_stored = [10000, 100000]
+    n_features = [4, 20]
+    n_lists = [100, 300]
+    n_probes = [1, 2, 4, 8, 16]
+
+    start = time()
+    results = bench(n_obs, n_stored, n_features, n_lists, n_probes,
+                    repeat=repeat, verbose=verbose)
+    end = time()
+
+    results_df = pandas.DataFrame(results)
+    print("Total time = %0.3f sec\n" % (end - start))
+
+    # plot the results
+    plot_results(results_df, verbose=verbose)
+    return results_df
+
+
+if __name__ == '__main__':
+    from datetime import datetime
+    import sklearn
+    import numpy
+    import onnx
+    import onnxruntime
+    import skl2onnx
+    df = pandas.DataFrame([
+        {"name": "date", "version": str(datetime.now())},
+        {"name": "numpy", "version": numpy.__version__},
+        {"name": "scikit-learn", "version": sklearn.__version__},
+        {"name": "onnx", "version": onnx.__version__},
+        {"name": "onnxruntime", "version": onnxruntime.__version__},
+        {"name": "skl2onnx", "version": skl2onnx.__version__},
+    ])
+    df.to_csv("bench_plot_onnxruntime_knn_ivf.time.csv", index=False)
+    print(df)
+    df = run_bench(verbose=True)
+    plt.savefig("bench_plot_onnxruntime_knn_ivf.png")
+    df.to_csv("bench_plot_onnxruntime_knn_ivf.csv", index=False)
+    plt.show()
@@ -16,6 +16,7 @@ __model_version__ = 0
 
 
 from .convert import convert_sklearn, to_onnx, wrap_as_onnx_mixin # noqa
+from .convert import reconvert_sklearn # noqa
 from ._supported_operators import update_registered_converter # noqa
 from ._parse import update_registered_parser # noqa
 
@@ -34,12 +35,11 @@ def supported_converters(from_sklearn=False):
         whose name is prefixed by ``'Sklearn'``
     :return: list of supported models as string
     """
-    from .common._registration import _converter_pool # noqa
-    # The two following lines populates the list of supported converters.
-    from . import shape_calculators # noqa
-    from . import operator_converters # noqa
+    from .common._registration import _converter_pool, _converter_modules
 
-    names = sorted(_converter_pool.keys())
+    # Converters implemented in this package are listed in a static
+    # manifest, they do not need to be imported.
+    names = sorted(set(_converter_pool) | set(_converter_modules))
     if from_sklearn:
         return [_[7:] for _ in names if _.startswith('Sklearn')]
     else:
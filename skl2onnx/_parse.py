@@ -17,22 +17,14 @@ except ImportError:
     class OutlierMixin:
         pass
 
-from sklearn.gaussian_process import GaussianProcessRegressor
-from sklearn.model_selection import GridSearchCV
-from sklearn.neighbors import NearestNeighbors
-from sklearn.mixture import GaussianMixture, BayesianGaussianMixture
-from sklearn.preprocessing import OneHotEncoder
 from sklearn.pipeline import Pipeline
-from sklearn.svm import LinearSVC, NuSVC, SVC
-try:
-    from sklearn.compose import ColumnTransformer
-except ImportError:
-    # ColumnTransformer was introduced in 0.20.
-    ColumnTransformer = None
 
 from ._supported_operators import (
     _get_sklearn_operator_name, cluster_list, outlier_list
 )
+from ._supported_operators import (
+    _LazyModelMap, _get_sklearn_class, _sklearn_classifier_names
+)
 from ._supported_operators import sklearn_classifier_list
 from .common._container import SklearnModelContainerNode
 from .common._topology import Topology
@@ -43,9 +35,12 @@ from .common.utils import get_column_indices
 from .common.utils_classifier import get_label_classes
 
 
-do_not_merge_columns = tuple(
-    filter(lambda op: op is not None,
-           [OneHotEncoder, ColumnTransformer]))
+def _get_sklearn_classes(*names):
+    # Only the classes already imported are returned,
+    # a model cannot be an instance of the others.
+    return tuple(
+        filter(lambda op: op is not None,
+               [_get_sklearn_class(name) for name in names]))
 
 
 def _fetch_input_slice(scope, inputs, column_indices):
@@ -102,7 +97,7 @@ def _parse_sklearn_simple_model(scope, model, inputs, custom_parsers=None):
 
     if (type(model) in sklearn_classifier_list
             or isinstance(model, ClassifierMixin)
-            or (isinstance(model, GridSearchCV)
+            or (isinstance(model, _get_sklearn_classes('GridSearchCV'))
                 and is_classifier(model))):
         # For classifiers, we may have two outputs, one for label and
         # the other one for probabilities of all classes. Notice that
@@ -134,7 +129,7 @@ def _parse_sklearn_simple_model(scope, model, inputs, custom_parsers=None):
             'scores', scope.tensor_type())
         this_operator.outputs.append(label_variable)
         this_operator.outputs.append(score_tensor_variable)
-    elif type(model) == NearestNeighbors:
+    elif type(model) == _get_sklearn_class('NearestNeighbors'):
         # For Nearest Neighbours, we have two outputs, one for nearest
         # neighbours' indices and the other one for distances
         index_variable = scope.declare_local_variable('index',
@@ -143,7 +138,8 @@ def _parse_sklearn_simple_model(scope, model, inputs, custom_parsers=None):
                                                          scope.tensor_type())
         this_operator.outputs.append(index_variable)
         this_operator.outputs.append(distance_variable)
-    elif type(model) in {GaussianMixture, BayesianGaussianMixture}:
+    elif type(model) in _get_sklearn_classes('GaussianMixture',
+                                             'BayesianGaussianMixture'):
         label_variable = scope.declare_local_variable('label',
                                                       Int64TensorType())
         prob_variable = scope.declare_local_variable('probabilities',
@@ -246,6 +242,8 @@ def _parse_sklearn_column_transformer(scope, model, inputs,
 
         merged_cols = False
         if len(transform_inputs) > 1:
+            do_not_merge_columns = _get_sklearn_classes(
+                'OneHotEncoder', 'ColumnTransformer')
             if isinstance(op, Pipeline):
                 if not isinstance(op.steps[0][1], do_not_merge_columns):
                     merged_cols = True
@@ -318,7 +316,8 @@ def _parse_sklearn_grid_search_cv(scope, model, inputs, custom_parsers=None):
 def _parse_sklearn_classifier(scope, model, inputs, custom_parsers=None):
     probability_tensor = _parse_sklearn_simple_model(
             scope, model, inputs, custom_parsers=custom_parsers)
-    if model.__class__ in [NuSVC, SVC] and not model.probability:
+    if (model.__class__ in _get_sklearn_classes('NuSVC', 'SVC')
+            and not model.probability):
         return probability_tensor
     options = scope.get_options(model, dict(zipmap=True))
     if not options['zipmap']:
@@ -482,19 +481,18 @@ def parse_sklearn_model(model, initial_types=None, target_opset=None,
 
 
 def build_sklearn_parsers_map():
-    map_parser = {
+    parsers = {
+        'GaussianProcessRegressor': _parse_sklearn_gaussian_process,
+        'GridSearchCV': _parse_sklearn_grid_search_cv,
+        'ColumnTransformer': _parse_sklearn_column_transformer,
+    }
+    for name in _sklearn_classifier_names:
+        if name not in ['LinearSVC']:
+            parsers[name] = _parse_sklearn_classifier
+    return _LazyModelMap(parsers, {
         pipeline.Pipeline: _parse_sklearn_pipeline,
         pipeline.FeatureUnion: _parse_sklearn_feature_union,
-        GaussianProcessRegressor: _parse_sklearn_gaussian_process,
-        GridSearchCV: _parse_sklearn_grid_search_cv,
-    }
-    if ColumnTransformer is not None:
-        map_parser[ColumnTransformer] = _parse_sklearn_column_transformer
-
-    for tmodel in sklearn_classifier_list:
-        if tmodel not in [LinearSVC]:
-            map_parser[tmodel] = _parse_sklearn_classifier
-    return map_parser
+    })
 
 
 def update_registered_parser(model, parser_fct):
@@ -4,152 +4,131 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import sys
 import warnings
 
-# Calibrated classifier CV
-from sklearn.calibration import CalibratedClassifierCV
-
-# Linear classifiers
-from sklearn.linear_model import (
-    LogisticRegression, LogisticRegressionCV,
-    PassiveAggressiveClassifier,
-    Perceptron, SGDClassifier,
-    RidgeClassifier, RidgeClassifierCV,
-)
-from sklearn.svm import LinearSVC, OneClassSVM
-
-# Linear regressors
-from sklearn.linear_model import (
-    ARDRegression,
-    BayesianRidge,
-    ElasticNet, ElasticNetCV,
-    HuberRegressor,
-    Lars, LarsCV,
-    Lasso, LassoCV,
-    LassoLars, LassoLarsCV,
-    LassoLarsIC,
-    LinearRegression,
-    MultiTaskElasticNet, MultiTaskElasticNetCV,
-    MultiTaskLasso, MultiTaskLassoCV,
-    OrthogonalMatchingPursuit, OrthogonalMatchingPursuitCV,
-    PassiveAggressiveRegressor,
-    RANSACRegressor,
-    Ridge, RidgeCV,
-    SGDRegressor,
-    TheilSenRegressor,
-)
-from sklearn.svm import LinearSVR
-from sklearn.discriminant_analysis import LinearDiscriminantAnalysis
-
-# Mixture
-from sklearn.mixture import (
-    GaussianMixture, BayesianGaussianMixture
-)
-
-# Multi-class
-from sklearn.multiclass import OneVsRestClassifier
-
-# Tree-based models
-from sklearn.ensemble import (
-    AdaBoostClassifier, AdaBoostRegressor,
-    BaggingClassifier, BaggingRegressor,
-    ExtraTreesClassifier, ExtraTreesRegressor,
-    GradientBoostingClassifier, GradientBoostingRegressor,
-    RandomForestClassifier, RandomForestRegressor,
-    VotingClassifier
-)
-try:
-    from sklearn.ensemble import VotingRegressor
-except ImportError:
-    # New in 0.21
-    VotingRegressor = None
-from sklearn.tree import (
-    DecisionTreeClassifier, DecisionTreeRegressor,
-    ExtraTreeClassifier, ExtraTreeRegressor
-)
-
-# Gaussian processes
-from sklearn.gaussian_process import GaussianProcessRegressor
-
-# GridSearchCV
-from sklearn.model_selection import GridSearchCV
+from .common._registration import register_converter, register_shape_calculator
 
-# Support vector machines
-from sklearn.svm import NuSVC, NuSVR, SVC, SVR
+# Public module of every scikit-learn model this package knows about.
+# Models are identified by the name of their class, a module is never
+# imported to build the maps below, a class is resolved the first time
+# a model is looked up (see _LazyModelMap) and the module which
+# defines it is already loaded at that time.
+_sklearn_modules = {
+    name: module for module, names in [
+        ('sklearn.calibration', ['CalibratedClassifierCV']),
+        ('sklearn.cluster', ['KMeans', 'MiniBatchKMeans']),
+        ('sklearn.compose', ['ColumnTransformer']),
+        ('sklearn.cross_decomposition', ['PLSRegression']),
+        ('sklearn.decomposition', ['PCA', 'IncrementalPCA',
+                                   'TruncatedSVD']),
+        ('sklearn.discriminant_analysis', ['LinearDiscriminantAnalysis']),
+        ('sklearn.ensemble', [
+            'AdaBoostClassifier', 'AdaBoostRegressor',
+            'BaggingClassifier', 'BaggingRegressor',
+            'ExtraTreesClassifier', 'ExtraTreesRegressor',
+            'GradientBoostingClassifier', 'GradientBoostingRegressor',
+            'RandomForestClassifier', 'RandomForestRegressor',
+            'VotingClassifier', 'VotingRegressor']),
+        ('sklearn.feature_extraction', ['DictVectorizer']),
+        ('sklearn.feature_extraction.text', [
+            'CountVectorizer', 'TfidfTransformer', 'TfidfVectorizer']),
+        ('sklearn.feature_selection', [
+            'GenericUnivariateSelect', 'RFE', 'RFECV',
+            'SelectFdr', 'SelectFpr', 'SelectFromModel',
+            'SelectFwe', 'SelectKBest', 'SelectPercentile',
+            'VarianceThreshold']),
+        ('sklearn.gaussian_process', ['GaussianProcessRegressor']),
+        ('sklearn.impute', ['SimpleImputer']),
+        ('sklearn.linear_model', [
+            'LogisticRegression', 'LogisticRegressionCV',
+            'PassiveAggressiveClassifier', 'Perceptron', 'SGDClassifier',
+            'RidgeClassifier', 'RidgeClassifierCV',
+            'ARDRegression', 'BayesianRidge',
+            'ElasticNet', 'ElasticNetCV', 'HuberRegressor',
+            'Lars', 'LarsCV', 'Lasso', 'LassoCV',
+            'LassoLars', 'LassoLarsCV', 'LassoLarsIC', 'LinearRegression',
+            'MultiTaskElasticNet', 'MultiTaskElasticNetCV',
+            'MultiTaskLasso', 'MultiTaskLassoCV',
+            'OrthogonalMatchingPursuit', 'OrthogonalMatchingPursuitCV',
+            'PassiveAggressiveRegressor', 'RANSACRegressor',
+            'Ridge', 'RidgeCV', 'SGDRegressor', 'TheilSenRegressor']),
+        ('sklearn.mixture', ['GaussianMixture', 'BayesianGaussianMixture']),
+        ('sklearn.model_selection', ['GridSearchCV']),
+        ('sklearn.multiclass', ['OneVsRestClassifier']),
+        ('sklearn.naive_bayes', ['BernoulliNB', 'ComplementNB',
+                                 'GaussianNB', 'MultinomialNB']),
+        ('sklearn.neighbors', ['KNeighborsClassifier',
+                               'KNeighborsRegressor', 'NearestNeighbors']),
+        ('sklearn.neural_network', ['MLPClassifier', 'MLPRegressor']),
+        ('sklearn.preprocessing', [
+            'Binarizer', 'FunctionTransformer', 'Imputer',
+            'KBinsDiscretizer', 'LabelBinarizer', 'LabelEncoder',
+            'MaxAbsScaler', 'MinMaxScaler', 'Normalizer', 'OneHotEncoder',
+            'OrdinalEncoder', 'PolynomialFeatures', 'RobustScaler',
+            'StandardScaler']),
+        ('sklearn.svm', ['LinearSVC', 'LinearSVR', 'NuSVC', 'NuSVR',
+                         'OneClassSVM', 'SVC', 'SVR']),
+        ('sklearn.tree', ['DecisionTreeClassifier', 'DecisionTreeRegressor',
+                          'ExtraTreeClassifier', 'ExtraTreeRegressor']),
+    ] for name in names
+}
+
+
+def _get_sklearn_class(name, load=False):
+    """
+    Returns the scikit-learn class *name* or None if it does not
+    exist in the installed version of scikit-learn. The module is
+    not imported if *load* is False and it was not imported yet,
+    no model of that class can exist in that case.
+    """
+    module = _sklearn_modules[name]
+    mod = sys.modules.get(module, None)
+    if mod is None:
+        if not load:
+            return None
+        try:
+            mod = __import__(module, fromlist=[name])
+        except ImportError:
+            return None
+    return getattr(mod, name, None)
+
+
+class _LazyModelMap(dict):
+    """
+    Dictionary whose keys are scikit-learn classes. It is built from
+    class names and a class is added the first time it is looked up.
+    Iterating only returns the classes already resolved,
+    see :func:`build_sklearn_operator_name_map` to get all of them.
+    """
 
-# K-nearest neighbors
-from sklearn.neighbors import KNeighborsClassifier
-from sklearn.neighbors import KNeighborsRegressor
-from sklearn.neighbors import NearestNeighbors
+    def __init__(self, values, explicit=None):
+        dict.__init__(self, explicit or {})
+        self._values = values
 
-# Naive Bayes
-from sklearn.naive_bayes import (
-    BernoulliNB,
-    GaussianNB,
-    MultinomialNB,
-)
-try:
-    from sklearn.naive_bayes import ComplementNB
-except ImportError:
-    # scikit-learn versions <= 0.19
-    ComplementNB = None
+    def _resolve(self, model_type):
+        name = getattr(model_type, '__name__', None)
+        if name not in self._values:
+            return False
+        if _get_sklearn_class(name) is not model_type:
+            return False
+        dict.__setitem__(self, model_type, self._values[name])
+        return True
 
-# Neural Networks
-from sklearn.neural_network import MLPClassifier, MLPRegressor
+    def __contains__(self, model_type):
+        return (dict.__contains__(self, model_type) or
+                self._resolve(model_type))
 
-# Clustering
-from sklearn.cluster import KMeans, MiniBatchKMeans
+    def __missing__(self, model_type):
+        if self._resolve(model_type):
+            return dict.__getitem__(self, model_type)
+        raise KeyError(model_type)
 
-# Operators for preprocessing and feature engineering
-from sklearn.cross_decomposition import PLSRegression
-from sklearn.decomposition import (
-    PCA, IncrementalPCA, TruncatedSVD,
-)
-from sklearn.feature_extraction import DictVectorizer
-from sklearn.feature_extraction.text import (
-    CountVectorizer, TfidfTransformer, TfidfVectorizer
-)
-from sklearn.feature_selection import (
-    GenericUnivariateSelect, RFE, RFECV,
-    SelectFdr, SelectFpr, SelectFromModel,
-    SelectFwe, SelectKBest, SelectPercentile,
-    VarianceThreshold
-)
-try:
-    # 0.20
-    from sklearn.impute import SimpleImputer
-except ImportError:
-    # 0.19
-    from sklearn.preprocessing import Imputer as SimpleImputer
-from sklearn.preprocessing import Binarizer
-try:
-    from sklearn.preprocessing import Imputer
-except ImportError:
-    # removed in 0.21
-    Imputer = None
-try:
-    from sklearn.preprocessing import KBinsDiscretizer
-except ImportError:
-    # not available in 0.19
-    KBinsDiscretizer = None
-    pass
-from sklearn.preprocessing import (
-    LabelBinarizer, LabelEncoder,
-    Normalizer, OneHotEncoder
-)
-try:
-    from sklearn.preprocessing import OrdinalEncoder
-except ImportError:
-    # Not available in scikit-learn < 0.20.0
-    OrdinalEncoder = None
-from sklearn.preprocessing import (
-    MinMaxScaler, MaxAbsScaler,
-    FunctionTransformer,
-    PolynomialFeatures, RobustScaler,
-    StandardScaler,
-)
+    def get(self, model_type, default=None):
+        if model_type in self:
+            return dict.__getitem__(self, model_type)
+        return default
 
-from .common._registration import register_converter, register_shape_calculator
 
 # In most cases, scikit-learn operator produces only one output.
 # However, each classifier has basically two outputs; one is the
@@ -158,104 +137,114 @@ from .common._registration import register_converter, register_shape_calculator
 # classifiers. In the parsing stage, we produce two outputs for objects
 # included in the following list and one output for everything not in
 # the list.
-sklearn_classifier_list = [
-    LogisticRegression, LogisticRegressionCV, Perceptron, SGDClassifier,
-    PassiveAggressiveClassifier,
-    LinearSVC, SVC, NuSVC,
-    GradientBoostingClassifier, RandomForestClassifier,
-    DecisionTreeClassifier, ExtraTreeClassifier, ExtraTreesClassifier,
-    BaggingClassifier,
-    BernoulliNB, ComplementNB, GaussianNB, MultinomialNB,
-    KNeighborsClassifier,
-    CalibratedClassifierCV, OneVsRestClassifier, VotingClassifier,
-    AdaBoostClassifier, MLPClassifier, LinearDiscriminantAnalysis
+_sklearn_classifier_names = [
+    'LogisticRegression', 'LogisticRegressionCV', 'Perceptron',
+    'SGDClassifier', 'PassiveAggressiveClassifier',
+    'LinearSVC', 'SVC', 'NuSVC',
+    'GradientBoostingClassifier', 'RandomForestClassifier',
+    'DecisionTreeClassifier', 'ExtraTreeClassifier', 'ExtraTreesClassifier',
+    'BaggingClassifier',
+    'BernoulliNB', 'ComplementNB', 'GaussianNB', 'MultinomialNB',
+    'KNeighborsClassifier',
+    'CalibratedClassifierCV', 'OneVsRestClassifier', 'VotingClassifier',
+    'AdaBoostClassifier', 'MLPClassifier', 'LinearDiscriminantAnalysis'
 ]
+sklearn_classifier_list = _LazyModelMap(
+    {name: True for name in _sklearn_classifier_names})
 
 # Clustering algorithms: produces two outputs, label and score for
 # each cluster in most cases.
-cluster_list = [KMeans, MiniBatchKMeans]
-
-# Classifiers with converters supporting decision_function().
-decision_function_classifiers = (
-    SGDClassifier,
-)
+cluster_list = _LazyModelMap({'KMeans': True, 'MiniBatchKMeans': True})
 
 # Outlier detection algorithms:
 # produces two outputs, label and scores
-outlier_list = [OneClassSVM]
+outlier_list = _LazyModelMap({'OneClassSVM': True})
 
 
 # Associate scikit-learn types with our operator names. If two
 # scikit-learn models share a single name, it means their are
 # equivalent in terms of conversion.
+_sklearn_operator_names = {k: "Sklearn" + k for k in [
+    'AdaBoostClassifier', 'AdaBoostRegressor',
+    'BaggingClassifier', 'BaggingRegressor',
+    'BernoulliNB', 'ComplementNB', 'GaussianNB', 'MultinomialNB',
+    'CalibratedClassifierCV',
+    'DecisionTreeClassifier', 'DecisionTreeRegressor',
+    'ExtraTreeClassifier', 'ExtraTreeRegressor',
+    'ExtraTreesClassifier', 'ExtraTreesRegressor',
+    'GradientBoostingClassifier', 'GradientBoostingRegressor',
+    'KNeighborsClassifier', 'KNeighborsRegressor', 'NearestNeighbors',
+    'LinearSVC', 'LinearSVR', 'SVC', 'SVR',
+    'RANSACRegressor',
+    'MLPClassifier', 'MLPRegressor',
+    'OneVsRestClassifier',
+    'RandomForestClassifier', 'RandomForestRegressor',
+    'SGDClassifier',
+    'VotingClassifier', 'VotingRegressor',
+    'KMeans', 'MiniBatchKMeans',
+    'PCA', 'TruncatedSVD', 'IncrementalPCA',
+    'Binarizer', 'MinMaxScaler', 'MaxAbsScaler', 'Normalizer',
+    'CountVectorizer', 'TfidfVectorizer', 'TfidfTransformer',
+    'FunctionTransformer', 'KBinsDiscretizer', 'PolynomialFeatures',
+    'Imputer', 'SimpleImputer', 'LabelBinarizer', 'LabelEncoder',
+    'RobustScaler', 'OneHotEncoder', 'DictVectorizer', 'OrdinalEncoder',
+    'GenericUnivariateSelect', 'RFE', 'RFECV', 'SelectFdr', 'SelectFpr',
+    'SelectFromModel', 'SelectFwe', 'SelectKBest', 'SelectPercentile',
+    'VarianceThreshold', 'GaussianMixture', 'GaussianProcessRegressor',
+    'BayesianGaussianMixture', 'OneClassSVM',
+    'PLSRegression'
+]}
+_sklearn_operator_names.update({
+    'ARDRegression': 'SklearnLinearRegressor',
+    'BayesianRidge': 'SklearnLinearRegressor',
+    'ElasticNet': 'SklearnLinearRegressor',
+    'ElasticNetCV': 'SklearnLinearRegressor',
+    'GridSearchCV': 'SklearnGridSearchCV',
+    'HuberRegressor': 'SklearnLinearRegressor',
+    'LinearRegression': 'SklearnLinearRegressor',
+    'Lars': 'SklearnLinearRegressor',
+    'LarsCV': 'SklearnLinearRegressor',
+    'Lasso': 'SklearnLinearRegressor',
+    'LassoCV': 'SklearnLinearRegressor',
+    'LassoLars': 'SklearnLinearRegressor',
+    'LassoLarsCV': 'SklearnLinearRegressor',
+    'LassoLarsIC': 'SklearnLinearRegressor',
+    'LinearDiscriminantAnalysis': 'SklearnLinearClassifier',
+    'LogisticRegression': 'SklearnLinearClassifier',
+    'LogisticRegressionCV': 'SklearnLinearClassifier',
+    'MultiTaskElasticNet': 'SklearnLinearRegressor',
+    'MultiTaskElasticNetCV': 'SklearnLinearRegressor',
+    'MultiTaskLasso': 'SklearnLinearRegressor',
+    'MultiTaskLassoCV': 'SklearnLinearRegressor',
+    'NuSVC': 'SklearnSVC',
+    'NuSVR': 'SklearnSVR',
+    'OrthogonalMatchingPursuit': 'SklearnLinearRegressor',
+    'OrthogonalMatchingPursuitCV': 'SklearnLinearRegressor',
+    'PassiveAggressiveClassifier': 'SklearnSGDClassifier',
+    'PassiveAggressiveRegressor': 'SklearnLinearRegressor',
+    'Perceptron': 'SklearnSGDClassifier',
+    'Ridge': 'SklearnLinearRegressor',
+    'RidgeCV': 'SklearnLinearRegressor',
+    'RidgeClassifier': 'SklearnLinearClassifier',
+    'RidgeClassifierCV': 'SklearnLinearClassifier',
+    'SGDRegressor': 'SklearnLinearRegressor',
+    'StandardScaler': 'SklearnScaler',
+    'TheilSenRegressor': 'SklearnLinearRegressor',
+})
+
+
 def build_sklearn_operator_name_map():
-    res = {k: "Sklearn" + k.__name__ for k in [
-                AdaBoostClassifier, AdaBoostRegressor,
-                BaggingClassifier, BaggingRegressor,
-                BernoulliNB, ComplementNB, GaussianNB, MultinomialNB,
-                CalibratedClassifierCV,
-                DecisionTreeClassifier, DecisionTreeRegressor,
-                ExtraTreeClassifier, ExtraTreeRegressor,
-                ExtraTreesClassifier, ExtraTreesRegressor,
-                GradientBoostingClassifier, GradientBoostingRegressor,
-                KNeighborsClassifier, KNeighborsRegressor, NearestNeighbors,
-                LinearSVC, LinearSVR, SVC, SVR,
-                LinearRegression, RANSACRegressor,
-                MLPClassifier, MLPRegressor,
-                OneVsRestClassifier,
-                RandomForestClassifier, RandomForestRegressor,
-                SGDClassifier,
-                VotingClassifier, VotingRegressor,
-                KMeans, MiniBatchKMeans,
-                PCA, TruncatedSVD, IncrementalPCA,
-                Binarizer, MinMaxScaler, MaxAbsScaler, Normalizer,
-                CountVectorizer, TfidfVectorizer, TfidfTransformer,
-                FunctionTransformer, KBinsDiscretizer, PolynomialFeatures,
-                Imputer, SimpleImputer, LabelBinarizer, LabelEncoder,
-                RobustScaler, OneHotEncoder, DictVectorizer, OrdinalEncoder,
-                GenericUnivariateSelect, RFE, RFECV, SelectFdr, SelectFpr,
-                SelectFromModel, SelectFwe, SelectKBest, SelectPercentile,
-                VarianceThreshold, GaussianMixture, GaussianProcessRegressor,
-                BayesianGaussianMixture, OneClassSVM,
-                PLSRegression
-    ] if k is not None}
-    res.update({
-        ARDRegression: 'SklearnLinearRegressor',
-        BayesianRidge: 'SklearnLinearRegressor',
-        ElasticNet: 'SklearnLinearRegressor',
-        ElasticNetCV: 'SklearnLinearRegressor',
-        GridSearchCV: 'SklearnGridSearchCV',
-        HuberRegressor: 'SklearnLinearRegressor',
-        LinearRegression: 'SklearnLinearRegressor',
-        Lars: 'SklearnLinearRegressor',
-        LarsCV: 'SklearnLinearRegressor',
-        Lasso: 'SklearnLinearRegressor',
-        LassoCV: 'SklearnLinearRegressor',
-        LassoLars: 'SklearnLinearRegressor',
-        LassoLarsCV: 'SklearnLinearRegressor',
-        LassoLarsIC: 'SklearnLinearRegressor',
-        LinearDiscriminantAnalysis: 'SklearnLinearClassifier',
-        LogisticRegression: 'SklearnLinearClassifier',
-        LogisticRegressionCV: 'SklearnLinearClassifier',
-        MultiTaskElasticNet: 'SklearnLinearRegressor',
-        MultiTaskElasticNetCV: 'SklearnLinearRegressor',
-        MultiTaskLasso: 'SklearnLinearRegressor',
-        MultiTaskLassoCV: 'SklearnLinearRegressor',
-        NuSVC: 'SklearnSVC',
-        NuSVR: 'SklearnSVR',
-        OrthogonalMatchingPursuit: 'SklearnLinearRegressor',
-        OrthogonalMatchingPursuitCV: 'SklearnLinearRegressor',
-        PassiveAggressiveClassifier: 'SklearnSGDClassifier',
-        PassiveAggressiveRegressor: 'SklearnLinearRegressor',
-        Perceptron: 'SklearnSGDClassifier',
-        Ridge: 'SklearnLinearRegressor',
-        RidgeCV: 'SklearnLinearRegressor',
-        RidgeClassifier: 'SklearnLinearClassifier',
-        RidgeClassifierCV: 'SklearnLinearClassifier',
-        SGDRegressor: 'SklearnLinearRegressor',
-        StandardScaler: 'SklearnScaler',
-        TheilSenRegressor: 'SklearnLinearRegressor',
-    })
+    """
+    Imports every supported scikit-learn model and returns
+    a dictionary ``{ class: alias }``, models registered with
+    :func:`update_registered_converter` are included.
+    """
+    res = {}
+    for name, alias in _sklearn_operator_names.items():
+        cls = _get_sklearn_class(name, load=True)
+        if cls is not None:
+            res[cls] = alias
+    res.update(sklearn_operator_name_map)
     return res
 
 
@@ -316,4 +305,4 @@ def _get_sklearn_operator_name(model_type):
 
 
 # registered converters
-sklearn_operator_name_map = build_sklearn_operator_name_map()
+sklearn_operator_name_map = _LazyModelMap(_sklearn_operator_names)
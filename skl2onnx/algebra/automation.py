@@ -101,7 +101,8 @@ def _get_doc_template():
     """))
 
 
-_template_operator = _get_doc_template()
+# Compiled on first use, jinja2 takes time to import.
+_template_operator = None
 
 
 def get_domain_list():
@@ -223,6 +224,9 @@ def get_rst_doc(op_name=None):
             doc_url += sch.domain + "."
         return doc_url
 
+    global _template_operator
+    if _template_operator is None:
+        _template_operator = _get_doc_template()
     fnwd = format_name_with_domain
     tmpl = _template_operator
     docs = tmpl.render(schemas=schemas, OpSchema=OpSchema,
@@ -278,7 +282,7 @@ def _get_doc_template_sklearn():
     """))
 
 
-_template_operator_sklearn = _get_doc_template_sklearn()
+_template_operator_sklearn = None
 
 
 def get_rst_doc_sklearn():
@@ -297,6 +301,9 @@ def get_rst_doc_sklearn():
 
     from .sklearn_ops import dynamic_class_creation_sklearn
     classes = dynamic_class_creation_sklearn()
+    global _template_operator_sklearn
+    if _template_operator_sklearn is None:
+        _template_operator_sklearn = _get_doc_template_sklearn()
     tmpl = _template_operator_sklearn
     values = [(k, v) for k, v in sorted(classes.items())]
     values = [_[1] for _ in values]
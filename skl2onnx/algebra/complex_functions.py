@@ -9,26 +9,50 @@ from ..common.data_types import FloatTensorType, DoubleTensorType
 from .onnx_ops import (
     OnnxIdentity, OnnxScan, OnnxTranspose,
     OnnxSub, OnnxReduceSumSquare, OnnxSqueeze,
-    OnnxSqrt, OnnxPow, OnnxAbs, OnnxReduceSum
+    OnnxSqrt, OnnxPow, OnnxAbs, OnnxReduceSum,
+    OnnxAdd, OnnxMatMul, OnnxMax
 )
 
 
+def _choose_optim(metric, optim, op_version):
+    """
+    Returns the implementation used to compute pairwise distances,
+    ``'scan'`` by default.
+    """
+    if optim is None or optim == 'scan':
+        return 'scan'
+    if optim != 'gemm':
+        raise ValueError("Unknown optimisation '{}'.".format(optim))
+    if metric not in ('sqeuclidean', 'euclidean'):
+        raise ValueError("optim='gemm' is not implemented for "
+                         "metric='{}'.".format(metric))
+    if op_version is not None and op_version < 8:
+        # Max broadcasts its inputs since opset 8.
+        raise ValueError("optim='gemm' requires opset >= 8.")
+    return optim
+
+
 def onnx_squareform_pdist(X, metric='sqeuclidean', dtype=None,
-                          op_version=None, **kwargs):
+                          op_version=None, optim=None, **kwargs):
     """
     Returns the ONNX graph which computes
     ``squareform(pdist(X, metric=metric))``.
+    Parameter *optim* has the same meaning as in
+    :func:`onnx_cdist`.
     """
-    if metric == 'sqeuclidean':
-        return _onnx_squareform_pdist_sqeuclidean(
-            X, dtype=dtype, op_version=op_version, **kwargs)
-    elif metric == 'euclidean':
-        res = _onnx_squareform_pdist_sqeuclidean(
-            X, dtype=dtype, op_version=op_version)
-        return OnnxSqrt(res, op_version=op_version, **kwargs)
-    else:
+    if metric not in ('sqeuclidean', 'euclidean'):
         raise NotImplementedError("metric='{}' is not implemented.".format(
             metric))
+    if _choose_optim(metric, optim, op_version) == 'gemm':
+        fct = _onnx_cdist_sqeuclidean_gemm
+        args = (X, X)
+    else:
+        fct = _onnx_squareform_pdist_sqeuclidean
+        args = (X, )
+    if metric == 'sqeuclidean':
+        return fct(*args, dtype=dtype, op_version=op_version, **kwargs)
+    res = fct(*args, dtype=dtype, op_version=op_version)
+    return OnnxSqrt(res, op_version=op_version, **kwargs)
 
 
 def _onnx_squareform_pdist_sqeuclidean(X, dtype=None, op_version=None,
@@ -63,7 +87,7 @@ def _onnx_squareform_pdist_sqeuclidean(X, dtype=None, op_version=None,
 
 def onnx_cdist(XA, XB, metric='sqeuclidean', dtype=None,
                op_version=None, dim_in=None, dim_out=None,
-               **kwargs):
+               optim=None, **kwargs):
     """
     Returns the ONNX graph which computes
     ``cdist(XA, XB, metric=metric)``.
@@ -77,9 +101,23 @@ def onnx_cdist(XA, XB, metric='sqeuclidean', dtype=None,
         (if known)
     :param dim_out: dimension of the output vectorial space
         (if known)
+    :param optim: ``'gemm'`` computes the euclidean distances
+        with a matrix multiplication
+        :math:`\\|x\\|^2 - 2 x y' + \\|y\\|^2`,
+        it is much faster on big matrices but less accurate
+        as distances close to zero suffer from rounding errors,
+        ``'scan'`` or None computes the distances to one row of *XB*
+        at a time with operator *Scan*
     :param kwargs: addition parameter
     :return: OnnxOperatorMixin
     """
+    if _choose_optim(metric, optim, op_version) == 'gemm':
+        if metric == 'sqeuclidean':
+            return _onnx_cdist_sqeuclidean_gemm(
+                XA, XB, dtype=dtype, op_version=op_version, **kwargs)
+        res = _onnx_cdist_sqeuclidean_gemm(
+            XA, XB, dtype=dtype, op_version=op_version)
+        return OnnxSqrt(res, op_version=op_version, **kwargs)
     if metric == 'sqeuclidean':
         return _onnx_cdist_sqeuclidean(
             XA, XB, dtype=dtype, op_version=op_version,
@@ -148,6 +186,45 @@ def _onnx_cdist_sqeuclidean(XA, XB, dtype=None, op_version=None,
                            dim_in=dim_in, dim_out=dim_out, **kwargs)
 
 
+def _onnx_cdist_sqeuclidean_gemm(XA, XB, dtype=None, op_version=None,
+                                 **kwargs):
+    """
+    Returns the ONNX graph which computes
+    ``cdist(XA, XB, metric='sqeuclidean')`` with a matrix
+    multiplication. The squared norms of *XB* and ``-2 XB'``
+    are precomputed if *XB* is an array. Rounding errors may produce
+    small negative values, they are replaced by zero.
+    onnxruntime does not implement *Gemm* for doubles,
+    the graph uses *MatMul*.
+    """
+    if dtype is None:
+        dtype = XB.dtype if isinstance(XB, np.ndarray) else np.float32
+    norm_a = OnnxReduceSumSquare(XA, axes=[1], keepdims=1,
+                                 op_version=op_version)
+    if isinstance(XB, np.ndarray):
+        norm_b = np.square(XB.astype(np.float64)).sum(axis=1)
+        norm_b = norm_b.astype(XB.dtype).reshape((1, -1))
+        # Multiplying by -2 is exact.
+        prod = OnnxMatMul(XA, (XB.T * (-2)).astype(XB.dtype),
+                          op_version=op_version)
+        dist = OnnxAdd(OnnxAdd(prod, norm_b, op_version=op_version),
+                       norm_a, op_version=op_version)
+    else:
+        norm_b = OnnxTranspose(
+            OnnxReduceSumSquare(XB, axes=[1], keepdims=1,
+                                op_version=op_version),
+            perm=[1, 0], op_version=op_version)
+        prod = OnnxMatMul(
+            XA, OnnxTranspose(XB, perm=[1, 0], op_version=op_version),
+            op_version=op_version)
+        dist = OnnxSub(
+            OnnxAdd(norm_a, norm_b, op_version=op_version),
+            OnnxAdd(prod, prod, op_version=op_version),
+            op_version=op_version)
+    return OnnxMax(dist, np.array([0], dtype=dtype),
+                   op_version=op_version, **kwargs)
+
+
 def _onnx_cdist_minkowski(XA, XB, dtype=None, op_version=None, p=2,
                           dim_in=None, dim_out=None, **kwargs):
     """
@@ -81,7 +81,7 @@ class GraphState:
             dtype = cst.dtype
             if dtype == np.float32:
                 ty = onnx_proto.TensorProto.FLOAT
-                astype = np.float64
+                astype = np.float32
             elif dtype == np.float64:
                 ty = onnx_proto.TensorProto.DOUBLE
                 astype = np.float64
@@ -114,11 +114,13 @@ class GraphState:
                 self.onnx_prefix + 'cst')
             cst, ty, astype = _ty_astype(cst)
             if astype is not None:
-                cst = cst.astype(astype)
-            self.container.add_initializer(
-                name, ty, shape, cst.flatten(),
-                can_cast=can_cast)
-            return name
+                cst = cst.astype(astype, copy=False)
+            # ravel does not copy a contiguous array, add_initializer
+            # stores its buffer as raw data, it returns an identical
+            # initializer if there is one.
+            return self.container.add_initializer(
+                name, ty, shape, cst.ravel(),
+                can_cast=can_cast).name
         elif isinstance(cst, coo_matrix):
             shape = cst.shape
             name = self.scope.get_unique_variable_name(
@@ -131,8 +133,8 @@ class GraphState:
         elif isinstance(cst, TensorProto):
             name = self.scope.get_unique_variable_name(
                 self.onnx_prefix + 'cst')
-            self.container.add_initializer(name, None, None, cst)
-            return name
+            return self.container.add_initializer(
+                name, None, None, cst).name
         elif isinstance(cst, np.int64):
             name = self.scope.get_unique_variable_name(
                 self.onnx_prefix + 'cst')
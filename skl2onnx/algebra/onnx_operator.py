@@ -498,6 +498,7 @@ class OnnxOperator:
             container.add_output(shape)
 
         # convert the graph
+        container.resolve_initializer_aliases()
         graph = make_graph(
             container.nodes, model_name, container.inputs,
             container.outputs, container.initializers)
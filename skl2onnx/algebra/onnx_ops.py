@@ -83,16 +83,35 @@ def ClassFactory(class_name, op_name, inputs, outputs,
     return newclass
 
 
-def dynamic_class_creation():
+class _LazyDoc:
     """
-    Automatically generates classes for each of the operators
-    module *onnx* defines and described at
-    `Operators
-    <https://github.com/onnx/onnx/blob/master/docs/Operators.md>`_
-    and `Operators
-    <https://github.com/onnx/onnx/blob/master/docs/
-    Operators-ml.md>`_.
+    Documentation of an operator class, it is rendered from
+    the schema the first time it is accessed.
     """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.doc = None
+
+    def __get__(self, instance, owner):
+        if self.doc is None:
+            doc = get_rst_doc(self.schema)
+            self.doc = "**Version**" + doc.split('**Version**')[-1]
+        return self.doc
+
+
+_schemas = None
+_classes = {}
+
+
+def _get_schemas():
+    """
+    Returns all schemas indexed by operator name (last version)
+    and by operator name and version (``'Name_version'``).
+    """
+    global _schemas
+    if _schemas is not None:
+        return _schemas
     res = {}
     for schema in onnx.defs.get_all_schemas_with_history():
         if schema.support_level == schema.SupportType.EXPERIMENTAL:
@@ -106,43 +125,80 @@ def dynamic_class_creation():
         else:
             res[schema.name] = schema
         res[schema.name + '_' + str(schema.since_version)] = schema
-    cls = {}
+    _schemas = res
+    return res
+
+
+def _get_class(name):
+    """
+    Creates the class for operator *name* (``'Name'`` or
+    ``'Name_version'``) or returns it if it already exists.
+    """
+    if name in _classes:
+        return _classes[name]
+    schemas = _get_schemas()
+    schema = schemas[name]
 
     def _c(obj, label, i):
         name = '%s%d' % (obj.name or label, i)
         tys = obj.typeStr or ''
         return (name, tys)
 
-    for name in sorted(res):
-        schema = res[name]
-        doc = get_rst_doc(schema)
-        inputs = [_c(o, 'I', i) for i, o in enumerate(schema.inputs)]
-        outputs = [_c(o, 'O', i) for i, o in enumerate(schema.outputs)]
-        args = [p for p in schema.attributes]
+    inputs = [_c(o, 'I', i) for i, o in enumerate(schema.inputs)]
+    outputs = [_c(o, 'O', i) for i, o in enumerate(schema.outputs)]
+    args = [p for p in schema.attributes]
+
+    if '_' in name:
+        class_name = "Onnx" + name
+    else:
+        class_name = "Onnx" + schema.name
+
+    cl = ClassFactory(class_name, schema.name, inputs, outputs,
+                      [schema.min_input, schema.max_input],
+                      [schema.min_output, schema.max_output],
+                      schema.domain, args, _LazyDoc(schema),
+                      getattr(schema, 'deprecated', False),
+                      schema.since_version, {})
+    _classes[name] = cl
+
+    if '_' not in name:
+        # Retrieves past classes.
+        prefix = name + '_'
+        for past in schemas:
+            if past.startswith(prefix) and '_' not in past[len(prefix):]:
+                cl.past_version['Onnx' + past] = _get_class(past)
+    return cl
+
+
+def dynamic_class_creation():
+    """
+    Automatically generates classes for each of the operators
+    module *onnx* defines and described at
+    `Operators
+    <https://github.com/onnx/onnx/blob/master/docs/Operators.md>`_
+    and `Operators
+    <https://github.com/onnx/onnx/blob/master/docs/
+    Operators-ml.md>`_.
+    """
+    return {"Onnx" + name: _get_class(name)
+            for name in sorted(_get_schemas())}
+
+
+def __getattr__(name):
+    """
+    Creates the class *name* on first access (:pep:`562`).
+    """
+    if name.startswith('Onnx') and name[4:] in _get_schemas():
+        cl = _get_class(name[4:])
+        setattr(sys.modules[__name__], name, cl)
+        return cl
+    raise AttributeError("module '{}' has no attribute '{}'".format(
+        __name__, name))
 
-        if '_' in name:
-            class_name = "Onnx" + name
-        else:
-            class_name = "Onnx" + schema.name
-
-        cl = ClassFactory(class_name, schema.name, inputs, outputs,
-                          [schema.min_input, schema.max_input],
-                          [schema.min_output, schema.max_output],
-                          schema.domain, args,
-                          "**Version**" + doc.split('**Version**')[-1],
-                          getattr(schema, 'deprecated', False),
-                          schema.since_version, {})
-        cls[class_name] = cl
-
-    # Retrieves past classes.
-    for name in cls:
-        if '_' not in name:
-            continue
-        main, version = name.split('_')
-        last = cls[main]
-        last.past_version[name] = cls[name]
 
-    return cls
+def __dir__():
+    return sorted(set(globals()) |
+                  set("Onnx" + name for name in _get_schemas()))
 
 
 def _update_module():
@@ -156,4 +212,6 @@ def _update_module():
         setattr(this, k, v)
 
 
-_update_module()
+if sys.version_info[:2] < (3, 7):
+    # Module level __getattr__ is not supported.
+    _update_module()
@@ -29,12 +29,14 @@ def dynamic_class_creation_sklearn():
     """
     Automatically generates classes for each of the converter.
     """
-    from ..common._registration import _shape_calculator_pool, _converter_pool
-    from .._supported_operators import sklearn_operator_name_map
+    from ..common._registration import (
+        _shape_calculator_pool, _converter_pool, load_all_converters)
+    from .._supported_operators import build_sklearn_operator_name_map
 
+    load_all_converters()
     cls = {}
 
-    for skl_obj, name in sklearn_operator_name_map.items():
+    for skl_obj, name in build_sklearn_operator_name_map().items():
         conv = _converter_pool[name]
         shape_calc = _shape_calculator_pool[name]
         skl_name = skl_obj.__name__
@@ -4,6 +4,7 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import hashlib
 import inspect
 import re
 import six
@@ -13,6 +14,7 @@ import warnings
 import numpy as np
 from scipy.sparse import coo_matrix
 from onnx import onnx_pb as onnx_proto
+from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
 from onnxconverter_common.onnx_ops import __dict__ as dict_apply_operation
 from ..proto import TensorProto
 from ..proto.onnx_helper_modified import (
@@ -29,6 +31,30 @@ from .interface import ModelContainer
 from .utils import get_domain
 
 
+# Element types stored in *raw_data* when an initializer
+# is created from a numpy array.
+_raw_data_types = {
+    TensorProto.FLOAT, TensorProto.DOUBLE, TensorProto.FLOAT16,
+    TensorProto.INT8, TensorProto.INT16, TensorProto.INT32,
+    TensorProto.INT64, TensorProto.UINT8, TensorProto.UINT16,
+    TensorProto.UINT32, TensorProto.UINT64, TensorProto.BOOL,
+}
+
+
+def _make_raw_tensor(name, onnx_type, shape, content):
+    """
+    Creates a *TensorProto* whose values are the buffer of array
+    *content*. ONNX requires little endian values in *raw_data*.
+    """
+    dtype = np.dtype(TENSOR_TYPE_TO_NP_TYPE[onnx_type]).newbyteorder('<')
+    tensor = TensorProto()
+    tensor.data_type = onnx_type
+    tensor.name = name
+    tensor.dims.extend(shape)
+    tensor.raw_data = np.ascontiguousarray(content, dtype=dtype).tobytes()
+    return tensor
+
+
 def _get_operation_list():
     """
     Investigates this module to extract all ONNX functions
@@ -67,7 +93,9 @@ def _build_options(model, defined_options, default_values):
     return opts
 
 
-_apply_operation_specific = _get_operation_list()
+# Filled on first use by _check_operator, inspecting the source
+# of every function takes time.
+_apply_operation_specific = None
 
 
 class RawModelContainerNode(object):
@@ -159,16 +187,22 @@ class ModelComponentContainer(ModelContainer):
     *ONNX* *ModelProto*.
     """
 
-    def __init__(self, target_opset, options=None, dtype=None):
+    def __init__(self, target_opset, options=None, dtype=None,
+                 validation='default'):
         """
         :param target_opset: number, for example, 7 for *ONNX 1.2*, and
                              8 for *ONNX 1.3*.
         :param dtype: float type to be used for every float coefficient
         :param options: see :ref:`l-conv-options`
+        :param validation: checks done on every added node,
+            see :ref:`l-conv-validation`
         """
         if dtype is None:
             raise ValueError("dtype must be specified, it should be either "
                              "np.float32 or np.float64.")
+        if validation not in ('strict', 'default', 'off'):
+            raise ValueError("validation must be 'strict', 'default' or "
+                             "'off' not '{}'.".format(validation))
         # Inputs of ONNX graph. They are ValueInfoProto in ONNX.
         self.inputs = []
         # Outputs of ONNX graph. They are ValueInfoProto in ONNX.
@@ -182,14 +216,30 @@ class ModelComponentContainer(ModelContainer):
         # ONNX nodes (type: NodeProto) used to define computation
         # structure
         self.nodes = []
+        # Names of the nodes in self.nodes, it avoids going through
+        # every node to create a new unique name.
+        self._node_names = set()
+        # Maps every output name to the node producing it.
+        self._output_producers = {}
         # ONNX operators' domain-version pair set. They will be added
         # into opset_import field in the final ONNX model.
         self.node_domain_version_pair_sets = set()
+        # Initializers indexed by a hash of their content, an
+        # initializer identical to a previous one is not added.
+        self._initializer_hashes = {}
+        # Maps the name of every initializer not added because of
+        # a duplicate to the name of the initializer kept.
+        self.initializer_aliases = {}
         # The targeted ONNX operator set (referred to as opset) that
         # matches the ONNX version.
         self.target_opset = target_opset
         # Additional options given to converters.
         self.options = options
+        # Level of checking done when a node is added.
+        self.validation = validation
+        # Operator types already checked by _check_operator since
+        # the last call to start_converter.
+        self._checked_operators = set()
 
         self.dtype = dtype
         if dtype == np.float32:
@@ -273,7 +323,15 @@ class ModelComponentContainer(ModelContainer):
                         or a float array).
         :param can_cast: the method can take the responsability
             to cast the constant
-        :return: created tensor
+        :return: created tensor or the identical tensor
+            previously added
+
+        Numerical arrays are stored in field *raw_data*,
+        lists are stored in the field dedicated to their type.
+        If an initializer with the same type, shape and content
+        was already added, the new one is not and every node
+        referring to *name* refers to the previous one
+        (see :meth:`resolve_initializer_aliases`).
         """
         if (can_cast and isinstance(content, (np.ndarray, coo_matrix)) and
                 onnx_type in (TensorProto.FLOAT, TensorProto.DOUBLE) and
@@ -313,11 +371,14 @@ class ModelComponentContainer(ModelContainer):
         else:
             if any(d is None for d in shape):
                 raise ValueError('Shape of initializer cannot contain None.')
-            tensor = make_tensor(name, onnx_type, shape, content)
+            if (isinstance(content, np.ndarray) and
+                    onnx_type in _raw_data_types):
+                tensor = _make_raw_tensor(name, onnx_type, shape, content)
+            else:
+                tensor = make_tensor(name, onnx_type, shape, content)
 
         if tensor is not None:
-            self.initializers.append(tensor)
-            return tensor
+            return self._append_initializer(tensor)
         elif sparse_tensor is not None:
             self.add_node('Constant', [], [name], sparse_value=sparse_tensor,
                           op_version=11, name=name + '_op')
@@ -326,9 +387,55 @@ class ModelComponentContainer(ModelContainer):
             raise RuntimeError(
                 "Either tensor or sparse_tensor should be defined.")
 
+    def _append_initializer(self, tensor):
+        """
+        Appends an initializer unless an identical one exists,
+        returns the initializer kept.
+        """
+        if (not isinstance(tensor, TensorProto) or
+                any(inp.name == tensor.name for inp in self.inputs)):
+            # An initializer which is also an input can be overwritten.
+            self.initializers.append(tensor)
+            return tensor
+        content = _tensor_content(tensor)
+        key = hashlib.sha256(content).digest()
+        kept = self._initializer_hashes.get(key, None)
+        if kept is not None and _tensor_content(kept) == content:
+            if kept.name != tensor.name:
+                self.initializer_aliases[tensor.name] = kept.name
+            return kept
+        if kept is None:
+            self._initializer_hashes[key] = tensor
+        self.initializers.append(tensor)
+        return tensor
+
+    def resolve_initializer_aliases(self):
+        """
+        Replaces in every node, including subgraphs, the names
+        of the initializers not added because of a duplicate by
+        the name of the initializer kept (see :meth:`add_initializer`).
+        """
+        if not self.initializer_aliases:
+            return
+        aliases = {}
+        for name in self.initializer_aliases:
+            kept = name
+            while kept in self.initializer_aliases:
+                kept = self.initializer_aliases[kept]
+            aliases[name] = kept
+        _replace_inputs(self.nodes, aliases, set())
+
     def add_value_info(self, variable):
         self.value_info.append(self._make_value_info(variable))
 
+    def start_converter(self):
+        """
+        Tells the container a new converter is called.
+        With ``validation='strict'``, every operator type is checked
+        by :meth:`_check_operator` once per converter call.
+        """
+        self._checked_operators.clear()
+
     def _check_operator(self, op_type):
         """
         Checks that if *op_type* is one of the operators defined in
@@ -336,6 +443,9 @@ class ModelComponentContainer(ModelContainer):
         from a function defined in this submodule by looking
         into the callstack. The test is enabled for *python >= 3.6*.
         """
+        global _apply_operation_specific
+        if _apply_operation_specific is None:
+            _apply_operation_specific = _get_operation_list()
         if (op_type in _apply_operation_specific and
                 sys.version_info[:2] >= (3, 6)):
             tb = traceback.extract_stack()
@@ -353,6 +463,18 @@ class ModelComponentContainer(ModelContainer):
                     "'{1}' in submodule _apply_operation.".format(
                         op_type, fct.__name__))
 
+    def _get_unique_node_name(self, name):
+        """
+        Returns the name of a new node. A default name is created
+        if *name* is empty, a suffix is added if it is already used.
+        """
+        if name is None or not isinstance(
+                name, str) or name == '':
+            name = "N%d" % len(self.nodes)
+        if name in self._node_names:
+            name += "-N%d" % len(self.nodes)
+        return name
+
     def add_node(self, op_type, inputs, outputs, op_domain='', op_version=1,
                  name=None, **attrs):
         """
@@ -375,33 +497,36 @@ class ModelComponentContainer(ModelContainer):
                       attributes' names and attributes' values,
                       respectively.
         """
-        if name is None or not isinstance(
-                name, str) or name == '':
-            name = "N%d" % len(self.nodes)
-        existing_names = set(n.name for n in self.nodes)
-        if name in existing_names:
-            name += "-N%d" % len(self.nodes)
+        name = self._get_unique_node_name(name)
 
         if op_domain is None:
             op_domain = get_domain()
-        self._check_operator(op_type)
+        if (self.validation == 'strict' and
+                op_type not in self._checked_operators):
+            self._checked_operators.add(op_type)
+            self._check_operator(op_type)
 
         if isinstance(inputs, (six.string_types, six.text_type)):
             inputs = [inputs]
         if isinstance(outputs, (six.string_types, six.text_type)):
             outputs = [outputs]
-        if not isinstance(inputs, list) or not all(
-                isinstance(s, (six.string_types, six.text_type))
-                for s in inputs):
-            type_list = ','.join(list(str(type(s)) for s in inputs))
-            raise ValueError('Inputs must be a list of string but get [%s]'
-                             % type_list)
-        if (not isinstance(outputs, list) or
-                not all(isinstance(s, (six.string_types, six.text_type))
-                        for s in outputs)):
-            type_list = ','.join(list(str(type(s)) for s in outputs))
-            raise ValueError('Outputs must be a list of string but get [%s]'
-                             % type_list)
+        if self.initializer_aliases and isinstance(inputs, list):
+            inputs = [self.initializer_aliases.get(name, name)
+                      if isinstance(name, str) else name
+                      for name in inputs]
+        if self.validation != 'off':
+            if not isinstance(inputs, list) or not all(
+                    isinstance(s, (six.string_types, six.text_type))
+                    for s in inputs):
+                type_list = ','.join(list(str(type(s)) for s in inputs))
+                raise ValueError('Inputs must be a list of string but get '
+                                 '[%s]' % type_list)
+            if (not isinstance(outputs, list) or
+                    not all(isinstance(s, (six.string_types, six.text_type))
+                            for s in outputs)):
+                type_list = ','.join(list(str(type(s)) for s in outputs))
+                raise ValueError('Outputs must be a list of string but get '
+                                 '[%s]' % type_list)
         upd = {}
         for k, v in attrs.items():
             if v is None:
@@ -423,6 +548,9 @@ class ModelComponentContainer(ModelContainer):
 
         self.node_domain_version_pair_sets.add((op_domain, op_version))
         self.nodes.append(node)
+        self._node_names.add(node.name)
+        for output in node.output:
+            self._output_producers[output] = node
         if (self.target_opset is not None and
                 op_version is not None and
                 op_version > self.target_opset):
@@ -431,6 +559,67 @@ class ModelComponentContainer(ModelContainer):
                 "node '{}'.".format(
                     op_version, self.target_opset, node.op_type))
 
+    def merge(self, container, rename=None):
+        """
+        Appends nodes, initializers and value info of a container
+        filled by a converter running in a worker
+        (see :class:`SubModelComponentContainer`).
+        Nodes are named as if they had been added to this container
+        by method *add_node*.
+
+        :param container: container to merge
+        :param rename: function applied to every name (variables,
+            nodes, initializers) or None to keep them
+        """
+        if rename is not None:
+            for node in container.nodes:
+                _rename_proto(node, rename)
+            for init in container.initializers:
+                _rename_proto(init, rename)
+            for info in container.value_info:
+                _rename_proto(info, rename)
+            aliases = {rename(k): rename(v) for k, v in
+                       container.initializer_aliases.items()}
+        else:
+            aliases = container.initializer_aliases
+        self.initializer_aliases.update(aliases)
+        for node in container.nodes:
+            node.name = self._get_unique_node_name(node.name)
+            self.nodes.append(node)
+            self._node_names.add(node.name)
+            for output in node.output:
+                self._output_producers[output] = node
+        for init in container.initializers:
+            self._append_initializer(init)
+        self.value_info.extend(container.value_info)
+        for pair in getattr(container, 'node_domain_version_pairs',
+                            container.node_domain_version_pair_sets):
+            self.node_domain_version_pair_sets.add(pair)
+
+    def get_producer(self, name):
+        """
+        Returns the node producing variable *name* or None
+        if no node produces it (inputs, initializers).
+        """
+        return self._output_producers.get(name, None)
+
+    def optimize(self, passes=None):
+        """
+        Optimizes the nodes once every converter was called,
+        see :func:`optimize_container
+        <skl2onnx.common._optimize.optimize_container>`.
+
+        :param passes: None for the default passes or a list
+            of pass names or functions
+        :return: dictionary ``{ pass name: number of removed nodes }``
+        """
+        from ._optimize import optimize_container
+        report = optimize_container(self, passes=passes)
+        self._node_names = set(node.name for node in self.nodes)
+        self._output_producers = {name: node for node in self.nodes
+                                  for name in node.output}
+        return report
+
     def get_options(self, model, default_values=None):
         """
         Returns additional options for a model.
@@ -441,3 +630,130 @@ class ModelComponentContainer(ModelContainer):
         :return: dictionary
         """
         return _build_options(model, self.options, default_values)
+
+
+class SubModelComponentContainer(ModelComponentContainer):
+    """
+    Container given to a converter running in a worker
+    (see parameter *n_jobs* of :func:`convert_sklearn
+    <skl2onnx.convert_sklearn>`). Node names are kept as requested
+    by the converter and chosen when the container is merged into
+    the main one with :meth:`ModelComponentContainer.merge`.
+    """
+
+    def __init__(self, container):
+        """
+        :param container: main container, target opset, options,
+            dtype and validation level are copied from it
+        """
+        ModelComponentContainer.__init__(
+            self, container.target_opset, options=container.options,
+            dtype=container.dtype, validation=container.validation)
+        # Iterating on a set depends on the insertion order,
+        # the merged set must be filled in the same order.
+        self.node_domain_version_pairs = []
+
+    def _get_unique_node_name(self, name):
+        if name is None or not isinstance(name, str) or name == '':
+            return None
+        return name
+
+    def add_node(self, op_type, inputs, outputs, op_domain='', op_version=1,
+                 name=None, **attrs):
+        ModelComponentContainer.add_node(
+            self, op_type, inputs, outputs, op_domain=op_domain,
+            op_version=op_version, name=name, **attrs)
+        self.node_domain_version_pairs.append(
+            (self.nodes[-1].domain, op_version))
+
+    def merge(self, container, rename=None):
+        ModelComponentContainer.merge(self, container, rename=rename)
+        self.node_domain_version_pairs.extend(
+            getattr(container, 'node_domain_version_pairs',
+                    container.node_domain_version_pair_sets))
+
+
+def _tensor_content(tensor):
+    """
+    Returns the serialized tensor without its name.
+    """
+    name = tensor.name
+    tensor.name = ''
+    content = tensor.SerializeToString()
+    tensor.name = name
+    return content
+
+
+def _replace_inputs(nodes, aliases, defined):
+    """
+    Renames the inputs of nodes with dictionary *aliases*
+    and goes through subgraphs, names in *defined* are defined
+    by a subgraph and are not renamed.
+    """
+    for node in nodes:
+        for i, name in enumerate(node.input):
+            if name in aliases and name not in defined:
+                node.input[i] = aliases[name]
+        for att in node.attribute:
+            graphs = list(att.graphs)
+            if att.HasField('g'):
+                graphs.append(att.g)
+            for graph in graphs:
+                local = set(defined)
+                local.update(inp.name for inp in graph.input)
+                local.update(init.name for init in graph.initializer)
+                for sub in graph.node:
+                    local.update(sub.output)
+                _replace_inputs(graph.node, aliases, local)
+
+
+def _rename_proto(proto, rename):
+    """
+    Renames inplace every name referenced by a node, a tensor,
+    a value info or a graph (including subgraphs).
+    """
+    if isinstance(proto, onnx_proto.NodeProto):
+        if proto.name:
+            proto.name = rename(proto.name)
+        for i, name in enumerate(proto.input):
+            proto.input[i] = rename(name)
+        for i, name in enumerate(proto.output):
+            proto.output[i] = rename(name)
+        for att in proto.attribute:
+            _rename_proto(att, rename)
+    elif isinstance(proto, onnx_proto.AttributeProto):
+        # Attribute names never contain a variable name but
+        # the container may store constants as attributes.
+        proto.name = rename(proto.name)
+        if proto.HasField('t'):
+            _rename_proto(proto.t, rename)
+        if proto.HasField('g'):
+            _rename_proto(proto.g, rename)
+        if (SparseTensorProto is not None and
+                proto.HasField('sparse_tensor')):
+            _rename_proto(proto.sparse_tensor, rename)
+        for tensor in proto.tensors:
+            _rename_proto(tensor, rename)
+        for graph in proto.graphs:
+            _rename_proto(graph, rename)
+    elif isinstance(proto, onnx_proto.GraphProto):
+        for obj in proto.node:
+            _rename_proto(obj, rename)
+        for obj in proto.initializer:
+            _rename_proto(obj, rename)
+        for obj in proto.input:
+            _rename_proto(obj, rename)
+        for obj in proto.output:
+            _rename_proto(obj, rename)
+        for obj in proto.value_info:
+            _rename_proto(obj, rename)
+    elif (SparseTensorProto is not None and
+            isinstance(proto, SparseTensorProto)):
+        _rename_proto(proto.values, rename)
+        _rename_proto(proto.indices, rename)
+    elif isinstance(proto, (onnx_proto.TensorProto,
+                            onnx_proto.ValueInfoProto)):
+        if proto.name:
+            proto.name = rename(proto.name)
+    else:
+        raise TypeError("Unexpected type {}.".format(type(proto)))
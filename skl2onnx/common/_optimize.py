@@ -0,0 +1,934 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+Optimizations applied on the nodes of a container once every
+converter was called (see parameter *optimize* of
+:func:`convert_sklearn <skl2onnx.convert_sklearn>`).
+Every pass takes a :class:`ModelComponentContainer
+<skl2onnx.common._container.ModelComponentContainer>`, modifies
+its nodes inplace and returns the number of nodes it removed.
+"""
+from collections import OrderedDict
+import numpy as np
+from onnx import helper, numpy_helper
+from onnx import onnx_pb as onnx_proto
+from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
+from ._reference_ops import _attributes, run_reference_op, to_tensor
+
+
+TP = onnx_proto.TensorProto
+
+# Types an element type can be cast into and back without losing
+# any value, used to collapse a chain of two Cast.
+_lossless_casts = {
+    TP.BOOL: {TP.INT8, TP.UINT8, TP.INT16, TP.UINT16, TP.INT32,
+              TP.UINT32, TP.INT64, TP.UINT64, TP.FLOAT16, TP.FLOAT,
+              TP.DOUBLE},
+    TP.INT8: {TP.INT16, TP.INT32, TP.INT64, TP.FLOAT16, TP.FLOAT,
+              TP.DOUBLE},
+    TP.UINT8: {TP.INT16, TP.UINT16, TP.INT32, TP.UINT32, TP.INT64,
+               TP.UINT64, TP.FLOAT16, TP.FLOAT, TP.DOUBLE},
+    TP.INT16: {TP.INT32, TP.INT64, TP.FLOAT, TP.DOUBLE},
+    TP.UINT16: {TP.INT32, TP.UINT32, TP.INT64, TP.UINT64, TP.FLOAT,
+                TP.DOUBLE},
+    TP.INT32: {TP.INT64, TP.DOUBLE},
+    TP.UINT32: {TP.INT64, TP.UINT64, TP.DOUBLE},
+    TP.FLOAT16: {TP.FLOAT, TP.DOUBLE},
+    TP.FLOAT: {TP.DOUBLE},
+}
+
+
+def _subgraph_names(node):
+    """
+    Returns every name the subgraphs of a node (Scan, Loop, If)
+    read, they may refer to names of the main graph.
+    """
+    names = set()
+    for att in node.attribute:
+        graphs = list(att.graphs)
+        if att.HasField('g'):
+            graphs.append(att.g)
+        for graph in graphs:
+            for sub in graph.node:
+                names.update(sub.input)
+                names |= _subgraph_names(sub)
+    return names
+
+
+class _GraphInfo:
+    """
+    Producers and consumers of every name in a container.
+    Names in *protected* are graph outputs or are used by a subgraph,
+    they cannot be renamed and their producer cannot be removed.
+    """
+
+    def __init__(self, container):
+        self.inputs = set(inp.name for inp in container.inputs)
+        self.initializers = {init.name: init
+                             for init in container.initializers}
+        self.protected = set(out.name for out in container.outputs)
+        self.producers = {}
+        self.consumers = {}
+        self.removed = set()
+        for node in container.nodes:
+            for name in node.output:
+                self.producers[name] = node
+            for name in node.input:
+                self.consumers.setdefault(name, []).append(node)
+            self.protected |= _subgraph_names(node)
+
+    def is_used(self, name):
+        return (name in self.protected or
+                any(id(node) not in self.removed
+                    for node in self.consumers.get(name, [])))
+
+    def replace_input(self, old, new):
+        "Every node reading *old* now reads *new*."
+        nodes = self.consumers.pop(old, [])
+        for node in nodes:
+            for i, name in enumerate(node.input):
+                if name == old:
+                    node.input[i] = new
+        self.consumers.setdefault(new, []).extend(nodes)
+
+    def set_input(self, node, index, new):
+        "Changes one input of a node."
+        old = node.input[index]
+        node.input[index] = new
+        if old not in node.input:
+            self.consumers[old] = [n for n in self.consumers.get(old, [])
+                                   if n is not node]
+        self.consumers.setdefault(new, []).append(node)
+
+    def remove(self, node):
+        self.removed.add(id(node))
+
+    def remove_if_unused(self, node):
+        "Removes a node if none of its outputs is used, returns 1 if so."
+        if any(self.is_used(name) for name in node.output):
+            return 0
+        self.remove(node)
+        return 1
+
+    def commit(self, container):
+        "Removes the nodes marked as removed from the container."
+        if self.removed:
+            container.nodes = [node for node in container.nodes
+                               if id(node) not in self.removed]
+        return len(self.removed)
+
+
+def _is_onnx_op(node, op_type):
+    return node.op_type == op_type and node.domain in ('', 'ai.onnx')
+
+
+def eliminate_identity(container):
+    """
+    Removes *Identity* nodes. The consumers of the output read the
+    input instead or, if the output is a graph output, the node
+    producing the input produces the output.
+    """
+    info = _GraphInfo(container)
+    for node in container.nodes:
+        if not _is_onnx_op(node, 'Identity'):
+            continue
+        src, dst = node.input[0], node.output[0]
+        if dst not in info.protected:
+            info.replace_input(dst, src)
+        elif (src in info.producers and src not in info.protected and
+                src not in info.inputs and src not in info.initializers):
+            producer = info.producers.pop(src)
+            for i, name in enumerate(producer.output):
+                if name == src:
+                    producer.output[i] = dst
+            info.producers[dst] = producer
+            info.replace_input(src, dst)
+        else:
+            continue
+        info.remove(node)
+    return info.commit(container)
+
+
+def _reshape_shape(node, info):
+    "Returns the constant shape of a Reshape node or None."
+    if len(node.input) > 1:
+        init = info.initializers.get(node.input[1], None)
+        if init is None:
+            return None
+        return numpy_helper.to_array(init).tolist()
+    for att in node.attribute:
+        if att.name == 'shape':
+            return list(att.ints)
+    return None
+
+
+def fold_reshape(container):
+    """
+    Replaces two consecutive *Reshape* by the second one.
+    It is not done if the second shape contains a 0, which copies
+    a dimension of the input.
+    """
+    info = _GraphInfo(container)
+    removed = 0
+    for node in container.nodes:
+        if not _is_onnx_op(node, 'Reshape'):
+            continue
+        previous = info.producers.get(node.input[0], None)
+        if (previous is None or id(previous) in info.removed or
+                not _is_onnx_op(previous, 'Reshape')):
+            continue
+        shape = _reshape_shape(node, info)
+        if shape is None or 0 in shape:
+            continue
+        info.set_input(node, 0, previous.input[0])
+        removed += info.remove_if_unused(previous)
+    info.commit(container)
+    return removed
+
+
+def _cast_to(node):
+    "Returns the element type a Cast node casts into or None."
+    for att in node.attribute:
+        if att.name == 'to' and att.type == onnx_proto.AttributeProto.INT:
+            return att.i
+    return None
+
+
+def collapse_cast(container):
+    """
+    Replaces ``Cast(Cast(x, to=A), to=B)`` by ``Cast(x, to=B)``
+    if every value of *x* can be cast into *A* without any loss.
+    A *Cast* into the type of its input becomes an *Identity*
+    and is removed by :func:`eliminate_identity`.
+    """
+    info = _GraphInfo(container)
+    types = {}
+    for inp in container.inputs:
+        if inp.type.HasField('tensor_type'):
+            types[inp.name] = inp.type.tensor_type.elem_type
+    for init in container.initializers:
+        types[init.name] = init.data_type
+
+    removed = 0
+    identities = 0
+    for node in container.nodes:
+        if not _is_onnx_op(node, 'Cast'):
+            continue
+        to = _cast_to(node)
+        if to is None:
+            continue
+        types[node.output[0]] = to
+        previous = info.producers.get(node.input[0], None)
+        if (previous is not None and id(previous) not in info.removed and
+                _is_onnx_op(previous, 'Cast')):
+            middle = _cast_to(previous)
+            source = types.get(previous.input[0], None)
+            if (middle is not None and to != TP.STRING and
+                    middle in _lossless_casts.get(source, ())):
+                info.set_input(node, 0, previous.input[0])
+                removed += info.remove_if_unused(previous)
+        if types.get(node.input[0], None) == to:
+            node.op_type = 'Identity'
+            del node.attribute[:]
+            identities += 1
+    info.commit(container)
+    if identities > 0:
+        removed += eliminate_identity(container)
+    return removed
+
+
+def fold_constants(container):
+    """
+    Replaces every node whose inputs are all initializers by an
+    initializer holding its output, computed once with the reference
+    implementation of the operator (see :func:`run_reference_op
+    <skl2onnx.common._reference_ops.run_reference_op>`).
+    *Constant* nodes become initializers too. A node is kept
+    if its output is bigger than its inputs.
+    """
+    info = _GraphInfo(container)
+    values = {}
+    for node in container.nodes:
+        if any(name in info.protected for name in node.output):
+            continue
+        if _is_onnx_op(node, 'Constant'):
+            if (len(node.attribute) != 1 or
+                    node.attribute[0].name != 'value'):
+                continue
+            tensor = onnx_proto.TensorProto()
+            tensor.CopyFrom(node.attribute[0].t)
+            tensor.name = node.output[0]
+        else:
+            names = [name for name in node.input if name]
+            if not names or any(name not in info.initializers or
+                                name in info.inputs for name in names):
+                continue
+            inputs = []
+            for name in node.input:
+                if name and name not in values:
+                    values[name] = numpy_helper.to_array(
+                        info.initializers[name])
+                inputs.append(values[name] if name else None)
+            while inputs and inputs[-1] is None:
+                inputs.pop()
+            try:
+                result = run_reference_op(node, inputs)
+            except (IndexError, KeyError, TypeError, ValueError):
+                # The runtime fails on this node as well.
+                result = None
+            if result is None:
+                continue
+            result = np.asarray(result)
+            if result.size > sum(values[name].size for name in names):
+                continue
+            values[node.output[0]] = result
+            tensor = to_tensor(node.output[0], result)
+        container.initializers.append(tensor)
+        info.initializers[tensor.name] = tensor
+        info.remove(node)
+    return info.commit(container)
+
+
+def _set_attributes(node, **kwargs):
+    "Replaces the attributes of a node."
+    del node.attribute[:]
+    node.attribute.extend(helper.make_attribute(k, v)
+                          for k, v in sorted(kwargs.items()))
+
+
+def _feature_vector(value):
+    "Returns a constant as a vector applied on the last dimension or None."
+    if value.ndim > 2 or (value.ndim == 2 and value.shape[0] != 1):
+        return None
+    return value.astype(np.float64).ravel()
+
+
+def _affine(node, info, shapes):
+    """
+    Returns ``(x, kind, A, b)`` if a node computes an affine function
+    of its only non constant input *x* applied on the last dimension,
+    None otherwise. *kind* is ``'diag'`` if the node multiplies every
+    feature by a coefficient (``y = x * A + b``) or ``'matrix'``
+    (``y = x @ A + b``). A coefficient per feature requires the last
+    dimension of *x* (see *shapes*) to be known and equal to the
+    number of coefficients, the broadcast must not change the shape.
+    """
+    def features(x, size, ndim=1):
+        shape = shapes.get(x, None)
+        return (shape is not None and len(shape) >= ndim and
+                shape[-1] is not None and size in (1, shape[-1]))
+
+    def constant(name):
+        init = info.initializers.get(name, None)
+        if (init is None or name in info.inputs or
+                init.data_type not in (TP.FLOAT, TP.DOUBLE)):
+            return None
+        return numpy_helper.to_array(init)
+
+    if node.domain == 'ai.onnx.ml' and node.op_type == 'Scaler':
+        atts = _attributes(node)
+        offset = np.array(atts.get('offset', [0.]), dtype=np.float64)
+        scale = np.array(atts.get('scale', [1.]), dtype=np.float64)
+        if (len(offset) != len(scale) and
+                len(offset) != 1 and len(scale) != 1):
+            return None
+        if not features(node.input[0], max(len(offset), len(scale))):
+            return None
+        return node.input[0], 'diag', scale, -offset * scale
+
+    if node.domain not in ('', 'ai.onnx') or len(node.input) < 2:
+        return None
+    if node.op_type in ('Add', 'Sub', 'Mul', 'Div'):
+        values = [constant(name) for name in node.input]
+        if (values[0] is None) == (values[1] is None):
+            return None
+        first = values[0] is None
+        x = node.input[0 if first else 1]
+        value = values[1 if first else 0]
+        if not features(x, value.size, value.ndim):
+            return None
+        value = _feature_vector(value)
+        if value is None:
+            return None
+        if node.op_type == 'Add':
+            return x, 'diag', np.ones(1), value
+        if node.op_type == 'Sub':
+            if first:
+                return x, 'diag', np.ones(1), -value
+            return x, 'diag', -np.ones(1), value
+        if node.op_type == 'Mul':
+            return x, 'diag', value, np.zeros(1)
+        if not first:
+            return None
+        return x, 'diag', 1. / value, np.zeros(1)
+    if node.op_type == 'MatMul':
+        W = constant(node.input[1])
+        if W is None or W.ndim != 2:
+            return None
+        return (node.input[0], 'matrix', W.astype(np.float64),
+                np.zeros(W.shape[1]))
+    if node.op_type == 'Gemm':
+        atts = _attributes(node)
+        B = constant(node.input[1])
+        if atts.get('transA', 0) or B is None or B.ndim != 2:
+            return None
+        A = B.T if atts.get('transB', 0) else B
+        A = A.astype(np.float64) * atts.get('alpha', 1.)
+        if len(node.input) < 3 or not node.input[2]:
+            return node.input[0], 'matrix', A, np.zeros(A.shape[1])
+        C = constant(node.input[2])
+        if C is None:
+            return None
+        b = _feature_vector(C)
+        if b is None or b.size not in (1, A.shape[1]):
+            return None
+        b = np.broadcast_to(b * atts.get('beta', 1.), (A.shape[1], ))
+        return node.input[0], 'matrix', A, b
+    return None
+
+
+def _linear_model(node):
+    """
+    Returns ``(x, A, b)`` if a node is a *LinearClassifier* or
+    a *LinearRegressor* computing scores ``x @ A + b``.
+    """
+    if node.domain != 'ai.onnx.ml' or node.op_type not in (
+            'LinearClassifier', 'LinearRegressor'):
+        return None
+    atts = _attributes(node)
+    coef = np.array(atts.get('coefficients', []), dtype=np.float64)
+    if node.op_type == 'LinearClassifier':
+        b = np.array(atts.get('intercepts', []), dtype=np.float64)
+        K = len(b)
+    else:
+        K = atts.get('targets', 1)
+        b = np.array(atts.get('intercepts', [0.] * K), dtype=np.float64)
+    if K == 0 or len(b) != K or coef.size == 0 or coef.size % K != 0:
+        return None
+    return node.input[0], coef.reshape((K, -1)).T, b
+
+
+def _broadcast_shape(shapes):
+    "Returns the shape of a broadcast result or None if it is unknown."
+    if any(shape is None for shape in shapes):
+        return None
+    rank = max(len(shape) for shape in shapes)
+    result = []
+    for dims in zip(*[[1] * (rank - len(shape)) + list(shape)
+                      for shape in shapes]):
+        known = set(d for d in dims if d is not None and d != 1)
+        if len(known) > 1:
+            return None
+        if known:
+            result.append(known.pop())
+        else:
+            result.append(1 if all(d == 1 for d in dims) else None)
+    return result
+
+
+def _types_and_shapes(container):
+    """
+    Infers the element type and the shape of the names the nodes
+    of an affine chain may read. A shape is a list of dimensions,
+    None for an unknown dimension.
+    """
+    types = {}
+    shapes = {}
+    values = {}
+    for value in container.inputs:
+        if value.type.HasField('tensor_type'):
+            types[value.name] = value.type.tensor_type.elem_type
+            if value.type.tensor_type.HasField('shape'):
+                shapes[value.name] = [
+                    d.dim_value if d.dim_value > 0 else None
+                    for d in value.type.tensor_type.shape.dim]
+    for init in container.initializers:
+        types[init.name] = init.data_type
+        shapes[init.name] = list(init.dims)
+        values[init.name] = init
+    for node in container.nodes:
+        if not node.input or not node.output:
+            continue
+        name, out = node.input[0], node.output[0]
+        shape = shapes.get(name, None)
+        if node.op_type == 'Scaler':
+            types[out] = TP.FLOAT
+        elif node.op_type == 'Cast':
+            types[out] = _cast_to(node)
+        elif node.op_type in ('Add', 'Sub', 'Mul', 'Div', 'Identity',
+                              'MatMul', 'Gemm', 'ArrayFeatureExtractor',
+                              'Concat', 'Reshape'):
+            if name in types:
+                types[out] = types[name]
+        else:
+            continue
+        if node.op_type in ('Add', 'Sub', 'Mul', 'Div'):
+            shape = _broadcast_shape([shapes.get(i, None)
+                                      for i in node.input])
+        elif node.op_type == 'MatMul':
+            W = shapes.get(node.input[-1], None)
+            if shape is None or not shape or W is None or len(W) != 2:
+                shape = None
+            else:
+                shape = shape[:-1] + [W[1]]
+        elif node.op_type == 'Gemm':
+            atts = _attributes(node)
+            B = shapes.get(node.input[1], None)
+            if B is None or len(B) != 2:
+                shape = [None, None]
+            else:
+                shape = [shape[0] if shape and not atts.get('transA', 0)
+                         else None, B[0] if atts.get('transB', 0) else B[1]]
+        elif node.op_type == 'ArrayFeatureExtractor':
+            indices = shapes.get(node.input[1], None)
+            if shape is None or not shape or node.input[1] not in values:
+                shape = None
+            else:
+                shape = shape[:-1] + [int(np.prod(indices))]
+        elif node.op_type == 'Concat':
+            parts = [shapes.get(i, None) for i in node.input]
+            axis = _attributes(node).get('axis', None)
+            if (shape is None or axis is None or
+                    any(p is None or len(p) != len(shape) for p in parts)):
+                shape = None
+            else:
+                axis = axis % len(shape)
+                dims = [p[axis] for p in parts]
+                shape = list(shape)
+                shape[axis] = (None if None in dims else sum(dims))
+        elif node.op_type == 'Reshape':
+            if len(node.input) > 1:
+                target = (numpy_helper.to_array(values[node.input[1]])
+                          .tolist() if node.input[1] in values else None)
+            else:
+                target = _attributes(node).get('shape', None)
+            shape = None if target is None else [
+                (None if shape is None or i >= len(shape) else shape[i])
+                if d == 0 else (d if d > 0 else None)
+                for i, d in enumerate(target)]
+        if shape is not None:
+            shapes[out] = shape
+    return types, shapes
+
+
+def _unique_name(names, seed):
+    name = seed
+    i = 1
+    while name in names:
+        name = '{}{}'.format(seed, i)
+        i += 1
+    names.add(name)
+    return name
+
+
+def fuse_affine(container):
+    """
+    Merges chains of affine nodes (*Scaler*, *Add*, *Sub*, *Mul*,
+    *Div* by a constant, *MatMul* and *Gemm* with constant weights)
+    into the last one if it is a *LinearClassifier*,
+    a *LinearRegressor*, a *MatMul* or a *Gemm*.
+    The coefficients are composed in double at conversion time,
+    a pipeline *StandardScaler*, *PCA*, *LogisticRegression* becomes
+    a single *LinearClassifier*. A matrix multiplication is not merged
+    if the composed matrix needs more multiplications than both.
+    Every intermediate result must be used only by the next node.
+    """
+    info = _GraphInfo(container)
+    types, shapes = _types_and_shapes(container)
+    names = set(info.inputs) | set(info.initializers) | set(info.producers)
+    removed = 0
+    for node in list(reversed(container.nodes)):
+        if id(node) in info.removed:
+            continue
+        model = _linear_model(node)
+        if model is None:
+            aff = _affine(node, info, shapes)
+            if aff is None or node.op_type == 'Scaler':
+                continue
+            if aff[1] == 'diag':
+                # It is only merged with a matrix multiplication.
+                previous = info.producers.get(aff[0], None)
+                before = (None if previous is None
+                          else _affine(previous, info, shapes))
+                if before is None or before[1] != 'matrix':
+                    continue
+                K = before[2].shape[1]
+                if aff[2].size not in (1, K) or aff[3].size not in (1, K):
+                    continue
+                aff = (aff[0], 'matrix',
+                       np.diag(np.broadcast_to(aff[2], (K, ))),
+                       np.broadcast_to(aff[3], (K, )))
+            model = aff[0], aff[2], aff[3]
+        x, A, b = model
+
+        chain = []
+        has_scaler = False
+        while x not in info.protected and x in info.producers:
+            previous = info.producers[x]
+            consumers = [n for n in info.consumers.get(x, [])
+                         if id(n) not in info.removed]
+            if len(consumers) != 1 or id(previous) in info.removed:
+                break
+            aff = _affine(previous, info, shapes)
+            if aff is None:
+                break
+            px, kind, pA, pb = aff
+            C = A.shape[0]
+            if kind == 'diag':
+                if pA.size not in (1, C) or pb.size not in (1, C):
+                    break
+                b = b + np.broadcast_to(pb, (C, )) @ A
+                A = np.broadcast_to(pA, (C, ))[:, np.newaxis] * A
+            else:
+                if pA.shape[1] != C or pA.shape[0] * A.shape[1] > (
+                        pA.shape[0] * C + C * A.shape[1]):
+                    break
+                b = b + pb @ A
+                A = pA @ A
+            has_scaler |= previous.op_type == 'Scaler'
+            chain.append(previous)
+            x = px
+        if not chain:
+            continue
+
+        if node.op_type in ('LinearClassifier', 'LinearRegressor'):
+            atts = _attributes(node)
+            atts['coefficients'] = A.T.ravel().tolist()
+            atts['intercepts'] = b.tolist()
+            _set_attributes(node, **atts)
+            info.set_input(node, 0, x)
+        else:
+            # A Scaler always produces floats, the matrix must have
+            # the type of the chain input.
+            elem_type = [info.initializers[name].data_type
+                         for name in node.input
+                         if name in info.initializers][0]
+            if (container.target_opset < 7 or types.get(
+                    x, None if has_scaler else elem_type) != elem_type):
+                continue
+            gemm = len(shapes.get(x, [])) == 2
+            bias = bool(np.any(b))
+            if not gemm and bias and len(chain) < 2:
+                # MatMul + Add would replace two nodes.
+                continue
+            dtype = TENSOR_TYPE_TO_NP_TYPE[elem_type]
+            A_name = _unique_name(names, node.output[0] + '_A')
+            b_name = _unique_name(names, node.output[0] + '_b')
+            for name, value in [(A_name, A), (b_name, b)]:
+                if name == b_name and not bias:
+                    continue
+                init = numpy_helper.from_array(value.astype(dtype), name)
+                container.initializers.append(init)
+                info.initializers[name] = init
+            for name in node.input:
+                info.consumers[name] = [n for n in info.consumers[name]
+                                        if n is not node]
+            # Gemm and Add broadcast the bias since opset 7.
+            container.node_domain_version_pair_sets.add(('', 7))
+            del node.attribute[:]
+            del node.input[:]
+            if not bias:
+                node.op_type = 'MatMul'
+                node.input.extend([x, A_name])
+            elif gemm:
+                node.op_type = 'Gemm'
+                node.input.extend([x, A_name, b_name])
+            else:
+                mul_name = _unique_name(names, node.output[0] + '_mul')
+                matmul = helper.make_node(
+                    'MatMul', [x, A_name], [mul_name],
+                    name=_unique_name(names, node.name + '_MatMul'))
+                container.nodes.insert(container.nodes.index(node), matmul)
+                info.producers[mul_name] = matmul
+                info.consumers.setdefault(x, []).append(matmul)
+                node.op_type = 'Add'
+                node.input.extend([mul_name, b_name])
+                removed -= 1
+            for name in node.input:
+                info.consumers.setdefault(name, []).append(node)
+        for previous in chain:
+            removed += info.remove_if_unused(previous)
+    info.commit(container)
+    return removed
+
+
+def _single_use(name, info):
+    "Tells if a name is read by one node only and can be removed."
+    return name not in info.protected and len(
+        [n for n in info.consumers.get(name, [])
+         if id(n) not in info.removed]) == 1
+
+
+def _one_hot_columns(name, info, types):
+    """
+    Returns ``(nodes, columns)`` if *name* is the output of the
+    converter for *OneHotEncoder*, a *Reshape* of the concatenated
+    *OneHotEncoder* nodes, one per column. *columns* is a list of
+    ``(key name, categories)``, *nodes* are the nodes which can be
+    removed once the output is not used anymore.
+    """
+    nodes = []
+    node = info.producers.get(name, None)
+    if (node is None or not _is_onnx_op(node, 'Reshape') or
+            not _single_use(name, info)):
+        return None
+    shape = _reshape_shape(node, info)
+    if shape is None or len(shape) != 2:
+        return None
+    nodes.append(node)
+    name = node.input[0]
+    node = info.producers.get(name, None)
+    if node is not None and _is_onnx_op(node, 'Cast'):
+        if not _single_use(name, info):
+            return None
+        nodes.append(node)
+        name = node.input[0]
+        node = info.producers.get(name, None)
+    if (node is None or not _is_onnx_op(node, 'Concat') or
+            _attributes(node).get('axis', None) != 2 or
+            not _single_use(name, info)):
+        return None
+    nodes.append(node)
+
+    columns = []
+    for name in node.input:
+        ohe = info.producers.get(name, None)
+        if (ohe is None or ohe.domain != 'ai.onnx.ml' or
+                ohe.op_type != 'OneHotEncoder' or
+                not _single_use(name, info)):
+            return None
+        atts = _attributes(ohe)
+        if atts.get('zeros', 1) != 1:
+            # An unknown category must raise an error.
+            return None
+        if 'cats_int64s' in atts:
+            cats = np.array(atts['cats_int64s'], dtype=np.int64)
+            elem_type = TP.INT64
+        else:
+            cats = np.array(atts.get('cats_strings', []), dtype=np.object_)
+            elem_type = TP.STRING
+        if len(cats) == 0 or types.get(ohe.input[0], None) != elem_type:
+            return None
+        nodes.append(ohe)
+        columns.append((ohe.input[0], cats))
+    if shape[1] != sum(len(cats) for _, cats in columns):
+        return None
+    return nodes, columns
+
+
+def fuse_one_hot(container):
+    """
+    Replaces the product of one hot encoded columns by the
+    coefficients of a *LinearClassifier* or a *LinearRegressor*
+    with a lookup of precomputed rows. Every category is mapped to
+    the index of a row with *LabelEncoder*, the rows are retrieved
+    with one *Gather* and summed with *ReduceSum*. The cost no longer
+    depends on the number of categories. The linear model only keeps
+    the coefficients of the other features and an identity matrix
+    for the summed rows. Unknown categories are mapped to a null row,
+    the encoder is only replaced if it is built with ``zeros=1``
+    (*handle_unknown* is ``'ignore'``). It requires opset 9.
+    """
+    if container.target_opset < 9:
+        return 0
+    info = _GraphInfo(container)
+    types, _ = _types_and_shapes(container)
+    names = (set(info.inputs) | set(info.initializers) |
+             set(info.producers) | set(n.name for n in container.nodes))
+    removed = 0
+    for node in list(reversed(container.nodes)):
+        if id(node) in info.removed:
+            continue
+        model = _linear_model(node)
+        if model is None:
+            continue
+        x, A, b = model
+        C, K = A.shape
+
+        nodes = []
+        concat = info.producers.get(x, None)
+        if (concat is not None and _is_onnx_op(concat, 'Concat') and
+                _attributes(concat).get('axis', None) in (1, -1) and
+                _single_use(x, info)):
+            parts = list(concat.input)
+            nodes.append(concat)
+        else:
+            parts = [x]
+        blocks = [_one_hot_columns(part, info, types) for part in parts]
+        others = [part for part, block in zip(parts, blocks)
+                  if block is None]
+        width = sum(len(cats) for block in blocks if block is not None
+                    for _, cats in block[1])
+        if (len(others) == len(parts) or len(others) > 1 or
+                width <= K or width > C or (width < C) != bool(others) or
+                (others and types.get(others[0], None) != TP.FLOAT)):
+            continue
+
+        # Rows of the coefficients, every column gets an additional
+        # null row for unknown categories.
+        rows = []
+        rest = None
+        lookups = []
+        offset = 0
+        for part, block in zip(parts, blocks):
+            if block is None:
+                rest = A[offset: offset + C - width]
+                offset += C - width
+                continue
+            nodes.extend(block[0])
+            for key, cats in block[1]:
+                first = sum(len(r) for r in rows)
+                rows.append(A[offset: offset + len(cats)])
+                rows.append(np.zeros((1, K)))
+                offset += len(cats)
+                lookups.append((key, cats, first))
+
+        new_nodes = []
+
+        def add_node(op_type, inputs, seed, domain='', **kwargs):
+            output = _unique_name(names, seed)
+            new_nodes.append(helper.make_node(
+                op_type, inputs, [output], domain=domain,
+                name=_unique_name(names, output + '_' + op_type),
+                **kwargs))
+            return output
+
+        indices = []
+        for key, cats, first in lookups:
+            values = np.arange(len(cats)) + first
+            if cats.dtype == np.int64:
+                # int64 -> int64 is not implemented by every runtime.
+                index = add_node(
+                    'LabelEncoder', [key], key + '_index', 'ai.onnx.ml',
+                    keys_int64s=cats, values_floats=values.astype(float),
+                    default_float=float(first + len(cats)))
+                index = add_node('Cast', [index], key + '_index_int',
+                                 to=TP.INT64)
+            else:
+                index = add_node(
+                    'LabelEncoder', [key], key + '_index', 'ai.onnx.ml',
+                    keys_strings=list(cats), values_int64s=values,
+                    default_int64=first + len(cats))
+            indices.append(index)
+        table = _unique_name(names, 'one_hot_rows')
+        shape = _unique_name(names, 'one_hot_shape')
+        for name, value in [(table, np.vstack(rows).astype(np.float32)),
+                            (shape, np.array([-1, K], dtype=np.int64))]:
+            init = numpy_helper.from_array(value, name)
+            container.initializers.append(init)
+            info.initializers[name] = init
+        # The shape LabelEncoder infers is wrong, indices cannot be
+        # concatenated, every column has its own Gather.
+        gathered = [add_node('Gather', [table, index], index + '_row')
+                    for index in indices]
+        if len(gathered) > 1:
+            gathered = [add_node('Sum', gathered, 'one_hot_sum')]
+        new_x = add_node('Reshape', [gathered[0], shape], 'one_hot_scores')
+        if rest is None:
+            A = np.identity(K)
+        else:
+            new_x = add_node('Concat', [others[0], new_x],
+                             'one_hot_features', axis=1)
+            A = np.vstack([rest, np.identity(K)])
+
+        position = container.nodes.index(node)
+        container.nodes[position:position] = new_nodes
+        for new_node in new_nodes:
+            info.producers[new_node.output[0]] = new_node
+            for name in new_node.input:
+                info.consumers.setdefault(name, []).append(new_node)
+        atts = _attributes(node)
+        atts['coefficients'] = A.T.ravel().tolist()
+        _set_attributes(node, **atts)
+        info.set_input(node, 0, new_x)
+        for previous in nodes:
+            removed += info.remove_if_unused(previous)
+        removed -= len(new_nodes)
+        container.node_domain_version_pair_sets.add(('ai.onnx.ml', 2))
+        container.node_domain_version_pair_sets.add(('', 9))
+    info.commit(container)
+    return removed
+
+
+def remove_unused_nodes(container):
+    """
+    Removes the nodes which do not contribute to any graph output,
+    the unused initializers and value info.
+    """
+    info = _GraphInfo(container)
+    used = set()
+    kept = set()
+    stack = list(info.protected)
+    while stack:
+        name = stack.pop()
+        if name in used:
+            continue
+        used.add(name)
+        node = info.producers.get(name, None)
+        if node is not None and id(node) not in kept:
+            kept.add(id(node))
+            stack.extend(node.input)
+    for node in container.nodes:
+        if id(node) not in kept:
+            info.remove(node)
+    container.initializers = [init for init in container.initializers
+                              if init.name in used or
+                              init.name in info.inputs]
+    container.value_info = [value for value in container.value_info
+                            if value.name in used]
+    return info.commit(container)
+
+
+# Passes run by default, in that order.
+default_passes = OrderedDict([
+    ('identity', eliminate_identity),
+    ('reshape', fold_reshape),
+    ('cast', collapse_cast),
+    ('constant', fold_constants),
+    ('affine', fuse_affine),
+    ('one_hot', fuse_one_hot),
+    ('dead_nodes', remove_unused_nodes),
+])
+
+
+def optimize_container(container, passes=None, max_iter=100):
+    """
+    Runs optimization passes on a container until none of them
+    changes the number of nodes.
+
+    :param container: :class:`ModelComponentContainer
+        <skl2onnx.common._container.ModelComponentContainer>`
+    :param passes: None for all passes in *default_passes* or
+        a list of pass names or functions
+        ``fct(container) -> number of removed nodes``
+    :param max_iter: maximum number of times every pass is run
+    :return: dictionary ``{ pass name: number of removed nodes }``,
+        it is negative if a pass added more nodes than it removed
+    """
+    if passes is None:
+        passes = list(default_passes)
+    named = []
+    for p in passes:
+        if callable(p):
+            named.append((p.__name__, p))
+        elif p in default_passes:
+            named.append((p, default_passes[p]))
+        else:
+            raise ValueError("Unknown optimization pass '{}', it must be "
+                             "a function or one of {}.".format(
+                                 p, list(default_passes)))
+
+    report = OrderedDict((name, 0) for name, _ in named)
+    for _ in range(max_iter):
+        changed = False
+        for name, fct in named:
+            n = fct(container)
+            report[name] += n
+            # A pass may add more nodes than it removes.
+            changed |= n != 0
+        if not changed:
+            break
+    return report
@@ -0,0 +1,196 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+"""
+Reference implementation with *numpy* of the common arithmetic
+and shape operators of the main domain, used to evaluate the nodes
+whose inputs are all constants at conversion time
+(see :func:`fold_constants <skl2onnx.common._optimize.fold_constants>`).
+Only the versions of the operators up to opset 11 are implemented.
+"""
+import numpy as np
+from onnx import helper, numpy_helper
+from onnx import onnx_pb as onnx_proto
+from onnx.mapping import TENSOR_TYPE_TO_NP_TYPE
+
+
+def _attributes(node):
+    return {att.name: helper.get_attribute_value(att)
+            for att in node.attribute}
+
+
+def _same_type(fct):
+    "Element wise operators keep the type of their first input."
+    def op(node, a, *args):
+        return np.asarray(fct(a, *args)).astype(a.dtype)
+    return op
+
+
+def _div(node, a, b):
+    if np.issubdtype(a.dtype, np.integer):
+        # Integer division truncates towards zero.
+        q = np.abs(a) // np.abs(b)
+        return (q * np.sign(a) * np.sign(b)).astype(a.dtype)
+    return (a / b).astype(a.dtype)
+
+
+def _cast(node, a):
+    to = _attributes(node)['to']
+    if to == onnx_proto.TensorProto.STRING or isinstance(to, bytes):
+        return None
+    return a.astype(TENSOR_TYPE_TO_NP_TYPE[to])
+
+
+def _concat(node, *args):
+    return np.concatenate(args, axis=_attributes(node)['axis'])
+
+
+def _flatten(node, a):
+    axis = _attributes(node).get('axis', 1)
+    if axis < 0:
+        axis += a.ndim
+    first = int(np.prod(a.shape[:axis]))
+    return a.reshape((first, -1) if a.size else (first, 0))
+
+
+def _gather(node, a, indices):
+    return np.take(a, indices, axis=_attributes(node).get('axis', 0))
+
+
+def _gemm(node, a, b, c=None):
+    atts = _attributes(node)
+    if atts.get('transA', 0):
+        a = a.T
+    if atts.get('transB', 0):
+        b = b.T
+    res = atts.get('alpha', 1.) * np.dot(a, b)
+    if c is not None:
+        res = res + atts.get('beta', 1.) * c
+    return res.astype(a.dtype)
+
+
+def _reduce(fct):
+    def op(node, a):
+        atts = _attributes(node)
+        axes = atts.get('axes', None)
+        return fct(a, axis=None if axes is None else tuple(axes),
+                   keepdims=atts.get('keepdims', 1) == 1).astype(a.dtype)
+    return op
+
+
+def _reshape(node, a, shape=None):
+    if shape is None:
+        shape = _attributes(node)['shape']
+    shape = [a.shape[i] if s == 0 else s for i, s in enumerate(shape)]
+    return a.reshape(shape)
+
+
+def _shape(node, a):
+    return np.array(a.shape, dtype=np.int64)
+
+
+def _slice(node, a, starts=None, ends=None, axes=None, steps=None):
+    if starts is None:
+        atts = _attributes(node)
+        starts, ends = atts['starts'], atts['ends']
+        axes = atts.get('axes', None)
+    if axes is None:
+        axes = range(len(starts))
+    if steps is None:
+        steps = [1] * len(starts)
+    index = [slice(None)] * a.ndim
+    for start, end, axis, step in zip(starts, ends, axes, steps):
+        index[axis] = slice(start, end, step)
+    return a[tuple(index)]
+
+
+def _squeeze(node, a):
+    axes = _attributes(node).get('axes', None)
+    return np.squeeze(a, axis=None if axes is None else tuple(axes))
+
+
+def _transpose(node, a):
+    return np.transpose(a, axes=_attributes(node).get('perm', None))
+
+
+def _unsqueeze(node, a):
+    axes = _attributes(node)['axes']
+    # Negative axes refer to the output dimensions.
+    axes = sorted(ax + a.ndim + len(axes) if ax < 0 else ax for ax in axes)
+    for axis in axes:
+        a = np.expand_dims(a, axis)
+    return a
+
+
+# Implemented operators, every function takes the node
+# and the input values and returns the output or None
+# if it cannot be computed.
+reference_ops = {
+    'Abs': _same_type(np.abs),
+    'Add': _same_type(np.add),
+    'Cast': _cast,
+    'Concat': _concat,
+    'Div': _div,
+    'Exp': _same_type(np.exp),
+    'Flatten': _flatten,
+    'Gather': _gather,
+    'Gemm': _gemm,
+    'Identity': lambda node, a: a,
+    'Log': _same_type(np.log),
+    'MatMul': _same_type(np.matmul),
+    'Mul': _same_type(np.multiply),
+    'Neg': _same_type(np.negative),
+    'Pow': _same_type(np.power),
+    'Reciprocal': _same_type(np.reciprocal),
+    'ReduceMax': _reduce(np.max),
+    'ReduceMean': _reduce(np.mean),
+    'ReduceMin': _reduce(np.min),
+    'ReduceProd': _reduce(np.prod),
+    'ReduceSum': _reduce(np.sum),
+    'Reshape': _reshape,
+    'Shape': _shape,
+    'Slice': _slice,
+    'Sqrt': _same_type(np.sqrt),
+    'Squeeze': _squeeze,
+    'Sub': _same_type(np.subtract),
+    'Transpose': _transpose,
+    'Unsqueeze': _unsqueeze,
+}
+
+
+def run_reference_op(node, inputs):
+    """
+    Computes the output of a node of the main domain.
+
+    :param node: *NodeProto*
+    :param inputs: list of numpy arrays
+    :return: numpy array or None if the operator is not
+        implemented or cannot be computed
+    """
+    if node.domain not in ('', 'ai.onnx') or len(node.output) != 1:
+        return None
+    fct = reference_ops.get(node.op_type, None)
+    if fct is None:
+        return None
+    if any(a is not None and a.dtype == np.object_
+           for a in inputs) and node.op_type not in (
+            'Concat', 'Flatten', 'Gather', 'Identity', 'Reshape', 'Shape',
+            'Slice', 'Squeeze', 'Transpose', 'Unsqueeze'):
+        return None
+    with np.errstate(all='ignore'):
+        return fct(node, *inputs)
+
+
+def to_tensor(name, value):
+    """
+    Converts a numpy array into a *TensorProto*,
+    strings are stored as bytes.
+    """
+    if value.dtype == np.object_:
+        vals = [v if isinstance(v, bytes) else str(v).encode('utf-8')
+                for v in value.ravel()]
+        return helper.make_tensor(name, onnx_proto.TensorProto.STRING,
+                                  value.shape, vals)
+    return numpy_helper.from_array(value, name)
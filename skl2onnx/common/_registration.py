@@ -4,6 +4,8 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import importlib
+
 # This dictionary defines the converters which can be invoked in the
 # conversion framework defined in _topology.py. A key in this dictionary
 # is an operator's unique ID (e.g., string and type) while the
@@ -18,6 +20,207 @@ _converter_pool = {}
 # shape(s) for the operator specified by the key.
 _shape_calculator_pool = {}
 
+# Static manifest of the converters and shape calculators implemented
+# in this package: operator name and the module of subpackage
+# *operator_converters* or *shape_calculators* which registers it.
+# A module is imported the first time one of its operators is needed.
+_converter_modules = {
+    'SklearnAdaBoostClassifier': 'ada_boost',
+    'SklearnAdaBoostRegressor': 'ada_boost',
+    'SklearnArrayFeatureExtractor': 'array_feature_extractor',
+    'SklearnBaggingClassifier': 'bagging',
+    'SklearnBaggingRegressor': 'bagging',
+    'SklearnBayesianGaussianMixture': 'gaussian_mixture',
+    'SklearnBernoulliNB': 'naive_bayes',
+    'SklearnBinarizer': 'binariser',
+    'SklearnCalibratedClassifierCV': 'calibrated_classifier_cv',
+    'SklearnComplementNB': 'naive_bayes',
+    'SklearnConcat': 'concat_op',
+    'SklearnCountVectorizer': 'text_vectoriser',
+    'SklearnDecisionTreeClassifier': 'decision_tree',
+    'SklearnDecisionTreeRegressor': 'decision_tree',
+    'SklearnDictVectorizer': 'dict_vectoriser',
+    'SklearnExtraTreeClassifier': 'decision_tree',
+    'SklearnExtraTreeRegressor': 'decision_tree',
+    'SklearnExtraTreesClassifier': 'random_forest',
+    'SklearnExtraTreesRegressor': 'random_forest',
+    'SklearnFlatten': 'flatten_op',
+    'SklearnFunctionTransformer': 'function_transformer',
+    'SklearnGaussianMixture': 'gaussian_mixture',
+    'SklearnGaussianNB': 'naive_bayes',
+    'SklearnGaussianProcessRegressor': 'gaussian_process',
+    'SklearnGenericUnivariateSelect': 'feature_selection',
+    'SklearnGradientBoostingClassifier': 'gradient_boosting',
+    'SklearnGradientBoostingRegressor': 'gradient_boosting',
+    'SklearnGridSearchCV': 'grid_search_cv',
+    'SklearnImputer': 'imputer_op',
+    'SklearnIncrementalPCA': 'decomposition',
+    'SklearnKBinsDiscretizer': 'k_bins_discretiser',
+    'SklearnKMeans': 'k_means',
+    'SklearnKNeighborsClassifier': 'nearest_neighbours',
+    'SklearnKNeighborsRegressor': 'nearest_neighbours',
+    'SklearnLabelBinarizer': 'label_binariser',
+    'SklearnLabelEncoder': 'label_encoder',
+    'SklearnLinearClassifier': 'linear_classifier',
+    'SklearnLinearRegressor': 'linear_regressor',
+    'SklearnLinearSVC': 'linear_classifier',
+    'SklearnLinearSVR': 'linear_regressor',
+    'SklearnMLPClassifier': 'multilayer_perceptron',
+    'SklearnMLPRegressor': 'multilayer_perceptron',
+    'SklearnMaxAbsScaler': 'scaler_op',
+    'SklearnMinMaxScaler': 'scaler_op',
+    'SklearnMiniBatchKMeans': 'k_means',
+    'SklearnMultinomialNB': 'naive_bayes',
+    'SklearnMultiply': 'multiply_op',
+    'SklearnNearestNeighbors': 'nearest_neighbours',
+    'SklearnNormalizer': 'normaliser',
+    'SklearnOneClassSVM': 'support_vector_machines',
+    'SklearnOneHotEncoder': 'one_hot_encoder',
+    'SklearnOneVsRestClassifier': 'one_vs_rest_classifier',
+    'SklearnOrdinalEncoder': 'ordinal_encoder',
+    'SklearnPCA': 'decomposition',
+    'SklearnPLSRegression': 'cross_decomposition',
+    'SklearnPolynomialFeatures': 'polynomial_features',
+    'SklearnRANSACRegressor': 'ransac_regressor',
+    'SklearnRFE': 'feature_selection',
+    'SklearnRFECV': 'feature_selection',
+    'SklearnRandomForestClassifier': 'random_forest',
+    'SklearnRandomForestRegressor': 'random_forest',
+    'SklearnRobustScaler': 'scaler_op',
+    'SklearnSGDClassifier': 'sgd_classifier',
+    'SklearnSVC': 'support_vector_machines',
+    'SklearnSVR': 'support_vector_machines',
+    'SklearnScaler': 'scaler_op',
+    'SklearnSelectFdr': 'feature_selection',
+    'SklearnSelectFpr': 'feature_selection',
+    'SklearnSelectFromModel': 'feature_selection',
+    'SklearnSelectFwe': 'feature_selection',
+    'SklearnSelectKBest': 'feature_selection',
+    'SklearnSelectPercentile': 'feature_selection',
+    'SklearnSimpleImputer': 'imputer_op',
+    'SklearnTfidfTransformer': 'tfidf_transformer',
+    'SklearnTfidfVectorizer': 'tfidf_vectoriser',
+    'SklearnTruncatedSVD': 'decomposition',
+    'SklearnVarianceThreshold': 'feature_selection',
+    'SklearnVotingClassifier': 'voting_classifier',
+    'SklearnVotingRegressor': 'voting_regressor',
+    'SklearnZipMap': 'zip_map',
+}
+
+_shape_calculator_modules = {
+    'SklearnAdaBoostClassifier': 'linear_classifier',
+    'SklearnAdaBoostRegressor': 'linear_regressor',
+    'SklearnArrayFeatureExtractor': 'array_feature_extractor',
+    'SklearnBaggingClassifier': 'linear_classifier',
+    'SklearnBaggingRegressor': 'linear_regressor',
+    'SklearnBayesianGaussianMixture': 'mixture',
+    'SklearnBernoulliNB': 'linear_classifier',
+    'SklearnBinarizer': 'imputer',
+    'SklearnCalibratedClassifierCV': 'linear_classifier',
+    'SklearnComplementNB': 'linear_classifier',
+    'SklearnConcat': 'concat',
+    'SklearnCountVectorizer': 'text_vectorizer',
+    'SklearnDecisionTreeClassifier': 'linear_classifier',
+    'SklearnDecisionTreeRegressor': 'linear_regressor',
+    'SklearnDictVectorizer': 'dict_vectorizer',
+    'SklearnExtraTreeClassifier': 'linear_classifier',
+    'SklearnExtraTreeRegressor': 'linear_regressor',
+    'SklearnExtraTreesClassifier': 'linear_classifier',
+    'SklearnExtraTreesRegressor': 'linear_regressor',
+    'SklearnFlatten': 'flatten',
+    'SklearnFunctionTransformer': 'function_transformer',
+    'SklearnGaussianMixture': 'mixture',
+    'SklearnGaussianNB': 'linear_classifier',
+    'SklearnGaussianProcessRegressor': 'gaussian_process',
+    'SklearnGenericUnivariateSelect': 'concat',
+    'SklearnGradientBoostingClassifier': 'linear_classifier',
+    'SklearnGradientBoostingRegressor': 'linear_regressor',
+    'SklearnGridSearchCV': 'grid_search_cv',
+    'SklearnImputer': 'imputer',
+    'SklearnIncrementalPCA': 'svd',
+    'SklearnKBinsDiscretizer': 'k_bins_discretiser',
+    'SklearnKMeans': 'k_means',
+    'SklearnKNeighborsClassifier': 'linear_classifier',
+    'SklearnKNeighborsRegressor': 'linear_regressor',
+    'SklearnLabelBinarizer': 'label_binariser',
+    'SklearnLabelEncoder': 'label_encoder',
+    'SklearnLinearClassifier': 'linear_classifier',
+    'SklearnLinearRegressor': 'linear_regressor',
+    'SklearnLinearSVC': 'linear_classifier',
+    'SklearnLinearSVR': 'linear_regressor',
+    'SklearnMLPClassifier': 'linear_classifier',
+    'SklearnMLPRegressor': 'linear_regressor',
+    'SklearnMaxAbsScaler': 'scaler',
+    'SklearnMinMaxScaler': 'scaler',
+    'SklearnMiniBatchKMeans': 'k_means',
+    'SklearnMultinomialNB': 'linear_classifier',
+    'SklearnMultiply': 'concat',
+    'SklearnNearestNeighbors': 'nearest_neighbours',
+    'SklearnNormalizer': 'scaler',
+    'SklearnOneClassSVM': 'support_vector_machines',
+    'SklearnOneHotEncoder': 'one_hot_encoder',
+    'SklearnOneVsRestClassifier': 'one_vs_rest_classifier',
+    'SklearnOrdinalEncoder': 'ordinal_encoder',
+    'SklearnPCA': 'svd',
+    'SklearnPLSRegression': 'cross_decomposition',
+    'SklearnPolynomialFeatures': 'polynomial_features',
+    'SklearnRANSACRegressor': 'linear_regressor',
+    'SklearnRFE': 'concat',
+    'SklearnRFECV': 'concat',
+    'SklearnRandomForestClassifier': 'linear_classifier',
+    'SklearnRandomForestRegressor': 'linear_regressor',
+    'SklearnRobustScaler': 'scaler',
+    'SklearnSGDClassifier': 'linear_classifier',
+    'SklearnSVC': 'support_vector_machines',
+    'SklearnSVR': 'support_vector_machines',
+    'SklearnScaler': 'scaler',
+    'SklearnSelectFdr': 'concat',
+    'SklearnSelectFpr': 'concat',
+    'SklearnSelectFromModel': 'concat',
+    'SklearnSelectFwe': 'concat',
+    'SklearnSelectKBest': 'concat',
+    'SklearnSelectPercentile': 'concat',
+    'SklearnSimpleImputer': 'imputer',
+    'SklearnTfidfTransformer': 'tfidf_transformer',
+    'SklearnTfidfVectorizer': 'text_vectorizer',
+    'SklearnTruncatedSVD': 'svd',
+    'SklearnVarianceThreshold': 'concat',
+    'SklearnVotingClassifier': 'voting_classifier',
+    'SklearnVotingRegressor': 'voting_regressor',
+    'SklearnZipMap': 'zip_map',
+}
+
+_loaded_modules = set()
+
+
+def _load_module(operator_name, modules, package):
+    """
+    Imports the module registering *operator_name* if
+    it was not imported yet.
+    """
+    name = modules.get(operator_name, None)
+    if name is None:
+        return
+    name = 'skl2onnx.%s.%s' % (package, name)
+    if name not in _loaded_modules:
+        _loaded_modules.add(name)
+        try:
+            importlib.import_module(name)
+        except Exception:
+            _loaded_modules.discard(name)
+            raise
+
+
+def load_all_converters():
+    """
+    Imports every module registering a converter or a shape
+    calculator implemented in this package.
+    """
+    for name in _converter_modules:
+        _load_module(name, _converter_modules, 'operator_converters')
+    for name in _shape_calculator_modules:
+        _load_module(name, _shape_calculator_modules, 'shape_calculators')
+
 
 def register_converter(operator_name, conversion_function, overwrite=False):
     """
@@ -30,6 +233,9 @@ def register_converter(operator_name, conversion_function, overwrite=False):
                       (i.e., conversion_function). Set this flag to True
                       to enable overwriting.
     """
+    # The converter implemented in this package is registered first
+    # so that it does not replace this one when it is loaded.
+    _load_module(operator_name, _converter_modules, 'operator_converters')
     if not overwrite and operator_name in _converter_pool:
         raise ValueError('We do not overwrite registered converter '
                          'by default')
@@ -37,6 +243,8 @@ def register_converter(operator_name, conversion_function, overwrite=False):
 
 
 def get_converter(operator_name):
+    if operator_name not in _converter_pool:
+        _load_module(operator_name, _converter_modules, 'operator_converters')
     if operator_name not in _converter_pool:
         msg = 'Unsupported conversion for operator %s (%d registered)' % (
             operator_name, len(_converter_pool))
@@ -56,6 +264,8 @@ def register_shape_calculator(operator_name, calculator_function,
                       (i.e., calculator_function). Set this flag to True
                       to enable overwriting.
     """
+    _load_module(operator_name, _shape_calculator_modules,
+                 'shape_calculators')
     if not overwrite and operator_name in _shape_calculator_pool:
         raise ValueError('We do not overwrite registrated shape calculator '
                          'by default')
@@ -63,6 +273,9 @@ def register_shape_calculator(operator_name, calculator_function,
 
 
 def get_shape_calculator(operator_name):
+    if operator_name not in _shape_calculator_pool:
+        _load_module(operator_name, _shape_calculator_modules,
+                     'shape_calculators')
     if operator_name not in _shape_calculator_pool:
         msg = 'Unsupported shape calculator for operator %s' % operator_name
         raise ValueError(msg)
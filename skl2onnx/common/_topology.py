@@ -4,8 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import heapq
+import os
 import re
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 import numpy as np
 from onnx import onnx_pb as onnx_proto
 from onnxconverter_common.data_types import (  # noqa
@@ -24,7 +28,9 @@ from ..proto.onnx_helper_modified import (
 from . import _registration
 from . import utils
 from .exceptions import MissingShapeCalculator, MissingConverter
-from ._container import ModelComponentContainer, _build_options
+from ._container import (
+    ModelComponentContainer, SubModelComponentContainer, _build_options
+)
 from .interface import OperatorBase
 type_fct = type
 
@@ -333,6 +339,12 @@ class Scope:
 
         # Create the variable
         variable = Variable(raw_name, onnx_name, self.name, type)
+        self._add_local_variable(variable, prepend)
+        return variable
+
+    def _add_local_variable(self, variable, prepend):
+        onnx_name = variable.onnx_name
+        raw_name = variable.raw_name
         self.variables[onnx_name] = variable
 
         if raw_name in self.variable_name_mapping:
@@ -343,7 +355,6 @@ class Scope:
                 self.variable_name_mapping[raw_name].insert(0, onnx_name)
         else:
             self.variable_name_mapping[raw_name] = [onnx_name]
-        return variable
 
     def declare_local_operator(self, type, raw_model=None):
         """
@@ -390,6 +401,98 @@ class Scope:
         return _build_options(model, self.options, default_values)
 
 
+class _ScopeRecorder:
+    """
+    Replaces a :class:`Scope` for a converter running in a worker
+    (see parameter *n_jobs* of :func:`convert_topology`).
+    Every requested name is a temporary token and every
+    declaration is delayed. Method :meth:`replay` then requests
+    the names to the original scope and declares the variables and
+    operators in the same order a sequential conversion does,
+    method :meth:`rename` replaces the tokens by the final names.
+    """
+
+    _token_pattern = re.compile('__par([0-9]+)_([0-9]+)__')
+
+    def __init__(self, scope, job):
+        """
+        :param scope: original scope
+        :param job: job index, it makes tokens unique among workers
+        """
+        self._scope = scope
+        self._job = job
+        self._log = []
+        self._names = {}
+
+    def __getattr__(self, name):
+        return getattr(self._scope, name)
+
+    def _new_token(self):
+        return '__par%d_%d__' % (self._job, len(self._log))
+
+    def get_unique_variable_name(self, seed):
+        if not isinstance(seed, str):
+            raise TypeError("Parameter seed must be a string not {}."
+                            "".format(type(seed)))
+        token = self._new_token()
+        self._log.append(('variable', seed, token, None))
+        return token
+
+    def get_unique_operator_name(self, seed):
+        token = self._new_token()
+        self._log.append(('operator', seed, token, None))
+        return token
+
+    def declare_local_variable(self, raw_name, type=None, prepend=False):
+        token = self._new_token()
+        variable = Variable(raw_name, token, self._scope.name, type)
+        self._log.append(('declare_variable', raw_name, token,
+                          (variable, prepend)))
+        return variable
+
+    def declare_local_operator(self, type, raw_model=None):
+        token = self._new_token()
+        operator = Operator(token, self._scope.name, type, raw_model,
+                            self._scope.target_opset, self._scope.dtype,
+                            scope_inst=self._scope)
+        self._log.append(('declare_operator', str(type), token, operator))
+        return operator
+
+    def replay(self):
+        """
+        Requests the final names and declares the delayed
+        variables and operators into the original scope.
+        """
+        scope = self._scope
+        for kind, seed, token, obj in self._log:
+            seed = self.rename(seed)
+            if kind in ('variable', 'declare_variable'):
+                name = scope.get_unique_variable_name(seed)
+            else:
+                name = scope.get_unique_operator_name(seed)
+            self._names[token] = name
+            if kind == 'declare_variable':
+                variable, prepend = obj
+                variable.raw_name = seed
+                variable.onnx_name = name
+                scope._add_local_variable(variable, prepend)
+            elif kind == 'declare_operator':
+                obj.onnx_name = name
+                scope.operators[name] = obj
+
+    def rename(self, name):
+        """
+        Replaces every token in *name* by its final name.
+        """
+        if '__par' not in name:
+            return name
+
+        def repl(match):
+            return self._names.get(match.group(0), match.group(0))
+
+        return self._token_pattern.sub(repl, name)
+
+
 class Topology:
     """
     Holds instances on :class:`Scope <skl2onnx.common._topology.Scope>` and
@@ -455,6 +558,20 @@ class Topology:
         # indirectly affects _infer_all_shapes and _prune functions.
         self.root_names = list()
 
+        # Order of the operators produced by the last complete call to
+        # topological_operator_iterator, the following calls replay it
+        # if the graph structure did not change.
+        self._operator_order = None
+
+        # Filled by convert_topology, it tells which nodes, initializers
+        # and value info every converter added (see reconvert_sklearn).
+        self.conversion_records = None
+        # Filled by convert_sklearn(..., intermediate=True).
+        self.operator_fingerprints = None
+        # Filled by convert_topology(..., optimize=True), number
+        # of nodes removed by every optimization pass.
+        self.optimization_report = None
+
         for k in self.custom_conversion_functions:
             if not callable(k):
                 raise TypeError("Keys in custom_conversion_functions must be "
@@ -531,48 +648,147 @@ class Topology:
             for variable in scope.variables.values():
                 yield variable
 
-    def topological_operator_iterator(self):
+    def topological_operator_iterator(self, before_collect=None):
         """
         This is an iterator of all operators in Topology object.
         Operators may be produced in a topological order. If you want to
         simply go though all operators without considering their
         topological structure, please use another function,
         unordered_operator_iterator.
+        The order produced by the previous call is replayed if it is
+        still valid for the current graph, the remaining operators
+        (declared since then or while iterating) are scheduled
+        by :meth:`_schedule_operators`.
+
+        :param before_collect: function called without argument before
+            the iterator looks for operators declared while iterating,
+            a caller declaring operators later than it receives
+            them must make the declarations in this function
         """
         self._initialize_graph_status_for_traversing()
+        order = []
+        for operator in self._replay_operator_order():
+            self._evaluate_operator(operator)
+            order.append(operator)
+            yield operator
+        for operator in self._schedule_operators(before_collect):
+            order.append(operator)
+            yield operator
+        self._operator_order = order
+
+    def _evaluate_operator(self, operator):
+        """
+        Marks an operator as evaluated and its outputs as fed.
+        """
+        # Check if over-writing problem occurs (i.e., multiple
+        # operators produce results on one variable).
+        for variable in operator.outputs:
+            # Throw an error if this variable has been treated as
+            # an output somewhere
+            if variable.is_fed:
+                raise RuntimeError(
+                    'One variable can only be '
+                    'assigned once: {}.'.format(variable))
+            # Mark this variable as filled
+            variable.is_fed = True
+        # Make this operator as handled
+        operator.is_evaluated = True
+
+    def _replay_operator_order(self):
+        """
+        Returns the order computed by the last complete call to
+        :meth:`topological_operator_iterator` without the operators
+        removed since then. It returns an empty list if an operator
+        was added or if the order is not topological anymore.
+        """
+        if self._operator_order is None:
+            return []
+        current = set(id(op) for op in self.unordered_operator_iterator())
+        order = [op for op in self._operator_order if id(op) in current]
+        if len(order) != len(current):
+            return []
+        produced = set()
+        for operator in order:
+            if not all(variable.is_fed or id(variable) in produced
+                       for variable in operator.inputs):
+                return []
+            for variable in operator.outputs:
+                if variable.is_fed or id(variable) in produced:
+                    return []
+                produced.add(id(variable))
+        return order
+
+    def _schedule_operators(self, before_collect=None):
+        """
+        Yields every operator not evaluated yet as soon as all its
+        inputs are fed (Kahn's algorithm). The order is the one
+        of successive passes over all operators sorted by priority
+        (``'tensorToLabel'`` and ``'tensorToProbabilityMap'`` last):
+        an operator becoming ready after the last produced one in that
+        order is produced in the same pass, otherwise in the next one.
+        Operators waiting for a variable are indexed by this variable,
+        every operator and every input is visited once.
+        Operators declared while iterating (converters usually declare
+        one for every sub-estimator) are collected at the end of
+        every pass.
+        """
         priorities = {
             'tensorToProbabilityMap': 2,
             'tensorToLabel': 1
         }
-        while not all(operator.is_evaluated for scope in self.scopes
-                      for operator in scope.operators.values()):
-            is_evaluation_happened = False
-            for operator in sorted(self.unordered_operator_iterator(),
-                                   key=lambda op: priorities[op.type]
-                                   if op.type in priorities else 0):
-                if (all(variable.is_fed for variable in operator.inputs)
-                        and not operator.is_evaluated):
-                    # Check if over-writing problem occurs (i.e., multiple
-                    # operators produce results on one variable).
-                    for variable in operator.outputs:
-                        # Throw an error if this variable has been treated as
-                        # an output somewhere
-                        if variable.is_fed:
-                            raise RuntimeError(
-                                'One variable can only be '
-                                'assigned once: {}.'.format(variable))
-                        # Mark this variable as filled
-                        variable.is_fed = True
-                    # Make this operator as handled
-                    operator.is_evaluated = True
-                    is_evaluation_happened = True
-                    # Send out an operator
-                    yield operator
-            # After scanning through the whole computational graph, at
-            # least one operator should be evaluated. If not, we need
-            # to terminate this procedure to avoid dead lock.
-            if not is_evaluation_happened:
-                break
+        consumers = {}
+        pending = {}
+        keys = {}
+        known = []
+        next_pass = []
+
+        def register(operator, key):
+            keys[id(operator)] = key
+            n_pending = 0
+            for variable in operator.inputs:
+                if not variable.is_fed:
+                    consumers.setdefault(id(variable), []).append(operator)
+                    n_pending += 1
+            pending[id(operator)] = n_pending
+            if n_pending == 0:
+                next_pass.append((key, operator))
+
+        def collect_new_operators():
+            if before_collect is not None:
+                before_collect()
+            for i, scope in enumerate(self.scopes):
+                if i == len(known):
+                    known.append(0)
+                if len(scope.operators) <= known[i]:
+                    continue
+                new_ops = islice(scope.operators.values(), known[i], None)
+                for j, operator in enumerate(new_ops, known[i]):
+                    if not operator.is_evaluated:
+                        register(operator,
+                                 (priorities.get(operator.type, 0), i, j))
+                known[i] = len(scope.operators)
+
+        collect_new_operators()
+        while next_pass:
+            current = next_pass
+            next_pass = []
+            heapq.heapify(current)
+            while current:
+                key, operator = heapq.heappop(current)
+                self._evaluate_operator(operator)
+                # Send out an operator
+                yield operator
+                for variable in operator.outputs:
+                    for consumer in consumers.pop(id(variable), []):
+                        pending[id(consumer)] -= 1
+                        if pending[id(consumer)] > 0:
+                            continue
+                        entry = (keys[id(consumer)], consumer)
+                        if entry[0] > key:
+                            heapq.heappush(current, entry)
+                        else:
+                            next_pass.append(entry)
+            collect_new_operators()
 
     def _check_structure(self):
         """
@@ -833,9 +1049,193 @@ class Topology:
         self._check_structure()
 
 
+def _get_converter(topology, operator, reused_parts=None):
+    """
+    Returns the converter for an operator.
+    """
+    if reused_parts and operator.onnx_name in reused_parts:
+        return _ReusedConverter(reused_parts[operator.onnx_name])
+    mtype = type(operator.raw_operator)
+    if mtype in topology.custom_conversion_functions:
+        return topology.custom_conversion_functions[mtype]
+    if operator.type in topology.custom_conversion_functions:
+        return topology.custom_conversion_functions[operator.type]
+    if hasattr(operator.raw_operator, "onnx_converter"):
+        return operator.raw_operator.onnx_converter()
+    # Convert the selected operator into some ONNX objects and
+    # save them into the container
+    try:
+        return _registration.get_converter(operator.type)
+    except ValueError:
+        raise MissingConverter(
+            "Unable to find converter for alias '{}' type "
+            "'{}'. You may raise an issue at "
+            "https://github.com/onnx/sklearn-onnx/issues."
+            "".format(operator.type,
+                      type(getattr(operator, 'raw_model', None))))
+
+
+class _ReusedConverter:
+    """
+    Converter copying the nodes, initializers and value info a
+    previous conversion produced for an operator which did not change
+    (see :func:`_extract_converted_parts`).
+    """
+
+    def __init__(self, parts):
+        self.parts = parts
+
+    def __call__(self, scope, operator, container):
+        nodes, initializers, value_info, pairs = self.parts
+        sub_container = SubModelComponentContainer(container)
+        for protos, dest in [(nodes, sub_container.nodes),
+                             (initializers, sub_container.initializers),
+                             (value_info, sub_container.value_info)]:
+            for proto in protos:
+                copy = type(proto)()
+                copy.CopyFrom(proto)
+                dest.append(copy)
+        sub_container.node_domain_version_pairs.extend(pairs)
+        container.merge(sub_container)
+
+
+class _ConversionRecord:
+    """
+    Remembers what the converter of one operator added to the main
+    container: ranges of nodes, initializers and value info and
+    the names of the operators it declared.
+    """
+
+    def __init__(self, container, scope):
+        self._start = (len(container.nodes), len(container.initializers),
+                       len(container.value_info), len(scope.operators))
+
+    def stop(self, container, scope):
+        start_node, start_init, start_info, start_op = self._start
+        self.nodes = (start_node, len(container.nodes))
+        self.initializers = (start_init, len(container.initializers))
+        self.value_info = (start_info, len(container.value_info))
+        self.children = list(scope.operators)[start_op:]
+        del self._start
+        return self
+
+
+def _extract_converted_parts(topology, onnx_model, names):
+    """
+    Extracts from a model converted from *topology* the nodes,
+    initializers and value info produced by some operators,
+    including the operators their converters declared.
+
+    :param topology: topology the model was converted from,
+        its attribute *conversion_records* must be filled
+    :param onnx_model: converted model, it must not have been
+        modified since
+    :param names: names of the operators (attribute *onnx_name*)
+    :return: dictionary ``{ name: (nodes, initializers, value_info,
+        domain_version_pairs) }``
+    """
+    records = topology.conversion_records
+    opsets = {op.domain: op.version for op in onnx_model.opset_import}
+    graph = onnx_model.graph
+
+    initializers = {init.name: init for init in graph.initializer}
+
+    def collect(name, parts):
+        record = records[name]
+        parts[0].extend(graph.node[slice(*record.nodes)])
+        parts[1].extend(graph.initializer[slice(*record.initializers)])
+        parts[2].extend(graph.value_info[slice(*record.value_info)])
+        for child in record.children:
+            collect(child, parts)
+
+    res = {}
+    for name in names:
+        if name not in records:
+            continue
+        parts = ([], [], [], [])
+        collect(name, parts)
+        # Duplicated initializers were replaced by an identical one
+        # another operator may have added.
+        found = set(init.name for init in parts[1])
+        for node in parts[0]:
+            for inp in node.input:
+                if inp in initializers and inp not in found:
+                    found.add(inp)
+                    parts[1].append(initializers[inp])
+        parts[3].extend((node.domain, opsets.get(node.domain, 1))
+                        for node in parts[0])
+        res[name] = parts
+    return res
+
+
+def _reserve_reused_names(topology, reused_parts):
+    """
+    Reserves the names used by the reused parts so that
+    converters do not pick any of them.
+    """
+    for nodes, initializers, value_info, _ in reused_parts.values():
+        op_names = [node.name for node in nodes]
+        var_names = [name for node in nodes for name in node.output]
+        var_names.extend(init.name for init in initializers)
+        var_names.extend(info.name for info in value_info)
+        for scope in topology.scopes:
+            scope.onnx_operator_names.update(op_names)
+            scope.onnx_variable_names.update(var_names)
+
+
+def _convert_operators_in_parallel(topology, container, n_jobs,
+                                   reused_parts=None):
+    """
+    Calls every converter in a pool of *n_jobs* threads.
+    Every converter fills its own
+    :class:`SubModelComponentContainer
+    <skl2onnx.common._container.SubModelComponentContainer>` and
+    gets a :class:`_ScopeRecorder` instead of the scope. Results are
+    merged in the order a sequential conversion follows, before
+    the topology looks for the operators declared by the converters
+    and at the end, the converted model is the same.
+    """
+    scopes = {scope.name: scope for scope in topology.scopes}
+    jobs = []
+    records = {}
+
+    def merge_jobs():
+        for operator, recorder, sub_container, future in jobs:
+            future.result()
+            scope = scopes[operator.scope]
+            record = _ConversionRecord(container, scope)
+            recorder.replay()
+            container.merge(sub_container, recorder.rename)
+            records[operator.onnx_name] = record.stop(container, scope)
+        del jobs[:]
+
+    def run(conv, scope, operator, sub_container):
+        sub_container.start_converter()
+        conv(scope, operator, sub_container)
+
+    with ThreadPoolExecutor(max_workers=n_jobs) as executor:
+        job = 0
+        try:
+            for operator in topology.topological_operator_iterator(
+                    before_collect=merge_jobs):
+                conv = _get_converter(topology, operator, reused_parts)
+                recorder = _ScopeRecorder(scopes[operator.scope], job)
+                sub_container = SubModelComponentContainer(container)
+                future = executor.submit(run, conv, recorder, operator,
+                                         sub_container)
+                jobs.append((operator, recorder, sub_container, future))
+                job += 1
+            merge_jobs()
+        finally:
+            for item in jobs:
+                item[-1].cancel()
+    return records
+
+
 def convert_topology(topology, model_name, doc_string, target_opset,
                      channel_first_inputs=None, dtype=None,
-                     options=None):
+                     options=None, validation='default', n_jobs=None,
+                     reused_parts=None, optimize=False):
     """
     This function is used to convert our Topology object defined in
     _parser.py into a ONNX model (type: ModelProto).
@@ -849,6 +1249,17 @@ def convert_topology(topology, model_name, doc_string, target_opset,
     :param dtype: float type to use everywhere in the graph,
         `np.float32` or `np.float64`
     :param options: see :ref:`l-conv-options`
+    :param validation: checks done on every added node,
+        see :ref:`l-conv-validation`
+    :param n_jobs: number of threads calling the converters,
+        None or 1 for a sequential conversion, -1 for all processors
+    :param reused_parts: parts of a previous conversion to copy instead
+        of calling the converters, see :func:`_extract_converted_parts`
+    :param optimize: False, True for the default optimization passes
+        or a list of passes, see :meth:`ModelComponentContainer.optimize
+        <skl2onnx.common._container.ModelComponentContainer.optimize>`,
+        the number of nodes every pass removed is stored in
+        attribute *optimization_report* of the topology
     include '1.1.2', '1.2', and so on.
     :return: a ONNX ModelProto
     """
@@ -868,7 +1279,7 @@ def convert_topology(topology, model_name, doc_string, target_opset,
     topology._initialize_graph_status_for_traversing()
 
     container = ModelComponentContainer(
-        target_opset, options=options, dtype=dtype)
+        target_opset, options=options, dtype=dtype, validation=validation)
 
     # Put roots and leaves as ONNX's model into buffers. They will be
     # added into ModelComponentContainer later.
@@ -939,30 +1350,30 @@ def convert_topology(topology, model_name, doc_string, target_opset,
             container.add_output(other_outputs[name])
 
     # Traverse the graph from roots to leaves
-    # This loop could eventually be parallelized.
-    for operator in topology.topological_operator_iterator():
-        scope = next(scope for scope in topology.scopes
-                     if scope.name == operator.scope)
-        mtype = type(operator.raw_operator)
-        if mtype in topology.custom_conversion_functions:
-            conv = topology.custom_conversion_functions[mtype]
-        elif operator.type in topology.custom_conversion_functions:
-            conv = topology.custom_conversion_functions[operator.type]
-        elif hasattr(operator.raw_operator, "onnx_converter"):
-            conv = operator.raw_operator.onnx_converter()
-        else:
-            # Convert the selected operator into some ONNX objects and
-            # save them into the container
-            try:
-                conv = _registration.get_converter(operator.type)
-            except ValueError:
-                raise MissingConverter(
-                    "Unable to find converter for alias '{}' type "
-                    "'{}'. You may raise an issue at "
-                    "https://github.com/onnx/sklearn-onnx/issues."
-                    "".format(operator.type,
-                              type(getattr(operator, 'raw_model', None))))
-        conv(scope, operator, container)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count()
+    if reused_parts:
+        _reserve_reused_names(topology, reused_parts)
+    if n_jobs is not None and n_jobs > 1:
+        records = _convert_operators_in_parallel(
+            topology, container, n_jobs, reused_parts)
+    else:
+        records = {}
+        for operator in topology.topological_operator_iterator():
+            scope = next(scope for scope in topology.scopes
+                         if scope.name == operator.scope)
+            conv = _get_converter(topology, operator, reused_parts)
+            container.start_converter()
+            record = _ConversionRecord(container, scope)
+            conv(scope, operator, container)
+            records[operator.onnx_name] = record.stop(container, scope)
+    topology.conversion_records = records
+    container.resolve_initializer_aliases()
+    if optimize:
+        topology.optimization_report = container.optimize(
+            None if optimize is True else optimize)
+        # Records refer to the nodes before the optimization.
+        topology.conversion_records = None
 
     # Create a graph from its main components
     if container.target_opset < 9:
@@ -157,30 +157,207 @@ def add_node(attr_pairs, is_classifier, tree_id, tree_weight, node_id,
                 attr_pairs['target_weights'].append(w)
 
 
+def sklearn_thresholds(values, dtype):
+    """
+    Vectorized version of :func:`sklearn_threshold` for mode
+    ``'BRANCH_LEQ'``. It adjusts every threshold of *values*
+    in one pass and returns an array of doubles.
+    """
+    dy = np.asarray(values, dtype=np.float64)
+    fy = dy.astype(np.float32)
+    if dtype == np.float32:
+        below = np.nextafter(fy, np.float32(-np.inf))
+        return np.where(fy > dy, below, fy).astype(np.float64)
+    elif dtype == np.float64:
+        afy = np.nextafter(fy, np.float32(-np.inf))
+        afy2 = find_switch_points(afy, fy)
+        bfy = np.nextafter(fy, np.float32(np.inf))
+        bfy2 = find_switch_points(fy, bfy)
+        res = fy.astype(np.float64)
+        res = np.where((fy <= dy) & (dy <= bfy2), bfy2, res)
+        return np.where((fy > dy) & (dy > afy2), afy2, res)
+    raise TypeError("Unexpected dtype {}.".format(dtype))
+
+
+def find_switch_points(fy, nfy):
+    """
+    Vectorized version of :func:`find_switch_point`.
+    Every pair converges independently, a converged pair is
+    a fixed point of the bisection step.
+    """
+    a = np.asarray(fy, dtype=np.float64)
+    b = np.asarray(nfy, dtype=np.float64)
+    fa = a.astype(np.float32)
+    while True:
+        m = (a + b) / 2
+        same = m.astype(np.float32) == fa
+        na = np.where(same, m, a)
+        nb = np.where(same, b, m)
+        if np.array_equal(na, a) and np.array_equal(nb, b):
+            return a
+        a, b = na, nb
+
+
+def _tree_to_arrays(is_classifier, tree, tree_id, tree_weight,
+                    weight_id_bias, leaf_weights_are_counts,
+                    feature_ids=None, leaf_values=None):
+    """
+    Extracts the node and leaf attributes of one tree as arrays.
+    The order is the same as the one produced by :func:`add_node`
+    called on every node.
+    """
+    n_nodes = tree.node_count
+    node_ids = np.arange(n_nodes, dtype=np.int64)
+    left = np.asarray(tree.children_left[:n_nodes], dtype=np.int64)
+    right = np.asarray(tree.children_right[:n_nodes], dtype=np.int64)
+    is_branch = (left > node_ids) | (right > node_ids)
+    features = np.where(is_branch, tree.feature[:n_nodes], 0)
+    if feature_ids is not None:
+        features = np.where(
+            is_branch, np.asarray(feature_ids, dtype=np.int64)[features], 0)
+
+    nodes = dict(
+        treeids=np.full(n_nodes, tree_id, dtype=np.int64),
+        nodeids=node_ids,
+        featureids=features,
+        branch=is_branch,
+        values=np.where(is_branch, tree.threshold[:n_nodes], 0.),
+        truenodeids=np.where(is_branch, left, 0),
+        falsenodeids=np.where(is_branch, right, 0))
+
+    leaf_ids = node_ids[~is_branch]
+    if leaf_values is not None:
+        # Values are given by the caller, every column is kept.
+        weights = np.asarray(leaf_values, dtype=np.float64)[:n_nodes]
+        weights = weights[~is_branch].reshape(
+            (leaf_ids.shape[0], -1)) * tree_weight
+    else:
+        weights = tree.value[:n_nodes][~is_branch].reshape(
+            (leaf_ids.shape[0], -1))
+        weights = weights.astype(np.float64)
+        if leaf_weights_are_counts:
+            s = weights.sum(axis=1)
+            s[s == 0] = 1.
+            weights = weights * (tree_weight / s)[:, np.newaxis]
+        else:
+            weights = weights * tree_weight
+        if weights.shape[1] == 2 and is_classifier:
+            weights = weights[:, 1:]
+
+    n_weights = weights.shape[1]
+    leaves = dict(
+        treeids=np.full(weights.size, tree_id, dtype=np.int64),
+        nodeids=np.repeat(leaf_ids, n_weights),
+        ids=np.tile(np.arange(n_weights, dtype=np.int64) + weight_id_bias,
+                    leaf_ids.shape[0]),
+        weights=weights.ravel())
+    return nodes, leaves
+
+
+def add_trees_to_attribute_pairs(attr_pairs, is_classifier, trees, tree_ids,
+                                 tree_weights, weight_id_biases,
+                                 leaf_weights_are_counts,
+                                 adjust_threshold_for_sklearn=False,
+                                 dtype=None, feature_ids=None,
+                                 leaf_values=None):
+    """
+    Adds many trees at once into *attr_pairs*. It produces the same
+    attributes as :func:`add_tree_to_attribute_pairs` called on
+    every tree but every attribute is built with *numpy* over
+    all trees and thresholds are adjusted in a single pass.
+
+    :param attr_pairs: attributes to update, see
+        :func:`get_default_tree_classifier_attribute_pairs`
+    :param is_classifier: classifier or regressor
+    :param trees: list of *scikit-learn* trees (``estimator.tree_``)
+    :param tree_ids: list of tree ids, one per tree
+    :param tree_weights: a weight or a list of weights, one per tree
+    :param weight_id_biases: a bias or a list of biases, one per tree,
+        it is added to the class id or the target id
+    :param leaf_weights_are_counts: leaf values are counts and must be
+        normalized
+    :param adjust_threshold_for_sklearn: see :func:`sklearn_threshold`
+    :param dtype: *numpy.float32* or *numpy.float64*
+    :param feature_ids: None or a list of arrays, one per tree,
+        the tree uses feature ``feature_ids[i][j]`` wherever it
+        uses feature *j*, for models trained on a subset of features
+    :param leaf_values: None or a list of arrays, one per tree,
+        they replace ``tree.value``, the values are only multiplied
+        by the tree weight, they are not normalized and the first
+        class is kept for binary classifiers
+    """
+    n_trees = len(trees)
+    if n_trees == 0:
+        return
+    if len(tree_ids) != n_trees:
+        raise ValueError("Mismatch between the number of trees {} and "
+                         "the number of ids {}.".format(
+                             n_trees, len(tree_ids)))
+    if not isinstance(tree_weights, (list, tuple, np.ndarray)):
+        tree_weights = [tree_weights] * n_trees
+    if not isinstance(weight_id_biases, (list, tuple, np.ndarray)):
+        weight_id_biases = [weight_id_biases] * n_trees
+    if feature_ids is None:
+        feature_ids = [None] * n_trees
+    if leaf_values is None:
+        leaf_values = [None] * n_trees
+
+    all_nodes = []
+    all_leaves = []
+    for tree, tree_id, tree_weight, bias, features, values in zip(
+            trees, tree_ids, tree_weights, weight_id_biases, feature_ids,
+            leaf_values):
+        nodes, leaves = _tree_to_arrays(
+            is_classifier, tree, tree_id, tree_weight, bias,
+            leaf_weights_are_counts, feature_ids=features,
+            leaf_values=values)
+        all_nodes.append(nodes)
+        all_leaves.append(leaves)
+
+    def concat(rows, key):
+        return np.concatenate([row[key] for row in rows])
+
+    branch = concat(all_nodes, 'branch')
+    values = concat(all_nodes, 'values').astype(np.float64)
+    if adjust_threshold_for_sklearn and branch.any():
+        values[branch] = sklearn_thresholds(values[branch], dtype)
+    n_nodes = branch.shape[0]
+
+    attr_pairs['nodes_treeids'].extend(
+        concat(all_nodes, 'treeids').tolist())
+    attr_pairs['nodes_nodeids'].extend(
+        concat(all_nodes, 'nodeids').tolist())
+    attr_pairs['nodes_featureids'].extend(
+        concat(all_nodes, 'featureids').tolist())
+    attr_pairs['nodes_modes'].extend(
+        np.where(branch, 'BRANCH_LEQ', 'LEAF').tolist())
+    attr_pairs['nodes_values'].extend(values.tolist())
+    attr_pairs['nodes_truenodeids'].extend(
+        concat(all_nodes, 'truenodeids').tolist())
+    attr_pairs['nodes_falsenodeids'].extend(
+        concat(all_nodes, 'falsenodeids').tolist())
+    attr_pairs['nodes_missing_value_tracks_true'].extend([False] * n_nodes)
+    attr_pairs['nodes_hitrates'].extend([1.] * n_nodes)
+
+    # Note that attribute names for making prediction are different for
+    # classifiers and regressors
+    prefix = 'class' if is_classifier else 'target'
+    attr_pairs[prefix + '_treeids'].extend(
+        concat(all_leaves, 'treeids').tolist())
+    attr_pairs[prefix + '_nodeids'].extend(
+        concat(all_leaves, 'nodeids').tolist())
+    attr_pairs[prefix + '_ids'].extend(concat(all_leaves, 'ids').tolist())
+    attr_pairs[prefix + '_weights'].extend(
+        concat(all_leaves, 'weights').tolist())
+
+
 def add_tree_to_attribute_pairs(attr_pairs, is_classifier, tree, tree_id,
                                 tree_weight, weight_id_bias,
                                 leaf_weights_are_counts,
                                 adjust_threshold_for_sklearn=False,
                                 dtype=None):
-    for i in range(tree.node_count):
-        node_id = i
-        weight = tree.value[i]
-
-        if tree.children_left[i] > i or tree.children_right[i] > i:
-            mode = 'BRANCH_LEQ'
-            feat_id = tree.feature[i]
-            threshold = tree.threshold[i]
-            left_child_id = int(tree.children_left[i])
-            right_child_id = int(tree.children_right[i])
-        else:
-            mode = 'LEAF'
-            feat_id = 0
-            threshold = 0.
-            left_child_id = 0
-            right_child_id = 0
-
-        add_node(attr_pairs, is_classifier, tree_id, tree_weight, node_id,
-                 feat_id, mode, threshold, left_child_id, right_child_id,
-                 weight, weight_id_bias, leaf_weights_are_counts,
-                 adjust_threshold_for_sklearn=adjust_threshold_for_sklearn,
-                 dtype=dtype)
+    add_trees_to_attribute_pairs(
+        attr_pairs, is_classifier, [tree], [tree_id], tree_weight,
+        weight_id_bias, leaf_weights_are_counts,
+        adjust_threshold_for_sklearn=adjust_threshold_for_sklearn,
+        dtype=dtype)
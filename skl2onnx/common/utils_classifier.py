@@ -26,6 +26,16 @@ def get_label_classes(scope, op):
     return classes
 
 
+def is_logistic_regression_ovr(op):
+    """
+    Tells if a *LogisticRegression* computes its probabilities
+    with a sigmoid (one-vs-rest) or with a softmax (multinomial).
+    """
+    return (op.multi_class in ["ovr", "warn"] or
+            (op.multi_class == 'auto' and (op.classes_.size <= 2 or
+                                           op.solver == 'liblinear')))
+
+
 def _finalize_converter_classes(scope, argmax_output_name, output_full_name,
                                 container, classes):
     """
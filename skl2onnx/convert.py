@@ -7,19 +7,17 @@
 from uuid import uuid4
 import numpy as np
 from .proto import get_opset_number_from_onnx
-from .common._topology import convert_topology
+from .common._topology import convert_topology, _extract_converted_parts
 from ._parse import parse_sklearn_model
 
-# Invoke the registration of all our converters and shape calculators.
-from . import shape_calculators # noqa
-from . import operator_converters # noqa
-
 
 def convert_sklearn(model, name=None, initial_types=None, doc_string='',
                     target_opset=None, custom_conversion_functions=None,
                     custom_shape_calculators=None,
                     custom_parsers=None, options=None,
-                    dtype=np.float32, intermediate=False):
+                    dtype=np.float32, intermediate=False,
+                    validation='default', n_jobs=None, cache=None,
+                    optimize=False):
     """
     This function produces an equivalent ONNX model of the given scikit-learn model.
     The supported converters is returned by function
@@ -50,6 +48,19 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
         `np.float32` or `np.float64`
     :param intermediate: if True, the function returns the converted model and , and :class:`Topology`,
         it returns the converted model otherwise
+    :param validation: checks done on every node added by the converters,
+        ``'strict'``, ``'default'`` or ``'off'`` (see :ref:`l-conv-validation`)
+    :param n_jobs: number of threads calling the converters, None or 1
+        converts every operator one after another, -1 uses all processors,
+        the converted model does not depend on it
+    :param cache: an instance of :class:`ConversionCache
+        <skl2onnx.helpers.conversion_cache.ConversionCache>`, the model
+        is not converted again if the cache already holds it, the cache
+        is ignored if *intermediate* is True or if any custom function
+        or parser is given
+    :param optimize: removes redundant nodes once every operator is
+        converted, False, True for the default passes or a list
+        of passes (see :ref:`l-conv-optimize`)
     :return: An ONNX model (type: ModelProto) which is equivalent to the input scikit-learn model
 
     Example of *initial_types*:
@@ -109,6 +120,63 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
                                      options=extra)
 
     It is used in example :ref:`l-example-tfidfvectorizer`.
+
+    .. _l-conv-validation:
+
+    Validation
+    ++++++++++
+
+    Every node added by a converter goes through some checks.
+    Parameter *validation* selects them:
+
+    * ``'default'``: input and output names must be strings,
+      attributes must be defined,
+    * ``'strict'``: the default checks and, for every operator
+      type implemented in submodule *_apply_operation*, the converter
+      must add it through the dedicated function, it looks into the
+      call stack once per operator type and converter call,
+    * ``'off'``: input and output names are not checked, it is
+      slightly faster for batch conversions of trusted models.
+
+    .. _l-conv-optimize:
+
+    Optimization
+    ++++++++++++
+
+    Converters are written independently and the graph they produce
+    together often contains redundant nodes. ``optimize=True`` runs
+    the following passes on the nodes until none of them removes
+    anything:
+
+    * ``'identity'``: removes *Identity* nodes,
+    * ``'reshape'``: replaces two consecutive *Reshape* by the last one,
+    * ``'cast'``: replaces two consecutive *Cast* by the last one
+      if the first one does not lose any information,
+      removes *Cast* into the type of their input,
+    * ``'constant'``: replaces nodes whose inputs are all initializers
+      by an initializer computed at conversion time,
+    * ``'affine'``: merges chains of affine nodes (scalers, *PCA*,
+      *TruncatedSVD*, ...) into the next linear model or matrix
+      multiplication, coefficients are composed at conversion time
+      in double and stored with the type of the model; the results
+      are not exactly the same, the centering is folded into the bias
+      and the difference is a few float rounding errors of the
+      largest feature, about ``5e-7`` times the largest output in
+      float32 (``1.7e-5`` for outputs up to 38, above ``decimal=5``),
+    * ``'one_hot'``: replaces one hot encoded columns followed by
+      a linear model by a lookup of the coefficients of every category
+      if unknown categories are ignored (``handle_unknown='ignore'``),
+    * ``'dead_nodes'``: removes nodes, initializers and value info
+      which do not contribute to any output.
+
+    Parameter *optimize* can also be a list of pass names
+    or functions ``fct(container) -> number of removed nodes``
+    (see :func:`optimize_container
+    <skl2onnx.common._optimize.optimize_container>`). The number of
+    nodes every pass removed is stored in attribute
+    *optimization_report* of the topology returned
+    with ``intermediate=True``. Function :func:`reconvert_sklearn`
+    cannot be called on an optimized model.
     """ # noqa
     if initial_types is None:
         if hasattr(model, 'infer_initial_types'):
@@ -122,6 +190,21 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
 
     target_opset = (target_opset
                     if target_opset else get_opset_number_from_onnx())
+
+    if (cache is not None and not intermediate and
+            custom_conversion_functions is None and
+            custom_shape_calculators is None and custom_parsers is None):
+        cache_key = cache.fingerprint(model, initial_types, target_opset,
+                                      options=options, dtype=dtype,
+                                      optimize=optimize)
+        onnx_model = cache.get(cache_key)
+        if onnx_model is not None:
+            onnx_model.graph.name = name
+            onnx_model.doc_string = doc_string
+            return onnx_model
+    else:
+        cache_key = None
+
     # Parse scikit-learn model as our internal data structure
     # (i.e., Topology)
     topology = parse_sklearn_model(model, initial_types, target_opset,
@@ -132,16 +215,101 @@ def convert_sklearn(model, name=None, initial_types=None, doc_string='',
 
     # Infer variable shapes
     topology.compile()
+    if intermediate:
+        # Needed by reconvert_sklearn to detect what changed.
+        fingerprints = _fingerprint_operators(topology, options)
 
     # Convert our Topology object into ONNX. The outcome is an ONNX model.
     onnx_model = convert_topology(topology, name, doc_string, target_opset,
-                                  dtype=dtype, options=options)
+                                  dtype=dtype, options=options,
+                                  validation=validation, n_jobs=n_jobs,
+                                  optimize=optimize)
+    if cache_key is not None:
+        cache.set(cache_key, onnx_model)
+    if intermediate:
+        topology.operator_fingerprints = fingerprints
 
     return (onnx_model, topology) if intermediate else onnx_model
 
 
+def _fingerprint_operators(topology, options):
+    from .helpers.conversion_cache import operator_fingerprint
+    fingerprints = {}
+    for operator in topology.unordered_operator_iterator():
+        try:
+            fingerprints[operator.onnx_name] = operator_fingerprint(
+                operator, options=options)
+        except TypeError:
+            # This operator is always converted again.
+            fingerprints[operator.onnx_name] = None
+    return fingerprints
+
+
+def reconvert_sklearn(onnx_model, topology, model, custom_parsers=None,
+                      options=None, dtype=np.float32, validation='default',
+                      n_jobs=None):
+    """
+    Converts a model again after some of its steps were refitted.
+    The model is parsed again but only the operators which changed
+    are converted, the nodes, initializers and value info of the others
+    are copied from the previous conversion.
+
+    ::
+
+        onx, topology = convert_sklearn(pipe, initial_types=...,
+                                        intermediate=True)
+        pipe.steps[-1][1].fit(X, y)
+        onx, topology = reconvert_sklearn(onx, topology, pipe)
+
+    An operator is reused if its model, its inputs and outputs
+    and the attributes set by the parser did not change,
+    see :func:`operator_fingerprint
+    <skl2onnx.helpers.conversion_cache.operator_fingerprint>`.
+    If the pipeline structure changed, every operator is converted.
+    Initial types, target opset and custom converters are
+    taken from *topology*.
+
+    :param onnx_model: model returned by :func:`convert_sklearn`
+        called with ``intermediate=True`` or by this function,
+        it must not have been modified
+    :param topology: topology returned with *onnx_model*
+    :param model: the refitted *scikit-learn* model
+    :param custom_parsers: see :func:`convert_sklearn`
+    :param options: see :func:`convert_sklearn`
+    :param dtype: see :func:`convert_sklearn`
+    :param validation: see :func:`convert_sklearn`
+    :param n_jobs: see :func:`convert_sklearn`
+    :return: the new ONNX model and its topology
+    """
+    if (topology.operator_fingerprints is None or
+            topology.conversion_records is None):
+        raise ValueError("topology must be returned by convert_sklearn("
+                         "..., intermediate=True) or reconvert_sklearn "
+                         "without any optimization.")
+    new_topology = parse_sklearn_model(
+        model, topology.initial_types, topology.target_opset,
+        topology.custom_conversion_functions,
+        topology.custom_shape_calculators, custom_parsers,
+        options=options, dtype=dtype)
+    new_topology.compile()
+    fingerprints = _fingerprint_operators(new_topology, options)
+
+    previous = topology.operator_fingerprints
+    reused = [name for name, fp in fingerprints.items()
+              if fp is not None and previous.get(name) == fp]
+    reused_parts = _extract_converted_parts(topology, onnx_model, reused)
+
+    new_model = convert_topology(
+        new_topology, onnx_model.graph.name, onnx_model.doc_string,
+        topology.target_opset, dtype=dtype, options=options,
+        validation=validation, n_jobs=n_jobs, reused_parts=reused_parts)
+    new_topology.operator_fingerprints = fingerprints
+    return new_model, new_topology
+
+
 def to_onnx(model, X=None, name=None, initial_types=None,
-            target_opset=None, options=None, dtype=np.float32):
+            target_opset=None, options=None, dtype=np.float32,
+            cache=None, optimize=False):
     """
     Calls :func:`convert_sklearn` with simplified parameters.
 
@@ -156,6 +324,9 @@ def to_onnx(model, X=None, name=None, initial_types=None,
     :param name: name of the model
     :param dtype: float type to use everywhere in the graph,
         `np.float32` or `np.float64`
+    :param cache: see :func:`convert_sklearn`, it is ignored if
+        the model inherits from class :class:`OnnxOperatorMixin`
+    :param optimize: see :func:`convert_sklearn`
     :return: converted model
 
     This function checks if the model inherits from class
@@ -181,7 +352,8 @@ def to_onnx(model, X=None, name=None, initial_types=None,
             "dtype should be real not {}".format(dtype))
     return convert_sklearn(model, initial_types=initial_types,
                            target_opset=target_opset,
-                           name=name, options=options, dtype=dtype)
+                           name=name, options=options, dtype=dtype,
+                           cache=cache, optimize=optimize)
 
 
 def wrap_as_onnx_mixin(model):
@@ -0,0 +1,323 @@
+# -------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for
+# license information.
+# --------------------------------------------------------------------------
+import hashlib
+import os
+import tempfile
+import types
+import numpy as np
+import onnx
+from onnx import onnx_pb as onnx_proto
+from ..common.utils import get_producer_version
+
+
+def _update_hash(h, obj, stack):
+    # Every value starts with a tag so that two different
+    # sequences of values cannot produce the same stream of bytes.
+    if obj is None or isinstance(obj, (bool, int, float, complex, str)):
+        h.update(('%s:%r;' % (type(obj).__name__, obj)).encode('utf-8'))
+    elif isinstance(obj, bytes):
+        h.update(b'bytes:%d;' % len(obj))
+        h.update(obj)
+    elif isinstance(obj, np.ndarray):
+        h.update(('array:%s:%r;' % (obj.dtype.str, obj.shape)).encode())
+        if obj.dtype == np.object_ or obj.dtype.hasobject:
+            _update_hash(h, obj.tolist(), stack)
+        else:
+            h.update(np.ascontiguousarray(obj).tobytes())
+    elif isinstance(obj, np.generic):
+        _update_hash(h, np.array(obj), stack)
+    elif isinstance(obj, np.dtype):
+        h.update(('dtype:%s;' % obj.str).encode())
+    elif isinstance(obj, (type, types.BuiltinFunctionType)):
+        h.update(('type:%s.%s;' % (getattr(obj, '__module__', ''),
+                                   obj.__qualname__)).encode('utf-8'))
+    elif id(obj) in stack:
+        raise TypeError("Unable to fingerprint a recursive object of type "
+                        "'{}'.".format(type(obj)))
+    else:
+        stack.add(id(obj))
+        if isinstance(obj, dict):
+            h.update(b'dict:%d;' % len(obj))
+            for k, v in sorted(obj.items(), key=lambda kv: repr(kv[0])):
+                _update_hash(h, k, stack)
+                _update_hash(h, v, stack)
+        elif isinstance(obj, (list, tuple)):
+            h.update(('%s:%d;' % (type(obj).__name__, len(obj))).encode())
+            for v in obj:
+                _update_hash(h, v, stack)
+        elif isinstance(obj, (set, frozenset)):
+            _update_hash(h, tuple(sorted(obj, key=repr)), stack)
+        elif isinstance(obj, types.FunctionType):
+            # Two lambdas or closures share the same name,
+            # the code and the captured values tell them apart.
+            h.update(('function:%s.%s;' % (
+                obj.__module__ or '', obj.__qualname__)).encode('utf-8'))
+            _update_hash(h, [obj.__code__, obj.__defaults__,
+                             obj.__kwdefaults__,
+                             [cell.cell_contents
+                              for cell in obj.__closure__ or []]], stack)
+        elif isinstance(obj, types.MethodType):
+            h.update(b'method;')
+            _update_hash(h, [obj.__func__, obj.__self__], stack)
+        elif isinstance(obj, types.CodeType):
+            h.update(b'code;')
+            _update_hash(h, [obj.co_code, obj.co_consts, obj.co_names,
+                             obj.co_varnames, obj.co_freevars,
+                             obj.co_cellvars, obj.co_argcount,
+                             obj.co_kwonlyargcount, obj.co_flags], stack)
+        elif isinstance(obj, np.random.RandomState):
+            h.update(b'RandomState;')
+            _update_hash(h, obj.get_state(), stack)
+        else:
+            # Follows what pickle would store: the class, the constructor
+            # arguments and the state (*__getstate__* for estimators).
+            try:
+                red = obj.__reduce_ex__(2)
+            except Exception as e:
+                raise TypeError("Unable to fingerprint an object of type "
+                                "'{}'.".format(type(obj))) from e
+            if isinstance(red, str):
+                _update_hash(h, red, stack)
+            else:
+                h.update(b'object;')
+                _update_hash(h, type(obj), stack)
+                red = list(red[1:3]) + [
+                    None if it is None else list(it) for it in red[3:5]]
+                _update_hash(h, red, stack)
+        stack.remove(id(obj))
+
+
+def _object_paths(obj, path, paths):
+    """
+    Stores in *paths* the path of every object reachable
+    from *obj* through containers and attributes.
+    """
+    if (obj is None or id(obj) in paths or
+            isinstance(obj, (bool, int, float, complex, str, bytes, type,
+                             np.ndarray, np.generic, np.dtype))):
+        return
+    paths[id(obj)] = path
+    if isinstance(obj, dict):
+        items = obj.items()
+    elif isinstance(obj, (list, tuple)):
+        items = enumerate(obj)
+    elif hasattr(obj, '__dict__'):
+        items = vars(obj).items()
+    else:
+        return
+    for k, v in items:
+        _object_paths(v, path + (repr(k), ), paths)
+
+
+def _stable_options(model, options):
+    """
+    Replaces the keys ``id(estimator)`` of the options by the path
+    of the estimator in the model, ids change with every process.
+    Options for an object outside the model are not used
+    by the conversion and are removed.
+    """
+    if not options:
+        return None
+    if not any(isinstance(k, int) for k in options):
+        return options
+    paths = {}
+    _object_paths(model, ('model', ), paths)
+    res = {}
+    for k, v in options.items():
+        if isinstance(k, int):
+            if k not in paths:
+                continue
+            k = ('path', ) + paths[k]
+        res[k] = v
+    return res or None
+
+
+def model_fingerprint(model, initial_types=None, target_opset=None,
+                      options=None, dtype=np.float32, optimize=False):
+    """
+    Computes a stable hash of a fitted model and the conversion
+    parameters. The model is walked like *pickle* would do,
+    hyperparameters and learned attributes are both included,
+    numerical arrays are hashed from their raw bytes.
+    The result does not depend on the process or the machine
+    the model was loaded into, options given for ``id(estimator)``
+    are hashed with the path of the estimator in the model.
+    The versions of *skl2onnx* and *onnx* are part of the hash.
+
+    :param model: fitted model
+    :param initial_types: input types given to :func:`convert_sklearn
+        <skl2onnx.convert_sklearn>`
+    :param target_opset: target opset
+    :param options: conversion options (see :ref:`l-conv-options`)
+    :param dtype: float type used by the converters
+    :param optimize: optimization passes (see :ref:`l-conv-optimize`)
+    :return: hexadecimal string
+    """
+    h = hashlib.sha256()
+    stack = set()
+    _update_hash(h, (get_producer_version(), onnx.__version__,
+                     target_opset, np.dtype(dtype),
+                     _stable_options(model, options), optimize), stack)
+    if initial_types is not None:
+        h.update(b'initial_types:%d;' % len(initial_types))
+        for name, typ in initial_types:
+            _update_hash(h, name, stack)
+            _update_hash(h, typ.to_onnx_type().SerializeToString(), stack)
+    _update_hash(h, model, stack)
+    return h.hexdigest()
+
+
+_operator_attributes = {'onnx_name', 'scope', 'type', 'raw_operator',
+                        'inputs', 'outputs', 'is_evaluated', 'is_abandoned',
+                        'target_opset', 'dtype', 'scope_inst'}
+
+
+def operator_fingerprint(operator, options=None):
+    """
+    Computes a stable hash of an :class:`Operator
+    <skl2onnx.common._topology.Operator>` before it is converted:
+    its type, its model, the names and types of its inputs and outputs
+    and the attributes the parser added.
+
+    :param operator: operator
+    :param options: conversion options (see :ref:`l-conv-options`)
+    :return: hexadecimal string
+    """
+    h = hashlib.sha256()
+    stack = set()
+    _update_hash(h, (get_producer_version(), onnx.__version__,
+                     operator.type, operator.target_opset,
+                     np.dtype(operator.dtype), options), stack)
+    for variables in [operator.inputs, operator.outputs]:
+        h.update(b'variables:%d;' % len(variables))
+        for var in variables:
+            _update_hash(h, var.onnx_name, stack)
+            _update_hash(h, var.type.to_onnx_type().SerializeToString(),
+                         stack)
+    _update_hash(h, {k: v for k, v in operator.__dict__.items()
+                     if k not in _operator_attributes}, stack)
+    _update_hash(h, operator.raw_operator, stack)
+    return h.hexdigest()
+
+
+class ConversionCache:
+    """
+    Stores converted models in a folder, one file per model.
+    The cache is given to :func:`convert_sklearn
+    <skl2onnx.convert_sklearn>` or :func:`to_onnx <skl2onnx.to_onnx>`
+    through parameter *cache*, a hit returns the stored model
+    and skips the parsing and the conversion.
+
+    ::
+
+        cache = ConversionCache("onnx_cache", max_size=2 ** 28)
+        onx = convert_sklearn(model, initial_types=..., cache=cache)
+
+    When the size of the folder exceeds *max_size* bytes, the least
+    recently used models are removed. Files are written to a temporary
+    file and renamed, every process sees either a complete file or
+    no file at all, the cache can be shared by several processes
+    without any lock. Custom converters registered with
+    :func:`update_registered_converter
+    <skl2onnx.update_registered_converter>` are not part of the key,
+    the folder must be cleared if they change.
+
+    :param folder: folder to store the models, it is created
+        if it does not exist
+    :param max_size: maximum size of the folder in bytes,
+        None for no limit
+    """
+
+    def __init__(self, folder, max_size=2 ** 30):
+        if max_size is not None and max_size <= 0:
+            raise ValueError("max_size must be positive not {}.".format(
+                max_size))
+        self.folder = folder
+        self.max_size = max_size
+        os.makedirs(folder, exist_ok=True)
+
+    def fingerprint(self, model, initial_types=None, target_opset=None,
+                    options=None, dtype=np.float32, optimize=False):
+        """
+        Returns the key associated to a conversion,
+        see :func:`model_fingerprint`.
+        """
+        return model_fingerprint(model, initial_types=initial_types,
+                                 target_opset=target_opset,
+                                 options=options, dtype=dtype,
+                                 optimize=optimize)
+
+    def _filename(self, key):
+        return os.path.join(self.folder, key + '.onnx')
+
+    def get(self, key):
+        """
+        Returns the model stored for *key* or None if there is none.
+        """
+        filename = self._filename(key)
+        try:
+            with open(filename, 'rb') as f:
+                content = f.read()
+            # The modification time keeps track of the last access.
+            os.utime(filename)
+        except OSError:
+            # Missing or removed by another process.
+            return None
+        model = onnx_proto.ModelProto()
+        model.ParseFromString(content)
+        return model
+
+    def set(self, key, model):
+        """
+        Stores *model* for *key* and removes the least recently
+        used models if the folder is too big.
+        """
+        fd, tmp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(model.SerializeToString())
+            os.replace(tmp, self._filename(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        if self.max_size is not None:
+            self._evict(keep=key)
+
+    def _evict(self, keep=None):
+        files = []
+        for name in os.listdir(self.folder):
+            if not name.endswith('.onnx'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.folder, name))
+            except OSError:
+                continue
+            files.append((st.st_mtime, name, st.st_size))
+        total = sum(f[2] for f in files)
+        files.sort()
+        for _, name, size in files:
+            if total <= self.max_size:
+                break
+            if keep is not None and name == keep + '.onnx':
+                continue
+            try:
+                os.remove(os.path.join(self.folder, name))
+            except OSError:
+                # Already removed by another process.
+                pass
+            total -= size
+
+    def clear(self):
+        """
+        Removes every stored model.
+        """
+        for name in os.listdir(self.folder):
+            if name.endswith('.onnx'):
+                try:
+                    os.remove(os.path.join(self.folder, name))
+                except OSError:
+                    pass
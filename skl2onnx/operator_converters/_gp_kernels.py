@@ -90,9 +90,10 @@ def py_make_float_array(cst, dtype, as_tensor=False):
 def _convert_exp_sine_squared(X, Y, length_scale=1.2, periodicity=1.1,
                               pi=math.pi, dtype=None, optim=None,
                               op_version=None, **kwargs):
-    if optim is None:
+    if optim in (None, 'gemm', 'scan'):
         dists = onnx_cdist(
-            X, Y, metric="euclidean", dtype=dtype, op_version=op_version)
+            X, Y, metric="euclidean", dtype=dtype, op_version=op_version,
+            optim=optim)
     elif optim == 'cdist':
         dists = OnnxCDist(X, Y, metric="euclidean", op_version=op_version)
     else:
@@ -139,9 +140,9 @@ def _convert_rational_quadratic(X, Y, length_scale=1.0, alpha=2.0,
     Implements the kernel
     :math:`k(x_i,x_j)=(1 + d(x_i, x_j)^2 / (2*\\alpha * l^2))^{-\\alpha}`.
     """
-    if optim is None:
+    if optim in (None, 'gemm', 'scan'):
         dists = onnx_cdist(X, Y, dtype=dtype, metric="sqeuclidean",
-                           op_version=op_version)
+                           op_version=op_version, optim=optim)
     elif optim == 'cdist':
         dists = OnnxCDist(X, Y, metric="sqeuclidean", op_version=op_version)
     else:
@@ -215,13 +216,15 @@ def convert_kernel(kernel, X, output_names=None,
         if x_train is None:
             dist = onnx_squareform_pdist(
                 X_scaled, metric='sqeuclidean', dtype=dtype,
-                op_version=op_version)
+                op_version=op_version,
+                optim=None if optim == 'cdist' else optim)
         else:
             x_train_scaled = OnnxDiv(x_train, const, op_version=op_version)
-            if optim is None:
+            if optim in (None, 'gemm', 'scan'):
                 dist = onnx_cdist(X_scaled, x_train_scaled,
                                   metric='sqeuclidean',
-                                  dtype=dtype, op_version=op_version)
+                                  dtype=dtype, op_version=op_version,
+                                  optim=optim)
             elif optim == 'cdist':
                 dist = OnnxCDist(X_scaled, x_train_scaled,
                                  metric='sqeuclidean',
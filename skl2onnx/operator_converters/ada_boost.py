@@ -7,12 +7,17 @@ from distutils.version import StrictVersion
 import numpy as np
 from onnx.helper import make_tensor
 from sklearn import __version__
+from sklearn.tree import DecisionTreeClassifier
 from ..common._apply_operation import (
     apply_add, apply_cast, apply_clip, apply_concat, apply_div, apply_exp,
-    apply_mul, apply_reshape, apply_sub, apply_topk, apply_transpose
+    apply_mul, apply_neg, apply_reshape, apply_sub, apply_topk
 )
 from ..common.data_types import FloatTensorType
 from ..common._registration import register_converter
+from ..common.tree_ensemble import (
+    add_trees_to_attribute_pairs,
+    get_default_tree_classifier_attribute_pairs,
+)
 from ..proto import onnx_proto
 from .._supported_operators import sklearn_operator_name_map
 
@@ -90,6 +95,55 @@ def _samme_r_proba(scope, container, proba_name, n_classes):
     return samme_proba_name
 
 
+def _trees_leaf_values(model, i_est, estimator):
+    """
+    Computes the contribution of every leaf of a decision tree
+    to the weighted sum of the estimators. It is what
+    :func:`_samme_r_proba` or :func:`_samme_proba` would
+    compute for an observation falling into this leaf.
+    """
+    n_classes = len(model.classes_)
+    counts = estimator.tree_.value[:, 0, :].astype(np.float64)
+    total = counts.sum(axis=1, keepdims=True)
+    total[total == 0] = 1.
+    proba = counts / total
+    if model.algorithm == 'SAMME.R':
+        log_proba = np.log(np.clip(proba, np.finfo(float).eps, None))
+        return (n_classes - 1) * (
+            log_proba - log_proba.mean(axis=1, keepdims=True))
+    weight = model.estimator_weights_[i_est]
+    if _scikit_learn_before_022():
+        return proba * weight
+    best = proba.argmax(axis=1)
+    return (np.arange(n_classes) == best[:, np.newaxis]) * weight
+
+
+def _trees_proba(scope, container, operator, model):
+    """
+    Every estimator is a decision tree, they are merged into
+    a single *TreeEnsembleClassifier*, every leaf stores its
+    contribution to the weighted sum (see :func:`_trees_leaf_values`).
+    """
+    n_estimators = len(model.estimators_)
+    attr_pairs = get_default_tree_classifier_attribute_pairs()
+    attr_pairs['name'] = scope.get_unique_operator_name(
+        'TreeEnsembleClassifier')
+    attr_pairs['classlabels_int64s'] = list(range(len(model.classes_)))
+    leaf_values = [_trees_leaf_values(model, i, est)
+                   for i, est in enumerate(model.estimators_)]
+    add_trees_to_attribute_pairs(
+        attr_pairs, True, [est.tree_ for est in model.estimators_],
+        list(range(n_estimators)), 1., 0, False, True,
+        dtype=container.dtype, leaf_values=leaf_values)
+
+    label_name = scope.get_unique_variable_name('label')
+    proba_name = scope.get_unique_variable_name('proba')
+    container.add_node(
+        'TreeEnsembleClassifier', operator.input_full_names,
+        [label_name, proba_name], op_domain='ai.onnx.ml', **attr_pairs)
+    return proba_name
+
+
 def _normalise_probability(scope, container, operator, proba_names_list,
                            model):
     est_weights_sum_name = scope.get_unique_variable_name('est_weights_sum')
@@ -157,6 +211,8 @@ def convert_sklearn_ada_boost_classifier(scope, operator, container):
     picked during trainging (SAMME.R or SAMME) and normalises
     the probability score for the final result. Label is
     calculated by simply doing an argmax of the probability scores.
+    If every estimator is a decision tree, the weighted sum
+    is computed by a single TreeEnsembleClassifier.
     """
     if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
         raise RuntimeError(
@@ -187,7 +243,14 @@ def convert_sklearn_ada_boost_classifier(scope, operator, container):
     one_name = None
     classes_ind_name = None
 
-    for i_est, estimator in enumerate(op.estimators_):
+    if all(isinstance(est, DecisionTreeClassifier) and
+           est.n_classes_ == len(classes) for est in op.estimators_):
+        proba_names_list.append(_trees_proba(scope, container, operator, op))
+        estimators = []
+    else:
+        estimators = op.estimators_
+
+    for i_est, estimator in enumerate(estimators):
         label_name = scope.declare_local_variable('elab_name_%d' % i_est)
         proba_name = scope.declare_local_variable('eprob_name_%d' % i_est)
 
@@ -303,107 +366,54 @@ def _get_estimators_label(scope, operator, container, model):
     return concatenated_labels_name
 
 
-def cum_sum(scope, container, rnn_input_name, sequence_length):
+def cum_sum(scope, container, input_name, sequence_length):
+    """
+    Computes the cumulative sum of *input_name* along the second axis.
+    Operator *CumSum* is only available since opset 11, before that,
+    the sum is the product with an upper triangular matrix of ones.
+    """
     opv = container.target_opset
     weights_cdf_name = scope.get_unique_variable_name('weights_cdf')
     if opv < 11:
-        transposed_input_name = scope.get_unique_variable_name(
-            'transposed_input')
-        reshaped_result_name = scope.get_unique_variable_name(
-            'reshaped_result')
-        weights_name = scope.get_unique_variable_name('weights')
-        rec_weights_name = scope.get_unique_variable_name('rec_weights')
-        rnn_output_name = scope.get_unique_variable_name('rnn_output')
-        permuted_rnn_y_name = scope.get_unique_variable_name('permuted_rnn_y')
-
-        container.add_initializer(weights_name,
-                                  container.proto_dtype, [1, 1, 1], [1])
-        container.add_initializer(rec_weights_name,
-                                  container.proto_dtype, [1, 1, 1], [1])
-
-        apply_transpose(scope, rnn_input_name, transposed_input_name,
-                        container, perm=(1, 0))
-        apply_reshape(scope, transposed_input_name, reshaped_result_name,
-                      container, desired_shape=(sequence_length, -1, 1))
+        triangle_name = scope.get_unique_variable_name('triangle')
+        container.add_initializer(
+            triangle_name, container.proto_dtype,
+            [sequence_length, sequence_length],
+            np.triu(np.ones((sequence_length, sequence_length))).ravel())
         container.add_node(
-            'RNN', inputs=[reshaped_result_name,
-                           weights_name, rec_weights_name],
-            outputs=[rnn_output_name], activations=['Affine'],
-            name=scope.get_unique_operator_name('RNN'),
-            activation_alpha=[1.0], activation_beta=[0.0], hidden_size=1)
-        apply_transpose(scope, rnn_output_name, permuted_rnn_y_name, container,
-                        perm=(2, 0, 1, 3))
-        apply_reshape(
-            scope, permuted_rnn_y_name, weights_cdf_name, container,
-            desired_shape=(-1, sequence_length))
+            'MatMul', [input_name, triangle_name], weights_cdf_name,
+            name=scope.get_unique_operator_name('MatMul'))
     else:
         axis_name = scope.get_unique_variable_name('axis_name')
         container.add_initializer(axis_name, onnx_proto.TensorProto.INT32,
                                   [], [1])
         container.add_node(
-            'CumSum', [rnn_input_name, axis_name], [weights_cdf_name],
+            'CumSum', [input_name, axis_name], [weights_cdf_name],
             name=scope.get_unique_operator_name('CumSum'),
             op_version=11)
     return weights_cdf_name
 
 
-def _apply_gather_elements(scope, container, inputs, output, axis,
-                           dim, zero_type, suffix):
-    if container.target_opset >= 11:
-        container.add_node(
-            'GatherElements', inputs, output, op_version=11, axis=axis,
-            name=scope.get_unique_operator_name('GatEls' + suffix))
-    else:
-        classes_ind_name = scope.get_unique_variable_name('classes_ind2')
-        container.add_initializer(
-            classes_ind_name, onnx_proto.TensorProto.INT64,
-            (1, dim), list(range(dim)))
-
-        shape_name = scope.get_unique_variable_name('shape')
-        container.add_node(
-            'Shape', inputs[0], shape_name,
-            name=scope.get_unique_operator_name('Shape'))
-        zero_name = scope.get_unique_variable_name('zero')
-        zero_val = (0 if zero_type == onnx_proto.TensorProto.INT64
-                    else 0.)
-        container.add_node(
-            'ConstantOfShape', shape_name, zero_name,
-            name=scope.get_unique_operator_name('CoSA'),
-            value=make_tensor("value", zero_type,
-                              (1, ), [zero_val]), op_version=9)
-
-        equal_name = scope.get_unique_variable_name('equal')
-        container.add_node('Equal', [inputs[1], classes_ind_name],
-                           equal_name,
-                           name=scope.get_unique_operator_name('Equal'))
-
-        selected = scope.get_unique_variable_name('selected')
-        container.add_node('Where', [equal_name, inputs[0], zero_name],
-                           selected,
-                           name=scope.get_unique_operator_name('Where'))
-        container.add_node('ReduceSum', selected, output, axes=[1],
-                           name=scope.get_unique_operator_name('Where'))
-
-
 def convert_sklearn_ada_boost_regressor(scope, operator, container):
     """
     Converter for AdaBoost regressor.
     This function first calls _get_estimators_label() which returns a
     tensor of concatenated labels predicted by each estimator. Then,
-    median is calculated and returned as the final output.
+    the weighted median is calculated and returned as the final output.
 
-    Note: This function creates an ONNX model which can predict on only
-    one instance at a time because ArrayFeatureExtractor can only
-    extract based on the last axis, so we can't fetch different columns
-    for different rows.
+    The labels are sorted with *TopK*, the weights follow the same
+    order and their cumulative sum tells which labels are above the
+    median. The median is the lowest of them, no index needs to be
+    gathered.
     """
     op = operator.raw_operator
+    n_estimators = len(op.estimators_)
 
-    negate_name = scope.get_unique_variable_name('negate')
     estimators_weights_name = scope.get_unique_variable_name(
         'estimators_weights')
     half_scalar_name = scope.get_unique_variable_name('half_scalar')
     last_index_name = scope.get_unique_variable_name('last_index')
+    inf_name = scope.get_unique_variable_name('inf')
     negated_labels_name = scope.get_unique_variable_name('negated_labels')
     sorted_values_name = scope.get_unique_variable_name('sorted_values')
     sorted_indices_name = scope.get_unique_variable_name('sorted_indices')
@@ -411,15 +421,11 @@ def convert_sklearn_ada_boost_regressor(scope, operator, container):
         'array_feat_extractor_output')
     median_value_name = scope.get_unique_variable_name('median_value')
     comp_value_name = scope.get_unique_variable_name('comp_value')
-    median_or_above_name = scope.get_unique_variable_name('median_or_above')
-    median_idx_name = scope.get_unique_variable_name('median_idx')
-    cast_result_name = scope.get_unique_variable_name('cast_result')
+    below_median_name = scope.get_unique_variable_name('below_median')
+    selected_name = scope.get_unique_variable_name('selected')
+    negated_median_name = scope.get_unique_variable_name('negated_median')
     reshaped_weights_name = scope.get_unique_variable_name('reshaped_weights')
-    median_estimators_name = scope.get_unique_variable_name(
-        'median_estimators')
 
-    container.add_initializer(negate_name, container.proto_dtype,
-                              [], [-1])
     container.add_initializer(estimators_weights_name,
                               container.proto_dtype,
                               [len(op.estimator_weights_)],
@@ -427,15 +433,17 @@ def convert_sklearn_ada_boost_regressor(scope, operator, container):
     container.add_initializer(half_scalar_name, container.proto_dtype,
                               [], [0.5])
     container.add_initializer(last_index_name, onnx_proto.TensorProto.INT64,
-                              [], [len(op.estimators_) - 1])
+                              [], [n_estimators - 1])
+    container.add_initializer(inf_name, container.proto_dtype,
+                              [], [-np.inf])
 
     concatenated_labels = _get_estimators_label(scope, operator,
                                                 container, op)
-    apply_mul(scope, [concatenated_labels, negate_name],
-              negated_labels_name, container, broadcast=1)
+    # sorted_values contains the labels in ascending order, negated
+    apply_neg(scope, concatenated_labels, negated_labels_name, container)
     apply_topk(scope, negated_labels_name,
                [sorted_values_name, sorted_indices_name],
-               container, k=len(op.estimators_))
+               container, k=n_estimators)
     container.add_node(
         'ArrayFeatureExtractor',
         [estimators_weights_name, sorted_indices_name],
@@ -443,10 +451,9 @@ def convert_sklearn_ada_boost_regressor(scope, operator, container):
         name=scope.get_unique_operator_name('ArrayFeatureExtractor'))
     apply_reshape(
         scope, array_feat_extractor_output_name, reshaped_weights_name,
-        container, desired_shape=(-1, len(op.estimators_)))
+        container, desired_shape=(-1, n_estimators))
     weights_cdf_name = cum_sum(
-        scope, container, reshaped_weights_name,
-        len(op.estimators_))
+        scope, container, reshaped_weights_name, n_estimators)
     container.add_node(
         'ArrayFeatureExtractor', [weights_cdf_name, last_index_name],
         median_value_name, op_domain='ai.onnx.ml',
@@ -455,22 +462,19 @@ def convert_sklearn_ada_boost_regressor(scope, operator, container):
               comp_value_name, container, broadcast=1)
     container.add_node(
         'Less', [weights_cdf_name, comp_value_name],
-        median_or_above_name,
+        below_median_name,
         name=scope.get_unique_operator_name('Less'))
-    apply_cast(scope, median_or_above_name, cast_result_name,
-               container, to=container.proto_dtype)
-    container.add_node('ArgMin', cast_result_name,
-                       median_idx_name,
-                       name=scope.get_unique_operator_name('ArgMin'), axis=1)
-    _apply_gather_elements(
-        scope, container, [sorted_indices_name, median_idx_name],
-        median_estimators_name, axis=1, dim=len(op.estimators_),
-        zero_type=onnx_proto.TensorProto.INT64, suffix="A")
-    output_name = operator.output_full_names[0]
-    _apply_gather_elements(
-        scope, container, [concatenated_labels, median_estimators_name],
-        output_name, axis=1, dim=len(op.estimators_),
-        zero_type=onnx_proto.TensorProto.FLOAT, suffix="B")
+    # The first label whose cumulated weight reaches half the total
+    # is the highest negated label among the remaining ones.
+    container.add_node(
+        'Where', [below_median_name, inf_name, sorted_values_name],
+        selected_name, name=scope.get_unique_operator_name('Where'),
+        op_version=9)
+    container.add_node(
+        'ReduceMax', selected_name, negated_median_name, axes=[1],
+        keepdims=1, name=scope.get_unique_operator_name('ReduceMax'))
+    apply_neg(scope, negated_median_name, operator.output_full_names[0],
+              container)
 
 
 register_converter('SklearnAdaBoostClassifier',
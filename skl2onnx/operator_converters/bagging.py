@@ -5,6 +5,7 @@
 # --------------------------------------------------------------------------
 
 import numpy as np
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 from .._supported_operators import sklearn_operator_name_map
 from ..common._apply_operation import (
     apply_cast, apply_concat,
@@ -12,9 +13,74 @@ from ..common._apply_operation import (
 )
 from ..common._registration import register_converter
 from ..common._topology import FloatTensorType
+from ..common.data_types import Int64TensorType
+from ..common.tree_ensemble import (
+    add_trees_to_attribute_pairs,
+    get_default_tree_classifier_attribute_pairs,
+    get_default_tree_regressor_attribute_pairs,
+)
 from ..proto import onnx_proto
 
 
+def _check_features(model):
+    if (not (isinstance(model.max_features, float) and
+             model.max_features == 1.0)):
+        raise NotImplementedError(
+            "Not default values for max_features is "
+            "not supported with {} yet unless all estimators "
+            "are decision trees. "
+            "You may raise an issue at "
+            "https://github.com/onnx/sklearn-onnx/issues".format(
+                model.__class__.__name__))
+    if model.bootstrap_features:
+        raise NotImplementedError(
+            "bootstrap_features=True is "
+            "not supported with {} yet unless all estimators "
+            "are decision trees. "
+            "You may raise an issue at "
+            "https://github.com/onnx/sklearn-onnx/issues".format(
+                model.__class__.__name__))
+
+
+def _calculate_proba_trees(scope, operator, container, model):
+    """
+    Every estimator is a decision tree, they are merged into
+    a single *TreeEnsembleClassifier*. Every leaf stores the
+    probabilities of the tree divided by the number of trees,
+    feature ids are mapped to the columns every tree was trained on.
+    """
+    final_proba_name = operator.outputs[1].full_name
+    n_classes = len(model.classes_)
+    n_estimators = len(model.estimators_)
+    attr_pairs = get_default_tree_classifier_attribute_pairs()
+    attr_pairs['name'] = scope.get_unique_operator_name(
+        'TreeEnsembleClassifier')
+    attr_pairs['classlabels_int64s'] = list(range(n_classes))
+
+    leaf_values = []
+    for estimator in model.estimators_:
+        # A tree only knows the classes of its bootstrap sample.
+        counts = estimator.tree_.value[:, 0, :].astype(np.float64)
+        total = counts.sum(axis=1, keepdims=True)
+        total[total == 0] = 1.
+        proba = np.zeros((counts.shape[0], n_classes))
+        proba[:, estimator.classes_.astype(np.int64)] = counts / total
+        leaf_values.append(proba)
+
+    add_trees_to_attribute_pairs(
+        attr_pairs, True, [est.tree_ for est in model.estimators_],
+        list(range(n_estimators)), 1. / n_estimators, 0, False, True,
+        dtype=container.dtype, feature_ids=model.estimators_features_,
+        leaf_values=leaf_values)
+
+    label_name = scope.get_unique_variable_name('label')
+    container.add_node(
+        'TreeEnsembleClassifier', operator.input_full_names,
+        [label_name, final_proba_name], op_domain='ai.onnx.ml',
+        **attr_pairs)
+    return final_proba_name
+
+
 def _calculate_proba(scope, operator, container, model):
     """
     This function calculates class probability scores for
@@ -89,19 +155,10 @@ def convert_sklearn_bagging_classifier(scope, operator, container):
                 operator.raw_operator.__class__.__name__))
 
     bagging_op = operator.raw_operator
-    if (not (isinstance(bagging_op.max_features, float) and
-             bagging_op.max_features == 1.0)):
-        raise NotImplementedError(
-            "Not default values for max_features is "
-            "not supported with BaggingClassifier yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
-    if bagging_op.bootstrap_features:
-        raise NotImplementedError(
-            "bootstrap_features=True is "
-            "not supported with BaggingClassifier yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
+    trees = all(isinstance(est, DecisionTreeClassifier)
+                for est in bagging_op.estimators_)
+    if not trees:
+        _check_features(bagging_op)
     classes = bagging_op.classes_
     output_shape = (-1,)
     classes_name = scope.get_unique_variable_name('classes')
@@ -119,7 +176,12 @@ def convert_sklearn_bagging_classifier(scope, operator, container):
 
     container.add_initializer(classes_name, class_type, classes.shape, classes)
 
-    proba_name = _calculate_proba(scope, operator, container, bagging_op)
+    if trees:
+        proba_name = _calculate_proba_trees(scope, operator, container,
+                                            bagging_op)
+    else:
+        proba_name = _calculate_proba(scope, operator, container,
+                                      bagging_op)
     container.add_node('ArgMax', proba_name,
                        argmax_output_name,
                        name=scope.get_unique_operator_name('ArgMax'), axis=1)
@@ -144,24 +206,42 @@ def convert_sklearn_bagging_classifier(scope, operator, container):
                       desired_shape=output_shape)
 
 
+def _convert_bagging_regressor_trees(scope, operator, container, model):
+    """
+    Every estimator is a decision tree, they are merged into
+    a single *TreeEnsembleRegressor* which averages them.
+    """
+    n_estimators = len(model.estimators_)
+    attrs = get_default_tree_regressor_attribute_pairs()
+    attrs['name'] = scope.get_unique_operator_name('TreeEnsembleRegressor')
+    attrs['n_targets'] = int(model.estimators_[0].n_outputs_)
+    add_trees_to_attribute_pairs(
+        attrs, False, [est.tree_ for est in model.estimators_],
+        list(range(n_estimators)), 1. / n_estimators, 0, False, True,
+        dtype=container.dtype, feature_ids=model.estimators_features_)
+
+    input_name = operator.input_full_names
+    if type(operator.inputs[0].type) == Int64TensorType:
+        input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, operator.input_full_names, input_name,
+                   container, to=onnx_proto.TensorProto.FLOAT)
+
+    container.add_node(
+        'TreeEnsembleRegressor', input_name,
+        operator.outputs[0].full_name, op_domain='ai.onnx.ml', **attrs)
+
+
 def convert_sklearn_bagging_regressor(scope, operator, container):
     """
     Converter for BaggingRegressor.
     """
     bagging_op = operator.raw_operator
-    if (not (isinstance(bagging_op.max_features, float) and
-             bagging_op.max_features == 1.0)):
-        raise NotImplementedError(
-            "Not default values for max_features is "
-            "not supported with BaggingRegressor yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
-    if bagging_op.bootstrap_features:
-        raise NotImplementedError(
-            "bootstrap_features=True is "
-            "not supported with BaggingRegressor yet. "
-            "You may raise an issue at "
-            "https://github.com/onnx/sklearn-onnx/issues")
+    if all(isinstance(est, DecisionTreeRegressor)
+           for est in bagging_op.estimators_):
+        _convert_bagging_regressor_trees(scope, operator, container,
+                                         bagging_op)
+        return
+    _check_features(bagging_op)
     proba_list = []
     for index, estimator in enumerate(bagging_op.estimators_):
         op_type = sklearn_operator_name_map[type(estimator)]
@@ -5,17 +5,23 @@
 # --------------------------------------------------------------------------
 
 import numpy as np
+from sklearn.linear_model import SGDClassifier
 
 from ..proto import onnx_proto
 from ..common._apply_operation import (
-    apply_abs, apply_add, apply_cast, apply_concat, apply_clip,
-    apply_div, apply_exp, apply_mul, apply_reshape, apply_sub)
+    apply_add, apply_cast, apply_concat, apply_div, apply_exp, apply_mul,
+    apply_reshape, apply_slice, apply_sub)
 from ..common._topology import FloatTensorType
 from ..common._registration import register_converter
-from .._supported_operators import decision_function_classifiers
 from .._supported_operators import sklearn_operator_name_map
 
 
+# Classifiers with converters supporting decision_function().
+decision_function_classifiers = (
+    SGDClassifier,
+)
+
+
 def _handle_zeros(scope, container, concatenated_prob_name,
                   reduced_prob_name, n_classes):
     """
@@ -53,9 +59,10 @@ def _handle_zeros(scope, container, concatenated_prob_name,
     return masked_concatenated_prob_name, masked_reduced_prob_name
 
 
-def _transform_sigmoid(scope, container, model, df_col_name, k):
+def _transform_sigmoid(scope, container, T, calibrators):
     """
-    Sigmoid Calibration method
+    Sigmoid calibration method, every column of *T* has its
+    own calibrator: ``1 / (1 + exp(a * T + b))``.
     """
     a_name = scope.get_unique_variable_name('a')
     b_name = scope.get_unique_variable_name('b')
@@ -69,177 +76,148 @@ def _transform_sigmoid(scope, container, model, df_col_name, k):
         'sigmoid_predict_result')
 
     container.add_initializer(a_name, onnx_proto.TensorProto.FLOAT,
-                              [], [model.calibrators_[k].a_])
+                              [1, len(calibrators)],
+                              [cal.a_ for cal in calibrators])
     container.add_initializer(b_name, onnx_proto.TensorProto.FLOAT,
-                              [], [model.calibrators_[k].b_])
+                              [1, len(calibrators)],
+                              [cal.b_ for cal in calibrators])
     container.add_initializer(unity_name, onnx_proto.TensorProto.FLOAT,
                               [], [1])
 
-    apply_mul(scope, [a_name, df_col_name], a_df_prod_name, container,
-              broadcast=0)
+    apply_mul(scope, [T, a_name], a_df_prod_name, container, broadcast=1)
     apply_add(scope, [a_df_prod_name, b_name], exp_parameter_name,
-              container, broadcast=0)
+              container, broadcast=1)
     apply_exp(scope, exp_parameter_name, exp_result_name, container)
     apply_add(scope, [unity_name, exp_result_name], denominator_name,
-              container, broadcast=0)
+              container, broadcast=1)
     apply_div(scope, [unity_name, denominator_name],
-              sigmoid_predict_result_name, container, broadcast=0)
+              sigmoid_predict_result_name, container, broadcast=1)
     return sigmoid_predict_result_name
 
 
-def _transform_isotonic(scope, container, model, T, k):
+def _isotonic_points(calibrator):
     """
-    Isotonic calibration method
-    This function can only handle one instance at a time because
-    ArrayFeatureExtractor can only extract based on the last axis,
-    so we can't fetch different columns for different rows.
+    Returns the points *IsotonicRegression* interpolates.
     """
-    if model.calibrators_[k].out_of_bounds == 'clip':
-        clipped_df_name = scope.get_unique_variable_name('clipped_df')
-
-        apply_clip(scope, T, clipped_df_name, container,
-                   operator_name=scope.get_unique_operator_name('Clip'),
-                   max=model.calibrators_[k].X_max_,
-                   min=model.calibrators_[k].X_min_)
-        T = clipped_df_name
-
-    reshaped_df_name = scope.get_unique_variable_name('reshaped_df')
-    calibrator_x_name = scope.get_unique_variable_name('calibrator_x')
-    calibrator_y_name = scope.get_unique_variable_name('calibrator_y')
-    distance_name = scope.get_unique_variable_name('distance')
-    absolute_distance_name = scope.get_unique_variable_name(
-        'absolute_distance')
-    nearest_x_index_name = scope.get_unique_variable_name(
-        'nearest_x_index')
-    nearest_y_name = scope.get_unique_variable_name('nearest_y')
-
-    container.add_initializer(
-        calibrator_x_name, onnx_proto.TensorProto.FLOAT,
-        [len(model.calibrators_[k]._X_)], model.calibrators_[k]._X_)
-    container.add_initializer(
-        calibrator_y_name, onnx_proto.TensorProto.FLOAT,
-        [len(model.calibrators_[k]._y_)], model.calibrators_[k]._y_)
-
-    apply_reshape(scope, T, reshaped_df_name, container,
-                  desired_shape=(-1, 1))
-    apply_sub(scope, [reshaped_df_name, calibrator_x_name],
-              distance_name, container, broadcast=1)
-    apply_abs(scope, distance_name, absolute_distance_name, container)
-    container.add_node('ArgMin', absolute_distance_name,
-                       nearest_x_index_name, axis=1,
-                       name=scope.get_unique_operator_name('ArgMin'))
-    container.add_node(
-        'ArrayFeatureExtractor',
-        [calibrator_y_name, nearest_x_index_name],
-        nearest_y_name, op_domain='ai.onnx.ml',
-        name=scope.get_unique_operator_name('ArrayFeatureExtractor'))
+    for x, y in [('X_thresholds_', 'y_thresholds_'),
+                 ('_necessary_X_', '_necessary_y_'), ('_X_', '_y_')]:
+        if hasattr(calibrator, x):
+            return (np.asarray(getattr(calibrator, x), dtype=np.float64),
+                    np.asarray(getattr(calibrator, y), dtype=np.float64))
+    raise RuntimeError("Unable to find the points of the isotonic "
+                       "regression.")
 
-    nearest_y_name_reshaped = scope.get_unique_variable_name(
-        'nearest_y_name_reshaped')
-    apply_reshape(scope, nearest_y_name,
-                  nearest_y_name_reshaped, container,
-                  desired_shape=(-1, 1))
-    return nearest_y_name_reshaped
 
+def _transform_isotonic(scope, container, T, calibrators):
+    """
+    Isotonic calibration method, every column of *T* has its
+    own calibrator. The thresholds of all calibrators are stored
+    in one table, every calibrator uses a block of *width* rows,
+    a power of two, padded with infinity. A binary search unrolled
+    over the bits of *width* finds the threshold just below every
+    score, then the score is linearly interpolated with the slope
+    of this segment computed at conversion time,
+    like *scipy.interpolate.interp1d* does.
+    """
+    points = [_isotonic_points(cal) for cal in calibrators]
+    n_cols = len(calibrators)
+    width = 1
+    while width < max(len(x) for x, _ in points):
+        width *= 2
+
+    thresholds = np.full((n_cols, width), np.inf)
+    values = np.empty((n_cols, width))
+    slopes = np.zeros((n_cols, width))
+    x_min = np.full(n_cols, -np.inf)
+    x_max = np.full(n_cols, np.inf)
+    for k, ((x, y), cal) in enumerate(zip(points, calibrators)):
+        n = len(x)
+        thresholds[k, :n] = x
+        values[k, :n] = y
+        values[k, n:] = y[-1]
+        # Segments between equal thresholds are never selected,
+        # their slope is null instead of inf or nan.
+        dx = x[1:] - x[:-1]
+        np.divide(y[1:] - y[:-1], dx, out=slopes[k, :n - 1], where=dx > 0)
+        if cal.out_of_bounds == 'clip':
+            x_min[k] = cal.X_min_
+            x_max[k] = cal.X_max_
+
+    names = {}
+    for name, value in [('thresholds', thresholds), ('values', values),
+                        ('slopes', slopes)]:
+        names[name] = scope.get_unique_variable_name(name)
+        container.add_initializer(names[name], onnx_proto.TensorProto.FLOAT,
+                                  [value.size], value.ravel())
+    for name, value in [('x_min', x_min), ('x_max', x_max)]:
+        names[name] = scope.get_unique_variable_name(name)
+        container.add_initializer(names[name], onnx_proto.TensorProto.FLOAT,
+                                  [1, n_cols], value)
+    names['start'] = scope.get_unique_variable_name('start')
+    container.add_initializer(names['start'], onnx_proto.TensorProto.INT64,
+                              [1, n_cols], np.arange(n_cols) * width)
+
+    clipped_name = scope.get_unique_variable_name('clipped_df')
+    below_max_name = scope.get_unique_variable_name('below_max')
+    container.add_node('Min', [T, names['x_max']], below_max_name,
+                       name=scope.get_unique_operator_name('Min'),
+                       op_version=8)
+    container.add_node('Max', [below_max_name, names['x_min']],
+                       clipped_name,
+                       name=scope.get_unique_operator_name('Max'),
+                       op_version=8)
+
+    index_name = names['start']
+    step = width // 2
+    while step > 0:
+        step_name = scope.get_unique_variable_name('step')
+        container.add_initializer(step_name, onnx_proto.TensorProto.INT64,
+                                  [], [step])
+        candidate_name = scope.get_unique_variable_name('candidate')
+        apply_add(scope, [index_name, step_name], candidate_name,
+                  container, broadcast=1)
+        threshold_name = scope.get_unique_variable_name('threshold')
+        container.add_node('Gather', [names['thresholds'], candidate_name],
+                           threshold_name,
+                           name=scope.get_unique_operator_name('Gather'))
+        below_name = scope.get_unique_variable_name('below')
+        container.add_node('Less', [clipped_name, threshold_name],
+                           below_name,
+                           name=scope.get_unique_operator_name('Less'))
+        new_index_name = scope.get_unique_variable_name('index')
+        container.add_node('Where', [below_name, index_name, candidate_name],
+                           new_index_name,
+                           name=scope.get_unique_operator_name('Where'),
+                           op_version=9)
+        index_name = new_index_name
+        step //= 2
+
+    gathered = {}
+    for name in ['thresholds', 'values', 'slopes']:
+        gathered[name] = scope.get_unique_variable_name('segment_' + name)
+        container.add_node('Gather', [names[name], index_name],
+                           gathered[name],
+                           name=scope.get_unique_operator_name('Gather'))
+    delta_name = scope.get_unique_variable_name('delta')
+    apply_sub(scope, [clipped_name, gathered['thresholds']], delta_name,
+              container, broadcast=1)
+    increase_name = scope.get_unique_variable_name('increase')
+    apply_mul(scope, [delta_name, gathered['slopes']], increase_name,
+              container, broadcast=1)
+    isotonic_name = scope.get_unique_variable_name('isotonic_predict')
+    apply_add(scope, [gathered['values'], increase_name], isotonic_name,
+              container, broadcast=1)
+    return isotonic_name
 
-def convert_calibrated_classifier_base_estimator(scope, operator, container,
-                                                 model):
-    # Computational graph:
-    #
-    # In the following graph, variable names are in lower case characters only
-    # and operator names are in upper case characters. We borrow operator names
-    # from the official ONNX spec:
-    # https://github.com/onnx/onnx/blob/master/docs/Operators.md
-    # All variables are followed by their shape in [].
-    #
-    # Symbols:
-    # M: Number of instances
-    # N: Number of features
-    # C: Number of classes
-    # CLASSIFIERCONVERTER: classifier converter corresponding to the op_type
-    # a: slope in sigmoid model
-    # b: intercept in sigmoid model
-    # k: variable in the range [0, C)
-    # input: input
-    # class_prob_tensor: tensor with class probabilities(function output)
-    #
-    # Graph:
-    #
-    #   input [M, N] -> CLASSIFIERCONVERTER -> label [M]
-    #                          |
-    #                          V
-    #                    probability_tensor [M, C]
-    #                          |
-    #         .----------------'---------.
-    #         |                          |
-    #         V                          V
-    # ARRAYFEATUREEXTRACTOR <- k [1] -> ARRAYFEATUREEXTRACTOR
-    #         |                          |
-    #         V                          V
-    #  transposed_df_col[M, 1] transposed_df_col[M, 1]
-    #       |--------------------------|----------.--------------------------.
-    #       |                          |          |                          |
-    #       |if model.method='sigmoid' |          |if model.method='isotonic'|
-    #       |                          |          |                          |
-    #       V                          V          |if out_of_bounds='clip'   |
-    #      MUL <-------- a -------->  MUL         V                          V
-    #       |                          |          CLIP     ...             CLIP
-    #       V                          V          |                          |
-    #  a_df_prod [M, 1]  ... a_df_prod [M, 1]     V                          V
-    #       |                          |  clipped_df [M, 1]...clipped_df [M, 1]
-    #       V                          V          |                          |
-    #      ADD <--------- b ---------> ADD        '-------------------.------'
-    #         |                          |                            |
-    #         V                          V                            |
-    #  exp_parameter [M, 1] ...   exp_parameter [M, 1]                |
-    #         |                          |                            |
-    #         V                          V                            |
-    #        EXP        ...             EXP                           |
-    #         |                          |                            |
-    #         V                          V                            |
-    #  exp_result [M, 1]  ...    exp_result [M, 1]                    |
-    #         |                          |                            |
-    #         V                          V                            |
-    #       ADD <------- unity -------> ADD                           |
-    #         |                          |                            |
-    #         V                          V                            |
-    #  denominator [M, 1]  ...   denominator [M, 1]                   |
-    #         |                          |                            |
-    #         V                          V                            |
-    #        DIV <------- unity ------> DIV                           |
-    #         |                          |                            |
-    #         V                          V                            |
-    # sigmoid_predict_result [M, 1] ... sigmoid_predict_result [M, 1] |
-    #         |                          |                            |
-    #         '-----.--------------------'                            |
-    #               |-------------------------------------------------'
-    #               |
-    #               V
-    #            CONCAT -> concatenated_prob [M, C]
-    #                          |
-    #        if  C = 2         |  if C != 2
-    #      .-------------------'---------------------------.---------.
-    #      |                                               |         |
-    #      V                                               |         V
-    # ARRAYFEATUREEXTRACTOR <- col_number [1]              |    REDUCESUM
-    #                   |                                  |         |
-    #                   '--------------------------------. |         |
-    # unit_float_tensor [1] -> SUB <- first_col [M, 1] <-' |         |
-    #                           |                         /          |
-    #                           V                        V           V
-    #                         CONCAT                    DIV <- reduced_prob [M]
-    #                           |                        |
-    #                           V                        |
-    #                        class_prob_tensor [M, C] <--'
-    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
-        raise RuntimeError(
-            "Option 'nocl' is not implemented for operator '{}'.".format(
-                operator.raw_operator.__class__.__name__))
 
+def _get_base_estimator_scores(scope, operator, container, model):
+    """
+    Converts the base estimator of one fold and returns the scores
+    its calibrators take, one column per calibrator.
+    """
     base_model = model.base_estimator
     op_type = sklearn_operator_name_map[type(base_model)]
     n_classes = len(model.classes_)
-    prob_name = [None] * n_classes
 
     this_operator = scope.declare_local_operator(op_type)
     this_operator.raw_operator = base_model
@@ -251,74 +229,20 @@ def convert_calibrated_classifier_base_estimator(scope, operator, container,
     this_operator.outputs.append(df_name)
     df_inp = df_name.full_name
 
-    for k in range(n_classes):
-        cur_k = k
-        if n_classes == 2:
-            cur_k += 1
-            # In case of binary classification, SVMs only return
-            # scores for the positive class. We concat the same
-            # column twice as we just use the second column.
-            if op_type in ('SklearnLinearSVC', 'SklearnSVC'):
-                df_input_name = scope.get_unique_variable_name('df_input')
-                merged_input_name = scope.get_unique_variable_name(
-                    'merged_input')
-
-                apply_reshape(scope, df_inp,
-                              df_input_name, container,
-                              desired_shape=(-1, 1))
-                apply_concat(scope, [df_input_name, df_input_name],
-                             merged_input_name, container, axis=1)
-                df_inp = merged_input_name
-        k_name = scope.get_unique_variable_name('k')
-        df_col_name = scope.get_unique_variable_name('transposed_df_col')
-        prob_name[k] = scope.get_unique_variable_name('prob_{}'.format(k))
-
-        container.add_initializer(k_name, onnx_proto.TensorProto.INT64,
-                                  [], [cur_k])
-
-        container.add_node(
-            'ArrayFeatureExtractor', [df_inp, k_name], df_col_name,
-            name=scope.get_unique_operator_name('ArrayFeatureExtractor'),
-            op_domain='ai.onnx.ml')
-        T = (_transform_sigmoid(scope, container, model, df_col_name, k)
-             if model.method == 'sigmoid' else
-             _transform_isotonic(scope, container, model, df_col_name, k))
-
-        prob_name[k] = T
-        if n_classes == 2:
-            break
-
-    if n_classes == 2:
-        zeroth_col_name = scope.get_unique_variable_name('zeroth_col')
-        merged_prob_name = scope.get_unique_variable_name('merged_prob')
-        unit_float_tensor_name = scope.get_unique_variable_name(
-            'unit_float_tensor')
-
-        container.add_initializer(unit_float_tensor_name,
-                                  onnx_proto.TensorProto.FLOAT, [], [1.0])
-
-        apply_sub(scope, [unit_float_tensor_name, prob_name[0]],
-                  zeroth_col_name, container, broadcast=1)
-        apply_concat(scope, [zeroth_col_name, prob_name[0]],
-                     merged_prob_name, container, axis=1)
-        class_prob_tensor_name = merged_prob_name
+    if n_classes != 2:
+        return df_inp
+    df_col_name = scope.get_unique_variable_name('transposed_df_col')
+    if op_type in ('SklearnLinearSVC', 'SklearnSVC'):
+        # In case of binary classification, SVMs only return
+        # scores for the positive class.
+        apply_reshape(scope, df_inp, df_col_name, container,
+                      desired_shape=(-1, 1))
     else:
-        concatenated_prob_name = scope.get_unique_variable_name(
-            'concatenated_prob')
-        reduced_prob_name = scope.get_unique_variable_name('reduced_prob')
-        calc_prob_name = scope.get_unique_variable_name('calc_prob')
-
-        apply_concat(scope, prob_name, concatenated_prob_name,
-                     container, axis=1)
-        container.add_node('ReduceSum', concatenated_prob_name,
-                           reduced_prob_name, axes=[1],
-                           name=scope.get_unique_operator_name('ReduceSum'))
-        num, deno = _handle_zeros(scope, container, concatenated_prob_name,
-                                  reduced_prob_name, n_classes)
-        apply_div(scope, [num, deno],
-                  calc_prob_name, container, broadcast=1)
-        class_prob_tensor_name = calc_prob_name
-    return class_prob_tensor_name
+        # Only the positive class is calibrated.
+        apply_slice(scope, df_inp, df_col_name, container, starts=[1],
+                    ends=[2], axes=[1],
+                    operator_name=scope.get_unique_operator_name('Slice'))
+    return df_col_name
 
 
 def convert_sklearn_calibrated_classifier_cv(scope, operator, container):
@@ -334,8 +258,11 @@ def convert_sklearn_calibrated_classifier_cv(scope, operator, container):
     # M: Number of instances
     # N: Number of features
     # C: Number of classes
-    # CONVERT_BASE_ESTIMATOR: base estimator convert function defined above
-    # clf_length: number of calibrated classifiers
+    # C': Number of calibrated columns, 1 if C = 2, C otherwise
+    # F: Number of calibrated classifiers (folds)
+    # CONVERT_BASE_ESTIMATOR: converter of the base estimator of a fold
+    # CALIBRATE: sigmoid or isotonic calibration of every column,
+    #            each column has its own parameters
     # input: input
     # output: output
     # class_prob: class probabilities
@@ -350,24 +277,40 @@ def convert_sklearn_calibrated_classifier_cv(scope, operator, container):
     # CONVERT_BASE_ESTIMATOR  CONVERT_BASE_ESTIMATOR ... CONVERT_BASE_ESTIMATOR
     #           |                   |                          |
     #           V                   V                          V
-    #  prob_scores_0 [M, C] prob_scores_1 [M, C] ... prob_scores_(clf_length-1)
-    #           |                   |                          |  [M, C]
+    #     scores_0 [M, C']    scores_1 [M, C']  ...  scores_(F-1) [M, C']
+    #           |                   |                          |
     #           '-------------------|--------------------------'
     #                               V
-    #       add_result [M, C] <--- SUM
-    #           |
-    #           '--> DIV <- clf_length [1]
-    #                 |
-    #                 V
-    #            class_prob [M, C] -> ARGMAX -> argmax_output [M, 1]
+    #                CONCAT -> scores [M, F * C'] -> CALIBRATE
     #                                                   |
-    #             classes -> ARRAYFEATUREEXTRACTOR  <---'
-    #                               |
-    #                               V
-    #                            output [1]
+    #                               probs [M, F * C'] <-'
+    #                                      |
+    #         if  C = 2                    |  if C != 2
+    #      .-------------------------------'---------.
+    #      |                                         V
+    #      V                                  RESHAPE [M, F, C]
+    #  REDUCEMEAN -> p [M, 1]                        |
+    #      |                               REDUCESUM, DIV (normalization)
+    #      V                                         |
+    #  CONCAT(1 - p, p)                        REDUCEMEAN over F
+    #      |                                         |
+    #      '--------> class_prob [M, C] <------------'
+    #                      |
+    #                      V
+    #                   ARGMAX -> argmax_output [M, 1]
+    #                                |
+    #   classes -> ARRAYFEATUREEXTRACTOR
+    #                      |
+    #                      V
+    #                   output [M]
+    if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
+        raise RuntimeError(
+            "Option 'nocl' is not implemented for operator '{}'.".format(
+                operator.raw_operator.__class__.__name__))
 
     op = operator.raw_operator
     classes = op.classes_
+    n_classes = len(classes)
     output_shape = (-1,)
     class_type = onnx_proto.TensorProto.STRING
 
@@ -380,19 +323,17 @@ def convert_sklearn_calibrated_classifier_cv(scope, operator, container):
         classes = np.array([s.encode('utf-8') for s in classes])
 
     clf_length = len(op.calibrated_classifiers_)
-    prob_scores_name = []
+    scores_names = []
+    calibrators = []
 
-    clf_length_name = scope.get_unique_variable_name('clf_length')
     classes_name = scope.get_unique_variable_name('classes')
     reshaped_result_name = scope.get_unique_variable_name('reshaped_result')
     argmax_output_name = scope.get_unique_variable_name('argmax_output')
     array_feature_extractor_result_name = scope.get_unique_variable_name(
         'array_feature_extractor_result')
-    add_result_name = scope.get_unique_variable_name('add_result')
+    scores_name = scope.get_unique_variable_name('scores')
 
     container.add_initializer(classes_name, class_type, classes.shape, classes)
-    container.add_initializer(clf_length_name, onnx_proto.TensorProto.FLOAT,
-                              [], [clf_length])
 
     for clf in op.calibrated_classifiers_:
         if (hasattr(clf.base_estimator, 'decision_function') and
@@ -403,15 +344,54 @@ def convert_sklearn_calibrated_classifier_cv(scope, operator, container):
                 "You may raise an issue at "
                 "https://github.com/onnx/sklearn-onnx/issues"
                 "".format(type(clf.base_estimator)))
-        prob_scores_name.append(convert_calibrated_classifier_base_estimator(
+        scores_names.append(_get_base_estimator_scores(
             scope, operator, container, clf))
+        calibrators.extend(clf.calibrators_[:1] if n_classes == 2
+                           else clf.calibrators_)
+
+    # The calibrators of all folds are applied at once.
+    apply_concat(scope, scores_names, scores_name, container, axis=1)
+    if op.method == 'sigmoid':
+        probs_name = _transform_sigmoid(scope, container, scores_name,
+                                        calibrators)
+    else:
+        probs_name = _transform_isotonic(scope, container, scores_name,
+                                         calibrators)
 
-    container.add_node('Sum', [s for s in prob_scores_name],
-                       add_result_name, op_version=7,
-                       name=scope.get_unique_operator_name('Sum'))
-    apply_div(scope, [add_result_name, clf_length_name],
-              operator.outputs[1].full_name, container, broadcast=1)
     class_prob_name = operator.outputs[1].full_name
+    if n_classes == 2:
+        mean_prob_name = scope.get_unique_variable_name('mean_prob')
+        zeroth_col_name = scope.get_unique_variable_name('zeroth_col')
+        unit_float_tensor_name = scope.get_unique_variable_name(
+            'unit_float_tensor')
+
+        container.add_initializer(unit_float_tensor_name,
+                                  onnx_proto.TensorProto.FLOAT, [], [1.0])
+        container.add_node('ReduceMean', probs_name, mean_prob_name,
+                           axes=[1], keepdims=1,
+                           name=scope.get_unique_operator_name('ReduceMean'))
+        apply_sub(scope, [unit_float_tensor_name, mean_prob_name],
+                  zeroth_col_name, container, broadcast=1)
+        apply_concat(scope, [zeroth_col_name, mean_prob_name],
+                     class_prob_name, container, axis=1)
+    else:
+        folded_prob_name = scope.get_unique_variable_name('folded_prob')
+        reduced_prob_name = scope.get_unique_variable_name('reduced_prob')
+        calc_prob_name = scope.get_unique_variable_name('calc_prob')
+
+        apply_reshape(scope, probs_name, folded_prob_name, container,
+                      desired_shape=(-1, clf_length, n_classes))
+        container.add_node('ReduceSum', folded_prob_name,
+                           reduced_prob_name, axes=[2],
+                           name=scope.get_unique_operator_name('ReduceSum'))
+        num, deno = _handle_zeros(scope, container, folded_prob_name,
+                                  reduced_prob_name, n_classes)
+        apply_div(scope, [num, deno],
+                  calc_prob_name, container, broadcast=1)
+        container.add_node('ReduceMean', calc_prob_name, class_prob_name,
+                           axes=[1], keepdims=0,
+                           name=scope.get_unique_operator_name('ReduceMean'))
+
     container.add_node('ArgMax', class_prob_name,
                        argmax_output_name,
                        name=scope.get_unique_operator_name('ArgMax'), axis=1)
@@ -4,6 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numpy as np
+from sklearn.ensemble import (
+    ExtraTreesClassifier, ExtraTreesRegressor,
+    RandomForestClassifier, RandomForestRegressor,
+)
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 from ..common.data_types import (Int64TensorType, Int64Type, FloatTensorType,
                                  FloatType, StringType)
 
@@ -69,3 +75,34 @@ def concatenate_variables(scope, variables, container):
                            op_domain='ai.onnx.ml', **attrs)
 
         return concatenated_name
+
+
+def get_voting_weights(model):
+    """
+    Returns the weights of the fitted estimators of
+    a *VotingClassifier* or a *VotingRegressor*, they sum to 1.
+    Dropped estimators are not part of ``model.estimators_``
+    and have no weight.
+    """
+    n_estimators = len(model.estimators_)
+    if model.weights is None:
+        return np.full(n_estimators, 1. / n_estimators)
+    weights = np.array([w for (_, est), w in zip(model.estimators,
+                                                 model.weights)
+                        if est is not None and not isinstance(est, str)],
+                       dtype=np.float64)
+    return weights / weights.sum()
+
+
+def get_decision_trees(model):
+    """
+    Returns the decision trees *model* averages, the model itself
+    for a decision tree, the estimators of a random forest,
+    None for any other model.
+    """
+    if isinstance(model, (DecisionTreeClassifier, DecisionTreeRegressor)):
+        return [model]
+    if isinstance(model, (RandomForestClassifier, RandomForestRegressor,
+                          ExtraTreesClassifier, ExtraTreesRegressor)):
+        return list(model.estimators_)
+    return None
@@ -14,7 +14,9 @@ from sklearn.linear_model import (
 )
 from sklearn.svm import LinearSVC
 from ..common._registration import register_converter
-from ..common.utils_classifier import get_label_classes
+from ..common.utils_classifier import (
+    get_label_classes, is_logistic_regression_ovr,
+)
 from ..proto import onnx_proto
 
 
@@ -54,11 +56,8 @@ def convert_sklearn_linear_classifier(scope, operator, container):
     if isinstance(op, (LinearSVC, RidgeClassifier, RidgeClassifierCV)):
         classifier_attrs['post_transform'] = 'NONE'
     elif isinstance(op, LogisticRegression):
-        ovr = (op.multi_class in ["ovr", "warn"] or
-               (op.multi_class == 'auto' and (op.classes_.size <= 2 or
-                                              op.solver == 'liblinear')))
         classifier_attrs['post_transform'] = (
-            'LOGISTIC' if ovr else 'SOFTMAX')
+            'LOGISTIC' if is_logistic_regression_ovr(op) else 'SOFTMAX')
     else:
         classifier_attrs['post_transform'] = (
             'LOGISTIC' if multi_class > 2 else 'SOFTMAX')
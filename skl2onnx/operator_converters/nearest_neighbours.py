@@ -4,9 +4,12 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numbers
 import numpy as np
 from ..common.data_types import Int64TensorType
 from ..algebra.onnx_ops import (
+    OnnxAbs,
+    OnnxAdd,
     OnnxArgMax,
     OnnxArrayFeatureExtractor,
     OnnxCast,
@@ -14,16 +17,25 @@ from ..algebra.onnx_ops import (
     OnnxDiv,
     OnnxEqual,
     OnnxFlatten,
+    OnnxGather,
+    OnnxGemm,
     OnnxIdentity,
+    OnnxMatMul,
     OnnxMax,
     OnnxMul,
+    OnnxPow,
     OnnxReciprocal,
     OnnxReduceMean,
     OnnxReduceSum,
+    OnnxReduceSumSquare,
     OnnxReshape,
     OnnxShape,
+    OnnxSqrt,
+    OnnxSqueeze,
+    OnnxSub,
     OnnxTopK_1,
     OnnxTranspose,
+    OnnxUnsqueeze,
 )
 try:
     from ..algebra.onnx_ops import OnnxTopK_10
@@ -33,41 +45,49 @@ try:
     from ..algebra.onnx_ops import OnnxTopK_11
 except ImportError:
     OnnxTopK_11 = None
+try:
+    from ..algebra.onnx_ops import OnnxGatherElements
+except ImportError:
+    OnnxGatherElements = None
 from ..algebra.complex_functions import onnx_cdist
 from ..common._registration import register_converter
 from ..common.utils_classifier import get_label_classes
 
 
-def onnx_nearest_neighbors_indices(X, Y, k, metric='euclidean', dtype=None,
-                                   op_version=None, keep_distances=False,
-                                   optim=None, **kwargs):
+# Above this number of classes, the kNN classifier does not store
+# an identity matrix to count the votes but compares every label
+# with every class. The matrix adds up to 256 kB in float32 and
+# 512 kB in float64 to the model. For 1000 rows and 5 neighbours,
+# both ways take the same time up to 256 classes (52.7 ms, 54.1 ms),
+# the gain is 5% for 1024 classes but the model grows by 4 MB.
+MAX_CLASSES_IDENTITY = 256
+
+
+def _onnx_nearest_neighbors_distances(X, Y, metric='euclidean', dtype=None,
+                                      op_version=None, optim=None,
+                                      **kwargs):
     """
-    Retrieves the nearest neigbours *ONNX*.
-    :param X: features or *OnnxOperatorMixin*
-    :param Y: neighbours or *OnnxOperatorMixin*
-    :param k: number of neighbours to retrieve
-    :param metric: requires metric
-    :param dtype: numerical type
-    :param op_version: opset version
-    :param keep_distance: returns the distances as well (second position)
-    :param optim: implements specific optimisations,
-        ``'cdist'`` replaces *Scan* operator by operator *CDist*
-    :param kwargs: additional parameters for function @see fn onnx_cdist
-    :return: top indices
+    Computes the distances between *X* and every row of *Y*.
     """
     if optim == 'cdist':
         from skl2onnx.algebra.custom_ops import OnnxCDist
-        dist = OnnxCDist(X, Y, metric=metric, op_version=op_version,
+        return OnnxCDist(X, Y, metric=metric, op_version=op_version,
                          **kwargs)
-    elif optim is None:
+    elif optim in (None, 'gemm', 'scan'):
         dim_in = Y.shape[1] if hasattr(Y, 'shape') else None
         dim_out = Y.shape[0] if hasattr(Y, 'shape') else None
-        dist = onnx_cdist(X, Y, metric=metric, dtype=dtype,
+        return onnx_cdist(X, Y, metric=metric, dtype=dtype,
                           op_version=op_version,
                           dim_in=dim_in, dim_out=dim_out,
-                          **kwargs)
-    else:
-        raise ValueError("Unknown optimisation '{}'.".format(optim))
+                          optim=optim, **kwargs)
+    raise ValueError("Unknown optimisation '{}'.".format(optim))
+
+
+def _onnx_topk_smallest(dist, k, dtype=None, op_version=None, **kwargs):
+    """
+    Returns the indices and the values of the *k* smallest
+    distances of every row.
+    """
     if op_version < 10:
         neg_dist = OnnxMul(dist, np.array(
             [-1], dtype=dtype), op_version=op_version)
@@ -81,11 +101,196 @@ def onnx_nearest_neighbors_indices(X, Y, k, metric='euclidean', dtype=None,
         node = OnnxTopK_11(dist, np.array([k], dtype=np.int64),
                            largest=0, sorted=1,
                            op_version=11, **kwargs)
+        return node[1], node[0]
+    return node[1], OnnxMul(node[0], np.array(
+        [-1], dtype=dtype), op_version=op_version)
+
+
+def _build_inverted_lists(Y, n_lists, max_sample=256):
+    """
+    Clusters the rows of *Y* with *KMeans* trained on at most
+    *max_sample* observations per cluster. Returns the centroids
+    and a matrix whose row *i* contains the sorted indices of the
+    observations assigned to centroid *i*, it is padded with
+    ``Y.shape[0]``. Empty clusters are removed.
+    """
+    from sklearn.cluster import KMeans
+    n_lists = min(n_lists, Y.shape[0])
+    sample = Y
+    if Y.shape[0] > max_sample * n_lists:
+        rnd = np.random.RandomState(0)
+        sample = Y[rnd.choice(Y.shape[0], max_sample * n_lists,
+                              replace=False)]
+    km = KMeans(n_clusters=n_lists, n_init=1, random_state=0).fit(sample)
+    labels = km.predict(Y)
+    sizes = np.bincount(labels, minlength=n_lists)
+    starts = np.hstack([[0], np.cumsum(sizes)])
+    order = np.argsort(labels, kind='mergesort')
+    kept = np.nonzero(sizes)[0]
+    lists = np.full((kept.shape[0], sizes.max()), Y.shape[0],
+                    dtype=np.int64)
+    for i, c in enumerate(kept):
+        lists[i, :sizes[c]] = order[starts[c]:starts[c + 1]]
+    return km.cluster_centers_[kept], lists
+
+
+def _onnx_nearest_neighbors_ivf(X, Y, k, n_lists, n_probe,
+                                metric='sqeuclidean', dtype=None,
+                                op_version=None, **kwargs):
+    """
+    Retrieves approximate nearest neighbours with an inverted file
+    index. *Y* is clustered at conversion time (see
+    @see fn _build_inverted_lists). The centroids are scored
+    with a *Gemm* like the *KMeans* converter does, every observation
+    is compared to the observations of the lists of its *n_probe*
+    nearest centroids. Lists are padded with an observation
+    at an infinite distance.
+    """
+    if op_version < 11:
+        raise RuntimeError("Option n_lists requires opset >= 11.")
+    if metric not in ('sqeuclidean', 'minkowski', 'manhattan', 'cityblock'):
+        raise NotImplementedError("metric='{}' is not implemented.".format(
+            metric))
+    centroids, lists = _build_inverted_lists(Y, n_lists)
+    n_probe = min(n_probe, lists.shape[0])
+    sizes = np.sort((lists < Y.shape[0]).sum(axis=1))
+    if sizes[:n_probe].sum() < k:
+        raise ValueError(
+            "The {} smallest lists contain less than {} observations, "
+            "n_probe must be increased.".format(n_probe, k))
+
+    centroids = centroids.astype(dtype)
+    norms = (centroids ** 2).sum(axis=1)
+    if dtype == np.float32:
+        scores = OnnxGemm(X, centroids, norms, alpha=-2., transB=1,
+                          op_version=op_version)
+    else:
+        scores = OnnxAdd(
+            OnnxMatMul(X, centroids.T * (-2), op_version=op_version),
+            norms, op_version=op_version)
+    probe, _ = _onnx_topk_smallest(scores, n_probe, dtype=dtype,
+                                   op_version=op_version)
+    candidates = OnnxReshape(
+        OnnxGather(lists, probe, axis=0, op_version=op_version),
+        np.array([0, -1], dtype=np.int64), op_version=op_version)
+
+    padded = np.vstack([Y, np.full((1, Y.shape[1]), np.inf)]).astype(dtype)
+    diff = OnnxSub(
+        OnnxGather(padded, candidates, axis=0, op_version=op_version),
+        OnnxUnsqueeze(X, axes=[1], op_version=op_version),
+        op_version=op_version)
+    if metric == 'sqeuclidean':
+        dist = OnnxReduceSumSquare(diff, axes=[2], keepdims=0,
+                                   op_version=op_version)
+    elif metric == 'minkowski':
+        p = kwargs['p']
+        dist = OnnxReduceSum(
+            OnnxPow(OnnxAbs(diff, op_version=op_version),
+                    np.array([p], dtype=dtype), op_version=op_version),
+            axes=[2], keepdims=0, op_version=op_version)
+    else:
+        dist = OnnxReduceSum(OnnxAbs(diff, op_version=op_version),
+                             axes=[2], keepdims=0, op_version=op_version)
+
+    pos, top_distances = _onnx_topk_smallest(
+        dist, k, dtype=dtype, op_version=op_version)
+    top_indices = OnnxGatherElements(candidates, pos, axis=1,
+                                     op_version=op_version)
+    if metric == 'minkowski':
+        top_distances = OnnxPow(top_distances, np.array([1. / p], dtype=dtype),
+                                op_version=op_version)
+    return top_indices, top_distances
+
+
+def onnx_nearest_neighbors_indices(X, Y, k, metric='euclidean', dtype=None,
+                                   op_version=None, keep_distances=False,
+                                   optim=None, block_size=None,
+                                   n_lists=None, n_probe=1, **kwargs):
+    """
+    Retrieves the nearest neigbours *ONNX*.
+    :param X: features or *OnnxOperatorMixin*
+    :param Y: neighbours or *OnnxOperatorMixin*
+    :param k: number of neighbours to retrieve
+    :param metric: requires metric
+    :param dtype: numerical type
+    :param op_version: opset version
+    :param keep_distance: returns the distances as well (second position)
+    :param optim: implements specific optimisations,
+        ``'cdist'`` replaces *Scan* operator by operator *CDist*,
+        ``'gemm'`` and ``'scan'`` are passed to @see fn onnx_cdist
+    :param block_size: if not None, *Y* is split into blocks of
+        *block_size* rows, the *k* nearest neighbours are retrieved
+        in every block and merged, the distance matrix
+        of a whole block is the biggest intermediate result
+    :param n_lists: if not None, the neighbours are approximated,
+        *Y* is clustered into *n_lists* lists with *KMeans*,
+        the distances are only computed for the observations
+        of the lists of the *n_probe* nearest centroids
+    :param n_probe: number of lists to look into, see *n_lists*
+    :param kwargs: additional parameters for function @see fn onnx_cdist
+    :return: top indices
+    """
+    if metric == 'euclidean' and optim != 'cdist':
+        # The neighbours are ranked with the squared distances,
+        # the square root is only computed for the k selected ones.
+        # The square root of two equal values may differ in the last
+        # bit depending on their position in the tensor, equal distances
+        # would not always be sorted the same way.
+        res = onnx_nearest_neighbors_indices(
+            X, Y, k, metric='sqeuclidean', dtype=dtype,
+            op_version=op_version, keep_distances=keep_distances,
+            optim=optim, block_size=block_size, n_lists=n_lists,
+            n_probe=n_probe, **kwargs)
+        if keep_distances:
+            return res[0], OnnxSqrt(res[1], op_version=op_version)
+        return res
+    if block_size is not None and (
+            not isinstance(block_size, numbers.Integral) or
+            isinstance(block_size, bool) or block_size <= 0):
+        raise ValueError("block_size must be a positive integer "
+                         "not {}.".format(block_size))
+    if n_lists is not None:
+        if block_size is not None:
+            raise ValueError("Options block_size and n_lists cannot be "
+                             "used together.")
+        top_indices, top_distances = _onnx_nearest_neighbors_ivf(
+            X, Y, k, n_lists, n_probe, metric=metric, dtype=dtype,
+            op_version=op_version, **kwargs)
+    elif block_size is None or Y.shape[0] <= block_size:
+        dist = _onnx_nearest_neighbors_distances(
+            X, Y, metric=metric, dtype=dtype, op_version=op_version,
+            optim=optim, **kwargs)
+        top_indices, top_distances = _onnx_topk_smallest(
+            dist, k, dtype=dtype, op_version=op_version, **kwargs)
+    else:
+        if op_version < 11:
+            raise RuntimeError("Option block_size requires opset >= 11.")
+        indices, distances = [], []
+        for begin in range(0, Y.shape[0], block_size):
+            block = Y[begin:begin + block_size]
+            dist = _onnx_nearest_neighbors_distances(
+                X, block, metric=metric, dtype=dtype, op_version=op_version,
+                optim=optim, **kwargs)
+            ind, dist = _onnx_topk_smallest(
+                dist, min(k, block.shape[0]), dtype=dtype,
+                op_version=op_version, **kwargs)
+            if begin > 0:
+                ind = OnnxAdd(ind, np.array([begin], dtype=np.int64),
+                              op_version=op_version)
+            indices.append(ind)
+            distances.append(dist)
+        # Candidates are ordered by block, TopK keeps
+        # the same order as without blocks for equal distances.
+        pos, top_distances = _onnx_topk_smallest(
+            OnnxConcat(*distances, axis=1, op_version=op_version), k,
+            dtype=dtype, op_version=op_version, **kwargs)
+        top_indices = OnnxGatherElements(
+            OnnxConcat(*indices, axis=1, op_version=op_version),
+            pos, axis=1, op_version=op_version)
     if keep_distances:
-        return (node[1], OnnxMul(node[0], np.array(
-                    [-1], dtype=dtype), op_version=op_version))
+        return top_indices, top_distances
     else:
-        return node[1]
+        return top_indices
 
 
 def _convert_nearest_neighbors(scope, operator, container):
@@ -117,7 +322,8 @@ def _convert_nearest_neighbors(scope, operator, container):
     if isinstance(X.type, Int64TensorType):
         X = OnnxCast(X, to=container.proto_dtype, op_version=opv)
 
-    options = container.get_options(op, dict(optim=None))
+    options = container.get_options(
+        op, dict(optim=None, block_size=None, n_lists=None, n_probe=1))
 
     single_reg = (not hasattr(op, '_y') or len(op._y.shape) == 1 or
                   len(op._y.shape) == 2 and op._y.shape[1] == 1)
@@ -139,6 +345,9 @@ def _convert_nearest_neighbors(scope, operator, container):
         top_indices = onnx_nearest_neighbors_indices(
             X, neighb, k, metric=metric, dtype=dtype,
             op_version=opv, optim=options.get('optim', None),
+            block_size=options.get('block_size', None),
+            n_lists=options.get('n_lists', None),
+            n_probe=options.get('n_probe', 1),
             **distance_kwargs)
         top_distances = None
     elif weights == 'distance':
@@ -146,6 +355,9 @@ def _convert_nearest_neighbors(scope, operator, container):
             X, neighb, k, metric=metric, dtype=dtype,
             op_version=opv, keep_distances=True,
             optim=options.get('optim', None),
+            block_size=options.get('block_size', None),
+            n_lists=options.get('n_lists', None),
+            n_probe=options.get('n_probe', 1),
             **distance_kwargs)
     else:
         raise RuntimeError(
@@ -240,18 +452,24 @@ def convert_nearest_neighbors_classifier(scope, operator, container):
             "Binary classification not implemented in scikit-learn. "
             "Check this code is not reused for other libraries.")
 
-    conc = []
-    for cl in range(nb_classes):
-        cst = np.array([cl], dtype=np.int64)
-        mat_cast = OnnxCast(
-            OnnxEqual(reshaped, cst, op_version=opv),
-            op_version=opv,
-            to=container.proto_dtype)
-        if wei is not None:
-            mat_cast = OnnxMul(mat_cast, wei, op_version=opv)
-        wh = OnnxReduceSum(mat_cast, axes=[1], op_version=opv)
-        conc.append(wh)
-    all_together = OnnxConcat(*conc, axis=1, op_version=opv)
+    # Every label is replaced by the corresponding row of the identity
+    # matrix, the votes are the weighted sum of these rows.
+    # The graph size does not depend on the number of classes.
+    if nb_classes <= MAX_CLASSES_IDENTITY:
+        one_hot = OnnxGather(np.identity(nb_classes, dtype=container.dtype),
+                             reshaped, axis=0, op_version=opv)
+    else:
+        one_hot = OnnxCast(
+            OnnxEqual(OnnxUnsqueeze(reshaped, axes=[2], op_version=opv),
+                      np.arange(nb_classes, dtype=np.int64),
+                      op_version=opv),
+            op_version=opv, to=container.proto_dtype)
+    if wei is None:
+        wei = np.ones((1, op.n_neighbors), dtype=container.dtype)
+    else:
+        wei = OnnxUnsqueeze(wei, axes=[1], op_version=opv)
+    all_together = OnnxSqueeze(
+        OnnxMatMul(wei, one_hot, op_version=opv), axes=[1], op_version=opv)
     sum_prob = OnnxReduceSum(
         all_together, axes=[1], op_version=opv, keepdims=1)
     probas = OnnxDiv(all_together, sum_prob, op_version=opv,
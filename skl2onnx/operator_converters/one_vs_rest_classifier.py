@@ -3,28 +3,100 @@
 # Licensed under the MIT License. See License.txt in the project root for
 # license information.
 # --------------------------------------------------------------------------
+import numpy as np
 from sklearn.base import is_regressor
+from sklearn.linear_model import LogisticRegression
 from ..proto import onnx_proto
-from ..common._apply_operation import apply_concat
+from ..common._apply_operation import (
+    apply_cast, apply_concat, apply_gemm, apply_identity,
+)
 from ..common._topology import FloatTensorType
 from ..common._registration import register_converter
-from ..common._apply_operation import apply_normalization
+from ..common._apply_operation import apply_normalization, apply_sigmoid
 from ..common._apply_operation import apply_slice, apply_sub, apply_clip
-from ..common.utils_classifier import _finalize_converter_classes
+from ..common.data_types import Int64TensorType
+from ..common.utils_classifier import (
+    _finalize_converter_classes, is_logistic_regression_ovr,
+)
 from .._supported_operators import sklearn_operator_name_map
 
 
+def _stack_linear_estimators(estimators):
+    """
+    Stacks the coefficients of binary logistic regressions or
+    linear regressors into a matrix ``[n_estimators, n_features]``.
+    It returns the coefficients, the intercepts and whether a sigmoid
+    must be applied or None if the estimators are not all of one kind.
+    """
+    if all(type(est) == LogisticRegression and est.classes_.size == 2
+           for est in estimators):
+        coefs = []
+        intercepts = []
+        for est in estimators:
+            # softmax([-x, x])[1] = sigmoid(2x)
+            factor = 1. if is_logistic_regression_ovr(est) else 2.
+            coefs.append(factor * est.coef_.ravel())
+            intercepts.append(factor * np.ravel(est.intercept_)[0])
+        return np.vstack(coefs), np.array(intercepts), True
+    if all(sklearn_operator_name_map.get(type(est), None) ==
+           'SklearnLinearRegressor' and est.coef_.ndim == 1
+           for est in estimators):
+        return (np.vstack([est.coef_ for est in estimators]),
+                np.array([np.ravel(est.intercept_)[0]
+                          for est in estimators]), False)
+    return None
+
+
+def _convert_linear_estimators(scope, operator, container, stacked):
+    """
+    Computes the outputs of all linear estimators with a single *Gemm*
+    followed by a sigmoid for logistic regressions.
+    """
+    coef, intercept, sigmoid = stacked
+    input_name = operator.inputs[0].full_name
+    if isinstance(operator.inputs[0].type, Int64TensorType):
+        input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, operator.inputs[0].full_name, input_name,
+                   container, to=onnx_proto.TensorProto.FLOAT)
+
+    coef_name = scope.get_unique_variable_name('coef')
+    container.add_initializer(coef_name, onnx_proto.TensorProto.FLOAT,
+                              coef.shape, coef.astype(np.float32).ravel())
+    intercept_name = scope.get_unique_variable_name('intercept')
+    container.add_initializer(intercept_name, onnx_proto.TensorProto.FLOAT,
+                              intercept.shape, intercept.astype(np.float32))
+    raw_name = scope.get_unique_variable_name('raw_scores')
+    apply_gemm(scope, [input_name, coef_name, intercept_name], raw_name,
+               container, transB=1)
+    if not sigmoid:
+        return raw_name
+    prob_name = scope.get_unique_variable_name('probY')
+    apply_sigmoid(scope, raw_name, prob_name, container)
+    return prob_name
+
+
 def convert_one_vs_rest_classifier(scope, operator, container):
     """
     Converts a *OneVsRestClassifier* into *ONNX* format.
+    When every estimator is a binary logistic regression or
+    every estimator is a linear regressor, their coefficients are
+    stacked into a single *Gemm*, otherwise every estimator is
+    converted on its own.
     """
     if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
         raise RuntimeError(
             "Option 'nocl' is not implemented for operator '{}'.".format(
                 operator.raw_operator.__class__.__name__))
     op = operator.raw_operator
-    probs_names = []
-    for i, estimator in enumerate(op.estimators_):
+    stacked = _stack_linear_estimators(op.estimators_)
+    if stacked is not None:
+        probs_names = [_convert_linear_estimators(
+            scope, operator, container, stacked)]
+        estimators = []
+    else:
+        probs_names = []
+        estimators = op.estimators_
+    for i, estimator in enumerate(estimators):
         op_type = sklearn_operator_name_map[type(estimator)]
 
         this_operator = scope.declare_local_operator(op_type)
@@ -58,7 +130,10 @@ def convert_one_vs_rest_classifier(scope, operator, container):
     if op.multilabel_:
         # concatenates outputs
         conc_name = operator.outputs[1].full_name
-        apply_concat(scope, probs_names, conc_name, container, axis=1)
+        if len(probs_names) == 1:
+            apply_identity(scope, probs_names[0], conc_name, container)
+        else:
+            apply_concat(scope, probs_names, conc_name, container, axis=1)
 
         # builds the labels (matrix with integer)
         # scikit-learn may use probabilities or raw score
@@ -82,8 +157,11 @@ def convert_one_vs_rest_classifier(scope, operator, container):
                    container, operator_name=None, max=None, min=0)
     else:
         # concatenates outputs
-        conc_name = scope.get_unique_variable_name('concatenated')
-        apply_concat(scope, probs_names, conc_name, container, axis=1)
+        if len(probs_names) == 1:
+            conc_name = probs_names[0]
+        else:
+            conc_name = scope.get_unique_variable_name('concatenated')
+            apply_concat(scope, probs_names, conc_name, container, axis=1)
 
         # normalizes the outputs
         apply_normalization(scope, conc_name, operator.outputs[1].full_name,
@@ -10,7 +10,7 @@ import six
 from ..common._apply_operation import apply_cast
 from ..common.data_types import Int64TensorType
 from ..common._registration import register_converter
-from ..common.tree_ensemble import add_tree_to_attribute_pairs
+from ..common.tree_ensemble import add_trees_to_attribute_pairs
 from ..common.tree_ensemble import get_default_tree_classifier_attribute_pairs
 from ..common.tree_ensemble import get_default_tree_regressor_attribute_pairs
 from ..common.utils_classifier import get_label_classes
@@ -53,11 +53,12 @@ def convert_sklearn_random_forest_classifier(scope, operator, container):
     estimtator_count = _num_estimators(op)
     tree_weight = 1. / estimtator_count
 
-    for tree_id in range(estimtator_count):
-        tree = op.estimators_[tree_id].tree_
-        add_tree_to_attribute_pairs(attr_pairs, True, tree, tree_id,
-                                    tree_weight, 0, True, True,
-                                    dtype=container.dtype)
+    trees = [op.estimators_[tree_id].tree_
+             for tree_id in range(estimtator_count)]
+    add_trees_to_attribute_pairs(attr_pairs, True, trees,
+                                 list(range(estimtator_count)),
+                                 tree_weight, 0, True, True,
+                                 dtype=container.dtype)
 
     container.add_node(
         op_type, operator.input_full_names,
@@ -77,11 +78,12 @@ def convert_sklearn_random_forest_regressor_converter(scope,
     # outcomes, so all trees' weights are identical.
     estimtator_count = _num_estimators(op)
     tree_weight = 1. / estimtator_count
-    for tree_id in range(estimtator_count):
-        tree = op.estimators_[tree_id].tree_
-        add_tree_to_attribute_pairs(attrs, False, tree, tree_id,
-                                    tree_weight, 0, False, True,
-                                    dtype=container.dtype)
+    trees = [op.estimators_[tree_id].tree_
+             for tree_id in range(estimtator_count)]
+    add_trees_to_attribute_pairs(attrs, False, trees,
+                                 list(range(estimtator_count)),
+                                 tree_weight, 0, False, True,
+                                 dtype=container.dtype)
 
     input_name = operator.input_full_names
     if type(operator.inputs[0].type) == Int64TensorType:
@@ -11,9 +11,113 @@ from sklearn.svm import SVC, NuSVC, SVR, NuSVR, OneClassSVM
 from ..common._apply_operation import apply_cast
 from ..common.data_types import Int64TensorType
 from ..common._registration import register_converter
+from ..common.utils_classifier import get_label_classes
+from ..algebra.onnx_ops import (
+    OnnxAdd, OnnxArgMax, OnnxArrayFeatureExtractor, OnnxCast,
+    OnnxConcat, OnnxGemm, OnnxGreater, OnnxIdentity, OnnxMatMul,
+    OnnxNeg, OnnxReshape, OnnxSign
+)
 from ..proto import onnx_proto
 
 
+def _primal_coefficients(op):
+    """
+    Returns the primal coefficients *W* and the intercepts *b*
+    of a linear *libsvm* model, the raw decision function is
+    :math:`XW' + b` with one column per pair of classes
+    for a classifier, one column otherwise.
+    """
+    sv = op.support_vectors_
+    dual_coef = op.dual_coef_
+    intercept = op.intercept_
+    if not isinstance(op, (SVC, NuSVC)):
+        return dual_coef.dot(sv), intercept
+    n_classes = len(op.classes_)
+    if n_classes == 2:
+        # scikit-learn flips the signs in the binary case.
+        dual_coef = -dual_coef
+        intercept = -intercept
+    start = np.hstack([[0], np.cumsum(op.n_support_)])
+    coef = []
+    for i in range(n_classes):
+        si = slice(start[i], start[i + 1])
+        for j in range(i + 1, n_classes):
+            sj = slice(start[j], start[j + 1])
+            coef.append(dual_coef[j - 1, si].dot(sv[si]) +
+                        dual_coef[i, sj].dot(sv[sj]))
+    return np.vstack(coef), intercept
+
+
+def _convert_sklearn_svm_linear(scope, operator, container):
+    """
+    Converts a linear *SVM* without probabilities.
+    The support vectors are collapsed into the primal coefficients,
+    the raw scores are computed with a single *Gemm*. A classifier
+    then counts the votes of every pair of classes like *libsvm*:
+    the first class of a pair wins if its score is positive.
+    The outputs are the same as operators *SVMClassifier*
+    and *SVMRegressor*.
+    """
+    op = operator.raw_operator
+    opv = container.target_opset
+    dtype = container.dtype
+    X = operator.inputs[0]
+    if isinstance(X.type, Int64TensorType):
+        X = OnnxCast(X, to=container.proto_dtype, op_version=opv)
+
+    coef, intercept = _primal_coefficients(op)
+    coef = coef.astype(dtype)
+    intercept = intercept.astype(dtype)
+    if dtype == np.float32:
+        raw = OnnxGemm(X, coef, intercept, transB=1, op_version=opv)
+    else:
+        raw = OnnxAdd(OnnxMatMul(X, coef.T, op_version=opv),
+                      intercept, op_version=opv)
+
+    out = operator.outputs
+    if isinstance(op, (SVC, NuSVC)):
+        n_classes = len(op.classes_)
+        # votes = won + (pairs the class is the second of - lost)
+        won_minus_lost = np.zeros((coef.shape[0], n_classes), dtype=dtype)
+        pair = 0
+        for i in range(n_classes):
+            for j in range(i + 1, n_classes):
+                won_minus_lost[pair, i] = 1
+                won_minus_lost[pair, j] = -1
+                pair += 1
+        positive = OnnxCast(
+            OnnxGreater(raw, np.array([0], dtype=dtype), op_version=opv),
+            to=container.proto_dtype, op_version=opv)
+        votes = OnnxAdd(
+            OnnxMatMul(positive, won_minus_lost, op_version=opv),
+            np.arange(n_classes).astype(dtype), op_version=opv)
+        best = OnnxArgMax(votes, axis=1, keepdims=0, op_version=opv)
+        classes = get_label_classes(scope, op)
+        if np.issubdtype(classes.dtype, np.floating):
+            classes = classes.astype(np.int64)
+        label = OnnxReshape(
+            OnnxArrayFeatureExtractor(classes, best, op_version=opv),
+            np.array([-1], dtype=np.int64),
+            output_names=out[:1], op_version=opv)
+        if n_classes == 2:
+            scores = OnnxConcat(OnnxNeg(raw, op_version=opv), raw, axis=1,
+                                output_names=out[1:], op_version=opv)
+        else:
+            scores = OnnxIdentity(raw, output_names=out[1:], op_version=opv)
+        label.add_to(scope, container)
+        scores.add_to(scope, container)
+    elif isinstance(op, OneClassSVM):
+        scores = OnnxIdentity(raw, output_names=out[1:], op_version=opv)
+        label = OnnxCast(OnnxSign(scores, op_version=opv),
+                         to=onnx_proto.TensorProto.INT64,
+                         output_names=out[:1], op_version=opv)
+        label.add_to(scope, container)
+        scores.add_to(scope, container)
+    else:
+        OnnxIdentity(raw, output_names=out,
+                     op_version=opv).add_to(scope, container)
+
+
 def convert_sklearn_svm(scope, operator, container):
     """
     Converter for model
@@ -35,9 +139,18 @@ def convert_sklearn_svm(scope, operator, container):
     <https://github.com/scikit-learn/scikit-learn/blob/master/
     sklearn/utils/multiclass.py#L402>`_. *onnxruntime* returns
     the raw score from *svm* algorithm as a *matrix[N, (C(C-1)/2]*.
+    Models with a linear kernel and no probabilities are converted
+    with their primal coefficients (see
+    :func:`_convert_sklearn_svm_linear`).
     """
-    svm_attrs = {'name': scope.get_unique_operator_name('SVM')}
     op = operator.raw_operator
+    if (op.kernel == 'linear' and
+            isinstance(op.support_vectors_, np.ndarray) and
+            len(getattr(op, 'probA_', [])) == 0):
+        _convert_sklearn_svm_linear(scope, operator, container)
+        return
+
+    svm_attrs = {'name': scope.get_unique_operator_name('SVM')}
     if isinstance(op.dual_coef_, np.ndarray):
         coef = op.dual_coef_.ravel().tolist()
     else:
@@ -4,13 +4,182 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numpy as np
 from onnx.helper import make_tensor
+from sklearn.linear_model import LogisticRegression
 from ..common._topology import FloatTensorType
 from ..common._registration import register_converter
-from ..common._apply_operation import apply_mul
-from ..common.utils_classifier import _finalize_converter_classes
+from ..common._apply_operation import (
+    apply_cast, apply_div, apply_gemm, apply_mul, apply_reshape,
+    apply_sigmoid, apply_softmax,
+)
+from ..common.data_types import Int64TensorType
+from ..common.tree_ensemble import (
+    add_trees_to_attribute_pairs,
+    get_default_tree_classifier_attribute_pairs,
+)
+from ..common.utils_classifier import (
+    _finalize_converter_classes, is_logistic_regression_ovr,
+)
 from .._supported_operators import sklearn_operator_name_map
 from ..proto import onnx_proto
+from .common import get_decision_trees, get_voting_weights
+
+
+def _fuse_trees(scope, operator, container, members, n_classes):
+    """
+    Merges decision trees and random forests into a single
+    *TreeEnsembleClassifier*. *members* is a list of
+    ``(weight, trees)``, every leaf stores the probabilities
+    of its tree multiplied by the weight of the estimator
+    divided by its number of trees.
+    """
+    attr_pairs = get_default_tree_classifier_attribute_pairs()
+    attr_pairs['name'] = scope.get_unique_operator_name(
+        'TreeEnsembleClassifier')
+    attr_pairs['classlabels_int64s'] = list(range(n_classes))
+
+    trees = []
+    tree_weights = []
+    leaf_values = []
+    for weight, estimators in members:
+        for estimator in estimators:
+            counts = estimator.tree_.value[:, 0, :].astype(np.float64)
+            total = counts.sum(axis=1, keepdims=True)
+            total[total == 0] = 1.
+            trees.append(estimator.tree_)
+            tree_weights.append(weight / len(estimators))
+            leaf_values.append(counts / total)
+
+    add_trees_to_attribute_pairs(
+        attr_pairs, True, trees, list(range(len(trees))), tree_weights,
+        0, False, True, dtype=container.dtype, leaf_values=leaf_values)
+
+    label_name = scope.get_unique_variable_name('label')
+    proba_name = scope.get_unique_variable_name('proba')
+    container.add_node(
+        'TreeEnsembleClassifier', operator.input_full_names,
+        [label_name, proba_name], op_domain='ai.onnx.ml', **attr_pairs)
+    return proba_name
+
+
+def _fuse_logistic_regressions(scope, operator, container, members,
+                               n_classes, ovr):
+    """
+    Computes the weighted sum of the probabilities of several
+    logistic regressions sharing the same post transform.
+    *members* is a list of ``(weight, model)``. The raw scores
+    of all models come from a single *Gemm*, they are reshaped into
+    ``[N, n_models, n_classes]`` to apply the post transform
+    on the last axis and reduced over the models.
+    """
+    coefs = []
+    intercepts = []
+    for weight, model in members:
+        coef = model.coef_.astype(np.float64)
+        intercept = np.broadcast_to(
+            model.intercept_, (coef.shape[0], )).astype(np.float64)
+        if n_classes == 2:
+            coef = np.vstack([-coef, coef])
+            intercept = np.hstack([-intercept, intercept])
+        coefs.append(coef)
+        intercepts.append(intercept)
+    n_models = len(members)
+
+    input_name = operator.inputs[0].full_name
+    if isinstance(operator.inputs[0].type, Int64TensorType):
+        input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, operator.inputs[0].full_name, input_name,
+                   container, to=onnx_proto.TensorProto.FLOAT)
+
+    coef_name = scope.get_unique_variable_name('coef')
+    coef = np.vstack(coefs).T
+    container.add_initializer(coef_name, onnx_proto.TensorProto.FLOAT,
+                              coef.shape, coef.ravel())
+    intercept_name = scope.get_unique_variable_name('intercept')
+    intercept = np.hstack(intercepts)
+    container.add_initializer(intercept_name, onnx_proto.TensorProto.FLOAT,
+                              intercept.shape, intercept)
+    raw_name = scope.get_unique_variable_name('raw_scores')
+    apply_gemm(scope, [input_name, coef_name, intercept_name], raw_name,
+               container)
+    scores_name = scope.get_unique_variable_name('scores')
+    apply_reshape(scope, raw_name, scores_name, container,
+                  desired_shape=(-1, n_models, n_classes))
+
+    prob_name = scope.get_unique_variable_name('probs')
+    if ovr:
+        sigmoid_name = scope.get_unique_variable_name('sigmoid')
+        apply_sigmoid(scope, scores_name, sigmoid_name, container)
+        if n_classes == 2:
+            prob_name = sigmoid_name
+        else:
+            # Probabilities are normalized by every model.
+            norm_name = scope.get_unique_variable_name('norm')
+            container.add_node(
+                'ReduceSum', sigmoid_name, norm_name,
+                name=scope.get_unique_operator_name('ReduceSum'),
+                axes=[2], keepdims=1)
+            apply_div(scope, [sigmoid_name, norm_name], prob_name,
+                      container, broadcast=1)
+    else:
+        apply_softmax(scope, scores_name, prob_name, container, axis=2)
+
+    weights_name = scope.get_unique_variable_name('weights')
+    container.add_initializer(
+        weights_name, onnx_proto.TensorProto.FLOAT, [1, n_models, 1],
+        [weight for weight, _ in members])
+    wprob_name = scope.get_unique_variable_name('wprobs')
+    apply_mul(scope, [prob_name, weights_name], wprob_name, container,
+              broadcast=1)
+    sum_name = scope.get_unique_variable_name('sum_probs')
+    container.add_node(
+        'ReduceSum', wprob_name, sum_name,
+        name=scope.get_unique_operator_name('ReduceSum'),
+        axes=[1], keepdims=0)
+    return sum_name
+
+
+def _fuse_soft_voting(scope, operator, container, weights):
+    """
+    Fuses the estimators of a soft *VotingClassifier* which can be
+    expressed with a common operator. Decision trees and random
+    forests end up in one *TreeEnsembleClassifier*, logistic
+    regressions in one *Gemm* for every post transform.
+    It returns the weighted probabilities and the indices of the
+    estimators left to convert.
+    """
+    op = operator.raw_operator
+    n_classes = len(op.classes_)
+    trees = []
+    logistic = {True: [], False: []}
+    others = []
+    for i, estimator in enumerate(op.estimators_):
+        estimator_trees = get_decision_trees(estimator)
+        if (estimator_trees is not None and
+                all(est.n_outputs_ == 1 and est.n_classes_ == n_classes
+                    for est in estimator_trees)):
+            trees.append((i, estimator_trees))
+        elif (type(estimator) == LogisticRegression and
+                estimator.classes_.size == n_classes):
+            logistic[is_logistic_regression_ovr(estimator)].append(
+                (i, estimator))
+        else:
+            others.append(i)
+
+    probs_names = []
+    if trees:
+        probs_names.append(_fuse_trees(
+            scope, operator, container,
+            [(weights[i], est) for i, est in trees], n_classes))
+    for ovr, members in logistic.items():
+        if len(members) > 1:
+            probs_names.append(_fuse_logistic_regressions(
+                scope, operator, container,
+                [(weights[i], est) for i, est in members], n_classes, ovr))
+        else:
+            others.extend(i for i, _ in members)
+    return probs_names, sorted(others)
 
 
 def convert_voting_classifier(scope, operator, container):
@@ -25,6 +194,11 @@ def convert_voting_classifier(scope, operator, container):
     for the voting classifier. *ONNX* does not make this
     distinction and always creates two outputs, labels
     and probabilities.
+
+    With ``voting='soft'``, estimators which can share the same
+    operator are fused: decision trees and random forests become
+    one *TreeEnsembleClassifier*, logistic regressions one *Gemm*.
+    The other estimators are converted one by one.
     """
     if scope.get_options(operator.raw_operator, dict(nocl=False))['nocl']:
         raise RuntimeError(
@@ -37,11 +211,16 @@ def convert_voting_classifier(scope, operator, container):
     container.add_initializer(classes_ind_name, onnx_proto.TensorProto.INT64,
                               (1, n_classes), list(range(n_classes)))
 
-    probs_names = []
+    weights = get_voting_weights(op)
+    if op.voting == 'soft':
+        probs_names, indices = _fuse_soft_voting(
+            scope, operator, container, weights)
+    else:
+        probs_names = []
+        indices = range(len(op.estimators_))
     one_name = None
-    for i, estimator in enumerate(op.estimators_):
-        if estimator is None:
-            continue
+    for i in indices:
+        estimator = op.estimators_[i]
 
         op_type = sklearn_operator_name_map[type(estimator)]
 
@@ -94,14 +273,9 @@ def convert_voting_classifier(scope, operator, container):
         else:
             prob_name = prob_name.onnx_name
 
-        if op.weights is not None:
-            val = op.weights[i] / op.weights.sum()
-        else:
-            val = 1. / len(op.estimators_)
-
         weights_name = scope.get_unique_variable_name('w%d' % i)
         container.add_initializer(
-            weights_name, onnx_proto.TensorProto.FLOAT, [1], [val])
+            weights_name, onnx_proto.TensorProto.FLOAT, [1], [weights[i]])
         wprob_name = scope.get_unique_variable_name('wprob_name')
         apply_mul(scope, [prob_name, weights_name],
                   wprob_name, container, broadcast=1)
@@ -4,24 +4,126 @@
 # license information.
 # --------------------------------------------------------------------------
 
+import numpy as np
 from ..common._topology import FloatTensorType
 from ..common._registration import register_converter
-from ..common._apply_operation import apply_mul
+from ..common._apply_operation import apply_cast, apply_mul, apply_sum
+from ..common.data_types import Int64TensorType
+from ..common.tree_ensemble import (
+    add_trees_to_attribute_pairs,
+    get_default_tree_regressor_attribute_pairs,
+)
 from .._supported_operators import sklearn_operator_name_map
 from ..proto import onnx_proto
+from .common import get_decision_trees, get_voting_weights
 
 
-def convert_voting_regressor(scope, operator, container):
+def _fuse_trees(scope, container, input_name, members):
     """
-    Converts a *VotingRegressor* into *ONNX* format.
+    Merges decision trees and random forests into a single
+    *TreeEnsembleRegressor*. *members* is a list of
+    ``(weight, trees)``, every tree is weighted by the weight
+    of the estimator divided by its number of trees.
+    """
+    attrs = get_default_tree_regressor_attribute_pairs()
+    attrs['name'] = scope.get_unique_operator_name('TreeEnsembleRegressor')
+    attrs['n_targets'] = 1
+    trees = []
+    tree_weights = []
+    for weight, estimators in members:
+        trees.extend(est.tree_ for est in estimators)
+        tree_weights.extend([weight / len(estimators)] * len(estimators))
+    add_trees_to_attribute_pairs(
+        attrs, False, trees, list(range(len(trees))), tree_weights,
+        0, False, True, dtype=container.dtype)
+
+    var_name = scope.get_unique_variable_name('trees')
+    container.add_node('TreeEnsembleRegressor', input_name, var_name,
+                       op_domain='ai.onnx.ml', **attrs)
+    return var_name
+
+
+def _fuse_linear(scope, container, input_name, members):
+    """
+    Sums the coefficients of linear regressors weighted by *members*,
+    a list of ``(weight, model)``, into a single *LinearRegressor*.
+    """
+    coef = sum(weight * model.coef_.astype(np.float64).ravel()
+               for weight, model in members)
+    intercept = sum(weight * np.float64(np.ravel(model.intercept_)[0])
+                    for weight, model in members)
+    attrs = {'name': scope.get_unique_operator_name('LinearRegressor')}
+    attrs['coefficients'] = coef.astype(container.dtype)
+    attrs['intercepts'] = np.array([intercept], dtype=container.dtype)
+
+    var_name = scope.get_unique_variable_name('linear')
+    container.add_node('LinearRegressor', input_name, var_name,
+                       op_domain='ai.onnx.ml', **attrs)
+    return var_name
+
+
+def _fuse_estimators(scope, operator, container, weights):
+    """
+    Fuses the estimators which can be expressed with a common operator.
+    Decision trees and random forests end up in one
+    *TreeEnsembleRegressor*, linear models in one *LinearRegressor*.
+    It returns the weighted predictions and the indices of the
+    estimators left to convert.
     """
     op = operator.raw_operator
+    trees = []
+    linear = []
+    others = []
+    for i, estimator in enumerate(op.estimators_):
+        estimator_trees = get_decision_trees(estimator)
+        if (estimator_trees is not None and
+                all(est.n_outputs_ == 1 for est in estimator_trees)):
+            trees.append((weights[i], estimator_trees))
+        elif (sklearn_operator_name_map[type(estimator)] in (
+                'SklearnLinearRegressor', 'SklearnLinearSVR') and
+                np.ravel(estimator.intercept_).shape == (1, ) and
+                estimator.coef_.size == operator.inputs[0].type.shape[1]):
+            linear.append((i, estimator))
+        else:
+            others.append(i)
+    if len(linear) == 1 and not trees:
+        # Nothing to fuse.
+        others.extend(i for i, _ in linear)
+        linear = []
+    if not trees and not linear:
+        return [], others
+
+    input_name = operator.inputs[0].full_name
+    if isinstance(operator.inputs[0].type, Int64TensorType):
+        input_name = scope.get_unique_variable_name('cast_input')
+        apply_cast(scope, operator.inputs[0].full_name, input_name,
+                   container, to=onnx_proto.TensorProto.FLOAT)
 
     vars_names = []
-    for i, estimator in enumerate(op.estimators_):
-        if estimator is None:
-            continue
+    if trees:
+        vars_names.append(_fuse_trees(scope, container, input_name, trees))
+    if linear:
+        vars_names.append(_fuse_linear(
+            scope, container, input_name,
+            [(weights[i], est) for i, est in linear]))
+    return vars_names, sorted(others)
+
+
+def convert_voting_regressor(scope, operator, container):
+    """
+    Converts a *VotingRegressor* into *ONNX* format.
+    Estimators which can share the same operator are fused:
+    decision trees and random forests become one
+    *TreeEnsembleRegressor*, linear models one *LinearRegressor*.
+    The other estimators are converted one by one.
+    """
+    op = operator.raw_operator
+    weights = get_voting_weights(op)
+    vars_names, indices = _fuse_estimators(
+        scope, operator, container, weights)
 
+    for i in indices:
+        estimator = op.estimators_[i]
         op_type = sklearn_operator_name_map[type(estimator)]
 
         this_operator = scope.declare_local_operator(op_type)
@@ -33,14 +135,9 @@ def convert_voting_regressor(scope, operator, container):
         this_operator.outputs.append(var_name)
         var_name = var_name.onnx_name
 
-        if op.weights is not None:
-            val = op.weights[i] / op.weights.sum()
-        else:
-            val = 1. / len(op.estimators_)
-
         weights_name = scope.get_unique_variable_name('w%d' % i)
         container.add_initializer(
-            weights_name, onnx_proto.TensorProto.FLOAT, [1], [val])
+            weights_name, onnx_proto.TensorProto.FLOAT, [1], [weights[i]])
         wvar_name = scope.get_unique_variable_name('wvar_%d' % i)
         apply_mul(scope, [var_name, weights_name],
                   wvar_name, container, broadcast=1)
@@ -49,9 +146,7 @@ def convert_voting_regressor(scope, operator, container):
         container.add_node('Flatten', wvar_name, flat_name)
         vars_names.append(flat_name)
 
-    container.add_node('Sum', vars_names,
-                       operator.outputs[0].full_name,
-                       name=scope.get_unique_operator_name('Sum'))
+    apply_sum(scope, vars_names, operator.outputs[0].full_name, container)
 
 
 register_converter('SklearnVotingRegressor', convert_voting_regressor)
@@ -24,9 +24,10 @@ from onnx.helper import split_complex_to_pairs
 
 
 def _check_onnx_version():
-    import pkg_resources
-    min_required_version = pkg_resources.parse_version('1.0.1')
-    current_version = pkg_resources.get_distribution('onnx').parsed_version
+    # pkg_resources is slow to import.
+    from distutils.version import LooseVersion
+    min_required_version = LooseVersion('1.0.1')
+    current_version = LooseVersion(onnx.__version__)
     assert current_version >= min_required_version, (
         'ONNXMLTools requires ONNX version 1.0.1 or a newer one')
 
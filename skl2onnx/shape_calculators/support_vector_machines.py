@@ -42,6 +42,10 @@ def calculate_sklearn_svm_output_shapes(operator):
         operator.outputs[1].type = tensor_type([N, 1])
     elif operator.type in ['SklearnSVC'] or isinstance(op, (SVC, NuSVC)):
         number_of_classes = len(op.classes_)
+        if len(op.probA_) == 0 and number_of_classes > 2:
+            # raw scores, one per pair of classes
+            number_of_classes = number_of_classes * (
+                number_of_classes - 1) // 2
         check_input_and_output_numbers(operator, input_count_range=[1, None],
                                        output_count_range=[1, 2])
 
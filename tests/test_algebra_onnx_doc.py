@@ -55,6 +55,19 @@ class TestAlgebraOnnxDoc(unittest.TestCase):
         except KeyError as e:
             assert "SklearnGaussianProcessRegressor" in str(e)
 
+    @unittest.skipIf(sys.version_info[:2] < (3, 7),
+                     reason="module __getattr__ requires python 3.7")
+    def test_lazy_classes(self):
+        from skl2onnx.algebra import onnx_ops
+        cl = onnx_ops.OnnxTopK
+        self.assertIs(cl, self._algebra['OnnxTopK'])
+        for name, past in cl.past_version.items():
+            self.assertIs(past, getattr(onnx_ops, name))
+        self.assertIn('OnnxTopK_1', dir(onnx_ops))
+        self.assertIn("**Summary**", cl.__doc__)
+        self.assertIs(cl().__doc__, cl.__doc__)
+        self.assertRaises(AttributeError, getattr, onnx_ops, 'OnnxUnknown')
+
 
 if __name__ == "__main__":
     unittest.main()
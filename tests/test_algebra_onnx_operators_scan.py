@@ -399,6 +399,50 @@ class TestOnnxOperatorsScan(unittest.TestCase):
         exp = scipy_cdist(x * 2, x, metric="sqeuclidean")
         assert_almost_equal(exp, res[0], decimal=4)
 
+    @unittest.skipIf(StrictVersion(onnx__version__) < StrictVersion("1.4.0"),
+                     reason="only available for opset >= 10")
+    def test_onnx_example_cdist_gemm(self):
+        opv = onnx.defs.onnx_opset_version()
+        x = np.array([[6.1, 2.8, 4.7, 1.2],
+                      [5.7, 3.8, 1.7, 0.3],
+                      [7.7, 2.6, 6.9, 2.3],
+                      [6.0, 2.9, 4.5, 1.5]], dtype=np.float32)
+        x2 = np.vstack([x, x[:2] + 0.5])
+        cop = OnnxAdd('input', 'input', op_version=opv)
+        for metric in ['sqeuclidean', 'euclidean']:
+            for other in [x2, OnnxIdentity('other', op_version=opv)]:
+                cop2 = OnnxIdentity(
+                    onnx_cdist(cop, other, dtype=np.float32, metric=metric,
+                               op_version=opv, optim='gemm'),
+                    output_names=['cdist'], op_version=opv)
+                model_def = cop2.to_onnx(
+                    inputs=[('input', FloatTensorType([None, None])),
+                            ('other', FloatTensorType([None, None]))],
+                    outputs=[('cdist', FloatTensorType())])
+                self.assertIn('MatMul', str(model_def))
+                self.assertNotIn('Scan', str(model_def))
+                sess = InferenceSession(model_def.SerializeToString())
+                res = sess.run(None, {'input': x, 'other': x2})
+                exp = scipy_cdist(x * 2, x2, metric=metric)
+                assert_almost_equal(exp, res[0], decimal=4)
+                self.assertTrue((res[0] >= 0).all())
+
+            cop2 = OnnxIdentity(
+                onnx_squareform_pdist(cop, dtype=np.float32, metric=metric,
+                                      op_version=opv, optim='gemm'),
+                output_names=['pdist'], op_version=opv)
+            model_def = cop2.to_onnx(
+                inputs=[('input', FloatTensorType([None, None]))],
+                outputs=[('pdist', FloatTensorType())])
+            sess = InferenceSession(model_def.SerializeToString())
+            res = sess.run(None, {'input': x})
+            exp = squareform(pdist(x * 2, metric=metric))
+            assert_almost_equal(exp, res[0], decimal=3)
+
+        self.assertRaises(ValueError, onnx_cdist, cop, x2,
+                          metric='manhattan', optim='gemm')
+        self.assertRaises(ValueError, onnx_cdist, cop, x2, optim='GEMM')
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,7 +3,25 @@ Tests on functions in common.
 """
 
 import unittest
-from skl2onnx.common._container import _get_operation_list
+import numpy as np
+from numpy.testing import assert_almost_equal, assert_array_equal
+from onnx.numpy_helper import to_array
+from onnxruntime import InferenceSession
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA
+from sklearn.ensemble import BaggingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.pipeline import make_pipeline, make_union
+from sklearn.preprocessing import StandardScaler
+from skl2onnx import convert_sklearn
+from skl2onnx.common._apply_operation import apply_abs
+from skl2onnx.common._topology import Scope
+from skl2onnx.common.data_types import FloatTensorType
+from skl2onnx.proto import TensorProto
+from skl2onnx.common._container import (
+    _get_operation_list, ModelComponentContainer
+)
 
 
 class TestAppliedFunctions(unittest.TestCase):
@@ -13,6 +31,116 @@ class TestAppliedFunctions(unittest.TestCase):
         assert len(fcts) > 15
         assert isinstance(fcts, dict)
 
+    def test_container_node_names(self):
+        container = ModelComponentContainer(9, dtype=np.float32)
+        container.add_node('Abs', ['X'], ['Y'], name='abs')
+        container.add_node('Abs', ['Y'], ['Z'], name='abs')
+        container.add_node('Neg', ['Z'], ['T'])
+        names = [node.name for node in container.nodes]
+        self.assertEqual(names, ['abs', 'abs-N1', 'N2'])
+        self.assertEqual(container.get_producer('Z').name, 'abs-N1')
+        self.assertIsNone(container.get_producer('X'))
+
+    def test_container_validation(self):
+        self.assertRaises(ValueError, ModelComponentContainer, 9,
+                          dtype=np.float32, validation='any')
+        container = ModelComponentContainer(9, dtype=np.float32)
+        self.assertRaises(ValueError, container.add_node, 'Abs', [1], ['Y'])
+        container = ModelComponentContainer(9, dtype=np.float32,
+                                            validation='strict')
+        scope = Scope('s')
+        container.start_converter()
+        apply_abs(scope, 'X', 'Y', container)
+        apply_abs(scope, 'Y', 'Z', container)
+        self.assertEqual(container._checked_operators, {'Abs'})
+        container.start_converter()
+        self.assertEqual(container._checked_operators, set())
+
+    def test_convert_validation(self):
+        X, y = load_iris(return_X_y=True)
+        model = make_pipeline(StandardScaler(), PCA(2),
+                              LogisticRegression(solver='liblinear'))
+        model.fit(X, y)
+        models = [convert_sklearn(model, 'pca', [
+                  ('input', FloatTensorType([None, 4]))],
+                  validation=validation).SerializeToString()
+                  for validation in ['default', 'strict', 'off']]
+        self.assertEqual(models[0], models[1])
+        self.assertEqual(models[0], models[2])
+
+    def test_convert_n_jobs(self):
+        X, y = load_iris(return_X_y=True)
+        model = make_pipeline(
+            make_union(StandardScaler(), PCA(2), PCA(3)),
+            LogisticRegression(solver='liblinear'))
+        model.fit(X, y)
+        models = [convert_sklearn(model, 'union', [
+                  ('input', FloatTensorType([None, 4]))],
+                  n_jobs=n_jobs).SerializeToString()
+                  for n_jobs in [None, 1, 4, -1]]
+        for onx in models[1:]:
+            self.assertEqual(models[0], onx)
+
+    def test_container_raw_initializers(self):
+        container = ModelComponentContainer(9, dtype=np.float32)
+        values = np.arange(12, dtype=np.float64).reshape((3, 4))
+        tensor = container.add_initializer(
+            'A', TensorProto.DOUBLE, values.shape, values)
+        self.assertEqual(tensor.data_type, TensorProto.FLOAT)
+        self.assertEqual(len(tensor.float_data), 0)
+        assert_array_equal(to_array(tensor), values.astype(np.float32))
+        for dtype, onnx_type in [('>i8', TensorProto.INT64),
+                                 ('<i4', TensorProto.INT32),
+                                 (np.bool_, TensorProto.BOOL)]:
+            values = (np.arange(6) % 3).astype(dtype)
+            tensor = container.add_initializer(
+                'B', onnx_type, [2, 3], values[::-1])
+            self.assertEqual(len(tensor.raw_data), values.nbytes)
+            assert_array_equal(to_array(tensor),
+                               values[::-1].reshape((2, 3)))
+        tensor = container.add_initializer(
+            'C', TensorProto.INT64, [2], [4, 5])
+        self.assertEqual(list(tensor.int64_data), [4, 5])
+
+    def test_container_duplicated_initializers(self):
+        container = ModelComponentContainer(9, dtype=np.float32)
+        values = np.arange(6, dtype=np.float32)
+        container.add_node('Add', ['X', 'B'], ['Y'])
+        a = container.add_initializer('A', TensorProto.FLOAT, [6], values)
+        b = container.add_initializer('B', TensorProto.FLOAT, [6], values)
+        c = container.add_initializer('C', TensorProto.FLOAT, [2, 3], values)
+        d = container.add_initializer('D', TensorProto.INT64, [6],
+                                      values.astype(np.int64))
+        self.assertIs(a, b)
+        self.assertEqual([init.name for init in container.initializers],
+                         ['A', 'C', 'D'])
+        self.assertEqual(container.initializer_aliases, {'B': 'A'})
+        self.assertIsNot(c, d)
+        container.add_node('Mul', ['Y', 'B'], ['Z'])
+        self.assertEqual(list(container.nodes[1].input), ['Y', 'A'])
+        container.resolve_initializer_aliases()
+        self.assertEqual(list(container.nodes[0].input), ['X', 'A'])
+
+    def test_convert_duplicated_initializers(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(np.float32)
+        model = BaggingClassifier(GaussianNB(), n_estimators=5).fit(X, y)
+        models = [convert_sklearn(model, 'bagging', [
+                  ('input', FloatTensorType([None, 4]))],
+                  n_jobs=n_jobs) for n_jobs in [None, 4]]
+        self.assertEqual(models[0].SerializeToString(),
+                         models[1].SerializeToString())
+        names = [init.name for init in models[0].graph.initializer]
+        contents = set((init.data_type, tuple(init.dims),
+                        to_array(init).tobytes())
+                       for init in models[0].graph.initializer)
+        self.assertEqual(len(names), len(contents))
+        got = InferenceSession(models[0].SerializeToString()).run(
+            None, {'input': X})
+        assert_almost_equal(model.predict_proba(X),
+                            [[d[k] for k in sorted(d)] for d in got[1]],
+                            decimal=5)
+
 
 if __name__ == "__main__":
     unittest.main()
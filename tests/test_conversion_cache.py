@@ -0,0 +1,115 @@
+"""
+Tests on the conversion cache.
+"""
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+import numpy
+from sklearn.datasets import load_iris
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+from skl2onnx import convert_sklearn, to_onnx
+from skl2onnx.common.data_types import FloatTensorType
+from skl2onnx.proto import get_opset_number_from_onnx
+from skl2onnx.helpers.conversion_cache import (
+    ConversionCache, model_fingerprint
+)
+
+
+class TestConversionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_model_fingerprint(self):
+        X, y = load_iris(return_X_y=True)
+        model = make_pipeline(
+            StandardScaler(),
+            RandomForestClassifier(n_estimators=3, random_state=0))
+        model.fit(X, y)
+        types = [('input', FloatTensorType([None, 4]))]
+        key = model_fingerprint(model, types)
+        self.assertEqual(key, model_fingerprint(model, types))
+        self.assertEqual(key, model_fingerprint(
+            pickle.loads(pickle.dumps(model)), types))
+        self.assertNotEqual(key, model_fingerprint(
+            model, [('input', FloatTensorType([None, 3]))]))
+        self.assertNotEqual(key, model_fingerprint(model, types,
+                                                   dtype=numpy.float64))
+        self.assertNotEqual(key, model_fingerprint(model, types,
+                                                   target_opset=9))
+        self.assertNotEqual(key, model_fingerprint(
+            model, types, options={id(model): {'zipmap': False}}))
+        # Options given by id are hashed with the path of the estimator.
+        copy = pickle.loads(pickle.dumps(model))
+        key_id = model_fingerprint(
+            model, types, options={id(model.steps[1][1]): {'zipmap': False}})
+        self.assertEqual(key_id, model_fingerprint(
+            copy, types, options={id(copy.steps[1][1]): {'zipmap': False}}))
+        self.assertNotEqual(key_id, model_fingerprint(
+            copy, types, options={id(copy.steps[0][1]): {'zipmap': False}}))
+        self.assertEqual(key, model_fingerprint(
+            model, types, options={id(copy): {'zipmap': False}}))
+        model.fit(X[::-1], y[::-1])
+        self.assertNotEqual(key, model_fingerprint(model, types))
+
+    def test_fingerprint_functions(self):
+        def scale(factor):
+            return lambda x: x * factor
+
+        keys = [model_fingerprint(f) for f in [
+            lambda x: x + 1, lambda x: x + 2, lambda x: x * 2,
+            scale(2), scale(3)]]
+        self.assertEqual(len(set(keys)), len(keys))
+        self.assertEqual(keys[3], model_fingerprint(scale(2)))
+
+    def test_convert_cache(self):
+        X, y = load_iris(return_X_y=True)
+        model = LogisticRegression(solver='liblinear').fit(X, y)
+        cache = ConversionCache(self.folder)
+        types = [('input', FloatTensorType([None, 4]))]
+        onx = convert_sklearn(model, 'first', types, cache=cache)
+        self.assertEqual(len(os.listdir(self.folder)), 1)
+        onx2 = convert_sklearn(model, 'second', types, cache=cache)
+        self.assertEqual(onx2.graph.name, 'second')
+        onx2.graph.name = 'first'
+        self.assertEqual(onx.SerializeToString(), onx2.SerializeToString())
+        onx3 = to_onnx(model, initial_types=types, cache=cache)
+        self.assertEqual(onx3.graph.node, onx.graph.node)
+        self.assertEqual(len(os.listdir(self.folder)), 1)
+        cache.clear()
+        self.assertEqual(os.listdir(self.folder), [])
+
+    def test_cache_eviction(self):
+        X, y = load_iris(return_X_y=True)
+        types = [('input', FloatTensorType([None, 4]))]
+        cache = ConversionCache(self.folder, max_size=None)
+        keys = []
+        for i in range(3):
+            model = LogisticRegression(solver='liblinear', C=i + 1)
+            model.fit(X, y)
+            keys.append(cache.fingerprint(
+                model, types, target_opset=get_opset_number_from_onnx()))
+            convert_sklearn(model, initial_types=types, cache=cache)
+            # Makes the access times distinct.
+            os.utime(cache._filename(keys[-1]), (i, i))
+        self.assertIsNotNone(cache.get(keys[0]))
+        size = sum(os.path.getsize(os.path.join(self.folder, name))
+                   for name in os.listdir(self.folder))
+        cache.max_size = size - 1
+        cache._evict()
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+        self.assertRaises(ValueError, ConversionCache, self.folder, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
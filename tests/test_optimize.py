@@ -0,0 +1,326 @@
+"""
+Tests the optimizations applied on the converted graph.
+"""
+import unittest
+import numpy
+from numpy.testing import assert_allclose, assert_almost_equal
+from onnx import helper, numpy_helper, onnx_pb as onnx_proto
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.compose import ColumnTransformer
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.linear_model import LinearRegression, LogisticRegression
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import NearestNeighbors
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import (
+    MinMaxScaler, OneHotEncoder, StandardScaler)
+from onnxruntime import InferenceSession
+from skl2onnx import convert_sklearn, to_onnx
+from skl2onnx.common._container import ModelComponentContainer
+from skl2onnx.common.data_types import (
+    FloatTensorType, Int64TensorType, StringTensorType)
+
+
+def _container(nodes, inits=None, output_type=onnx_proto.TensorProto.FLOAT,
+               n_features=4):
+    TP = onnx_proto.TensorProto
+    container = ModelComponentContainer(11, dtype=numpy.float32)
+    container.inputs.append(
+        helper.make_tensor_value_info('X', TP.FLOAT, [None, n_features]))
+    container.outputs.append(
+        helper.make_tensor_value_info('Y', output_type, None))
+    for name, value in (inits or {}).items():
+        if isinstance(value, list):
+            container.add_initializer(name, TP.INT64, [len(value)], value)
+        else:
+            container.initializers.append(
+                numpy_helper.from_array(value, name))
+    for args, kwargs in nodes:
+        container.add_node(*args, **kwargs)
+    return container
+
+
+def _run(container, X):
+    graph = helper.make_graph(container.nodes, 'g', container.inputs,
+                              container.outputs, container.initializers)
+    model = helper.make_model(
+        graph, opset_imports=[helper.make_operatorsetid('', 11)])
+    return InferenceSession(model.SerializeToString()).run(
+        None, {'X': X})[0]
+
+
+class TestOptimize(unittest.TestCase):
+
+    def check(self, nodes, inits, passes, expected_ops, decimal=7,
+              n_features=4):
+        X = numpy.random.rand(3, n_features or 4).astype(numpy.float32)
+        exp = _run(_container(nodes, inits, n_features=n_features), X)
+        container = _container(nodes, inits, n_features=n_features)
+        report = container.optimize(passes)
+        self.assertEqual([node.op_type for node in container.nodes],
+                         expected_ops)
+        assert_almost_equal(exp, _run(container, X), decimal=decimal)
+        return report
+
+    def test_identity(self):
+        report = self.check(
+            [(('Identity', 'X', 'a'), {}),
+             (('Abs', 'a', 'b'), {}),
+             (('Identity', 'b', 'c'), {}),
+             (('Identity', 'c', 'Y'), {})],
+            None, ['identity'], ['Abs'])
+        self.assertEqual(dict(report), {'identity': 3})
+
+    def test_reshape(self):
+        report = self.check(
+            [(('Reshape', ['X', 's1'], 'a'), {'op_version': 5}),
+             (('Reshape', ['a', 's2'], 'b'), {'op_version': 5}),
+             (('Reshape', ['b', 's3'], 'Y'), {'op_version': 5})],
+            {'s1': [-1, 1], 's2': [-1, 2], 's3': [0, 1, -1]},
+            None, ['Reshape', 'Reshape'])
+        self.assertEqual(dict(report), {
+            'identity': 0, 'reshape': 1, 'cast': 0, 'constant': 0,
+            'affine': 0, 'one_hot': 0, 'dead_nodes': 0})
+
+    def test_cast(self):
+        TP = onnx_proto.TensorProto
+        # float -> double is lossless, float -> int64 is not.
+        report = self.check(
+            [(('Cast', 'X', 'a'), {'to': TP.DOUBLE, 'op_version': 9}),
+             (('Cast', 'a', 'b'), {'to': TP.FLOAT, 'op_version': 9}),
+             (('Cast', 'b', 'c'), {'to': TP.INT64, 'op_version': 9}),
+             (('Cast', 'c', 'Y'), {'to': TP.FLOAT, 'op_version': 9})],
+            None, ['cast', 'identity'], ['Cast', 'Cast'])
+        self.assertEqual(dict(report), {'cast': 2, 'identity': 0})
+
+    def test_dead_nodes(self):
+        report = self.check(
+            [(('Abs', 'X', 'a'), {}),
+             (('Neg', 'a', 'b'), {}),
+             (('Exp', 'X', 'Y'), {})],
+            {'unused': [1]}, ['dead_nodes'], ['Exp'])
+        self.assertEqual(dict(report), {'dead_nodes': 2})
+
+    def test_constant(self):
+        W = numpy.random.rand(3, 4).astype(numpy.float32)
+        report = self.check(
+            [(('Transpose', 'W', 'Wt'), {}),
+             (('Mul', ['Wt', 'two'], 'W2'), {}),
+             (('Reshape', ['W2', 'shape'], 'W3'), {'op_version': 5}),
+             (('MatMul', ['X', 'W3'], 'Y'), {})],
+            {'W': W, 'two': numpy.array([2], dtype=numpy.float32),
+             'shape': [4, -1]},
+            None, ['MatMul'])
+        self.assertEqual(report['constant'], 3)
+
+    def test_affine(self):
+        W = numpy.random.rand(4, 3).astype(numpy.float32)
+        W2 = numpy.random.rand(3, 2).astype(numpy.float32)
+        inits = {'W': W, 'W2': W2,
+                 'mean': numpy.random.rand(1, 4).astype(numpy.float32),
+                 'scale': numpy.random.rand(4).astype(numpy.float32),
+                 'bias': numpy.random.rand(2).astype(numpy.float32)}
+        report = self.check(
+            [(('Sub', ['X', 'mean'], 'a'), {}),
+             (('Div', ['a', 'scale'], 'b'), {}),
+             (('MatMul', ['b', 'W'], 'c'), {}),
+             (('Gemm', ['c', 'W2', 'bias'], 'Y'), {'beta': 0.5})],
+            inits, ['affine', 'dead_nodes'], ['Gemm'], decimal=5)
+        self.assertEqual(report['affine'], 3)
+        # The intermediate result is a graph output.
+        self.check(
+            [(('Sub', ['X', 'mean'], 'a'), {}),
+             (('MatMul', ['a', 'W'], 'Y'), {}),
+             (('Abs', 'a', 'Z'), {})],
+            inits, ['affine'], ['Sub', 'MatMul', 'Abs'])
+        # A scale alone does not need any bias.
+        self.check(
+            [(('Mul', ['scale', 'X'], 'a'), {}),
+             (('MatMul', ['a', 'W'], 'Y'), {})],
+            inits, ['affine', 'dead_nodes'], ['MatMul'])
+
+    def test_affine_broadcast(self):
+        inits = {'w': numpy.random.rand(1, 3).astype(numpy.float32),
+                 'W': numpy.random.rand(3, 2).astype(numpy.float32),
+                 'scale': numpy.random.rand(4).astype(numpy.float32),
+                 'W4': numpy.random.rand(4, 2).astype(numpy.float32)}
+        # The multiplication broadcasts X to three columns.
+        self.check(
+            [(('Mul', ['X', 'w'], 'a'), {}),
+             (('MatMul', ['a', 'W'], 'Y'), {})],
+            inits, ['affine', 'dead_nodes'], ['Mul', 'MatMul'],
+            n_features=1)
+        # The number of features is unknown.
+        self.check(
+            [(('Mul', ['X', 'scale'], 'a'), {}),
+             (('MatMul', ['a', 'W4'], 'Y'), {})],
+            inits, ['affine', 'dead_nodes'], ['Mul', 'MatMul'],
+            n_features=None)
+
+    def test_convert_affine(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        models = [
+            (make_pipeline(StandardScaler(), PCA(3),
+                           LogisticRegression(solver='liblinear')),
+             ['LinearClassifier', 'Normalizer']),
+            (make_pipeline(MinMaxScaler(), TruncatedSVD(2),
+                           LinearRegression()), ['LinearRegressor']),
+            (make_pipeline(StandardScaler(), PCA(2, whiten=True)),
+             ['Gemm']),
+        ]
+        for model, expected_ops in models:
+            with self.subTest(model=model.steps[-1][0]):
+                model.fit(X, y)
+                options = {LogisticRegression: {'zipmap': False}}
+                expected = to_onnx(model, X, options=options)
+                onx = to_onnx(model, X, options=options, optimize=True)
+                self.assertEqual([node.op_type for node in onx.graph.node],
+                                 expected_ops)
+                exp = InferenceSession(expected.SerializeToString()).run(
+                    None, {'X': X})
+                got = InferenceSession(onx.SerializeToString()).run(
+                    None, {'X': X})
+                for e, g in zip(exp, got):
+                    assert_almost_equal(e, g, decimal=5)
+
+    def test_convert_affine_precision(self):
+        rs = numpy.random.RandomState(0)
+        X = (rs.randn(500, 100) * 3 + 5).astype(numpy.float32)
+        model = ColumnTransformer(
+            [('pca', PCA(n_components=5), slice(0, 10)),
+             ('svd', TruncatedSVD(n_components=5), slice(10, 100))],
+            transformer_weights={'pca': 2, 'svd': 3}).fit(X)
+        expected = model.transform(X)
+        onx = to_onnx(model, X, optimize=['affine', 'dead_nodes'])
+        ops = [node.op_type for node in onx.graph.node]
+        self.assertNotIn('Sub', ops)
+        self.assertIn('Gemm', ops)
+        got = InferenceSession(onx.SerializeToString()).run(
+            None, {'X': X})[0]
+        # The centering is folded into the bias of Gemm, the error is
+        # about twice the error of the sequential computation.
+        atol = numpy.abs(expected).max() * 1e-6
+        assert_allclose(expected, got, rtol=0, atol=atol)
+
+    def test_convert_one_hot(self):
+        rs = numpy.random.RandomState(0)
+        Xi = rs.randint(0, 30, size=(100, 3)).astype(numpy.int64)
+        Xs = numpy.array([['c%d' % v for v in row]
+                          for row in rs.randint(0, 20, size=(100, 2))])
+        y = Xi[:, 0] % 3
+        models = [
+            (make_pipeline(OneHotEncoder(handle_unknown='ignore'),
+                           LogisticRegression(solver='liblinear')),
+             Xi, Int64TensorType([None, 3]),
+             ['Gather', 'Gather', 'Gather', 'Sum', 'Reshape',
+              'LinearClassifier', 'Normalizer']),
+            (make_pipeline(OneHotEncoder(handle_unknown='ignore'),
+                           LinearRegression()),
+             Xs, StringTensorType([None, 2]),
+             ['Gather', 'Gather', 'Sum', 'Reshape', 'LinearRegressor']),
+            # Unknown categories must still raise an error.
+            (make_pipeline(OneHotEncoder(), LinearRegression()),
+             Xi, Int64TensorType([None, 3]), None),
+        ]
+        for model, X, itype, expected_ops in models:
+            with self.subTest(model=model.steps[-1][0]):
+                model.fit(X, y)
+                options = {LogisticRegression: {'zipmap': False}}
+                expected = convert_sklearn(model, 'ohe', [('X', itype)],
+                                           options=options)
+                onx = convert_sklearn(model, 'ohe', [('X', itype)],
+                                      options=options, optimize=True)
+                ops = [node.op_type for node in onx.graph.node]
+                if expected_ops is None:
+                    self.assertEqual(ops.count('OneHotEncoder'), 3)
+                else:
+                    self.assertNotIn('OneHotEncoder', ops)
+                    self.assertEqual(ops[-len(expected_ops):], expected_ops)
+                exp = InferenceSession(expected.SerializeToString()).run(
+                    None, {'X': X})
+                got = InferenceSession(onx.SerializeToString()).run(
+                    None, {'X': X})
+                for e, g in zip(exp, got):
+                    assert_almost_equal(e, g, decimal=5)
+
+    def test_reference_ops(self):
+        TP = onnx_proto.TensorProto
+        A = numpy.arange(24).reshape((2, 3, 4)).astype(numpy.float32)
+        B = numpy.random.rand(4, 3).astype(numpy.float32)
+        C = numpy.random.rand(1, 3).astype(numpy.float32)
+        K = numpy.array([[-7, 6], [5, -3]], dtype=numpy.int64)
+        J = numpy.array([2, -2], dtype=numpy.int64)
+        tests = [
+            ('Gemm', ['B', 'B'], dict(transA=1, alpha=0.5), TP.FLOAT),
+            ('Gemm', ['B', 'B', 'C'], dict(transA=1, beta=2.), TP.FLOAT),
+            ('Div', ['K', 'J'], {}, TP.INT64),
+            ('Sub', ['K', 'J'], {}, TP.INT64),
+            ('Pow', ['B', 'C'], {}, TP.FLOAT),
+            ('Slice', ['A', 'st', 'en', 'ax'], dict(op_version=10),
+             TP.FLOAT),
+            ('ReduceMean', ['A'], dict(axes=[0, 2], keepdims=0), TP.FLOAT),
+            ('ReduceSum', ['A'], {}, TP.FLOAT),
+            ('Squeeze', ['C'], dict(axes=[0]), TP.FLOAT),
+            ('Unsqueeze', ['C'], dict(axes=[-1, 0]), TP.FLOAT),
+            ('Flatten', ['A'], dict(axis=2), TP.FLOAT),
+            ('Concat', ['B', 'C'], dict(axis=0), TP.FLOAT),
+            ('Gather', ['A', 'J'], dict(axis=2), TP.FLOAT),
+            ('Cast', ['K'], dict(to=TP.FLOAT, op_version=9), TP.FLOAT),
+            ('Shape', ['A'], {}, TP.INT64),
+            ('Transpose', ['A'], dict(perm=[1, 0, 2]), TP.FLOAT),
+        ]
+        inits = {'A': A, 'B': B, 'C': C, 'K': K, 'J': J,
+                 'st': [1, 0], 'en': [3, -1], 'ax': [1, 2]}
+        X = numpy.random.rand(3, 4).astype(numpy.float32)
+        for op_type, inputs, attrs, otype in tests:
+            with self.subTest(op_type=op_type, inputs=inputs):
+                nodes = [((op_type, inputs, 'Y'), attrs)]
+                exp = _run(_container(nodes, inits, otype), X)
+                # The folded output cannot be a graph output.
+                container = _container(
+                    [((op_type, inputs, 'Z'), attrs),
+                     (('Identity', 'Z', 'Y'), {})], inits, otype)
+                report = container.optimize(['constant'])
+                self.assertEqual(report['constant'], 1)
+                got = [numpy_helper.to_array(init)
+                       for init in container.initializers
+                       if init.name == 'Z'][0]
+                self.assertEqual(exp.dtype, got.dtype)
+                assert_almost_equal(exp, got, decimal=5)
+
+    def test_unknown_pass(self):
+        container = _container([(('Abs', 'X', 'Y'), {})])
+        self.assertRaises(ValueError, container.optimize, ['unknown'])
+
+    def test_convert_optimize(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        for model in [NearestNeighbors(n_neighbors=3).fit(X),
+                      CalibratedClassifierCV(GaussianNB(), cv=3).fit(X, y)]:
+            with self.subTest(model=model.__class__.__name__):
+                types = [('input', FloatTensorType([None, 4]))]
+                expected = convert_sklearn(model, 'model', types)
+                onx, topology = convert_sklearn(
+                    model, 'model', types, optimize=True,
+                    intermediate=True)
+                report = topology.optimization_report
+                self.assertGreater(sum(report.values()), 0)
+                self.assertEqual(len(expected.graph.node) - sum(
+                    report.values()), len(onx.graph.node))
+                self.assertIsNone(topology.conversion_records)
+
+                exp = InferenceSession(expected.SerializeToString()).run(
+                    None, {'input': X})
+                got = InferenceSession(onx.SerializeToString()).run(
+                    None, {'input': X})
+                for e, g in zip(exp, got):
+                    if isinstance(e, list):
+                        self.assertEqual(e, g)
+                    else:
+                        assert_almost_equal(e, g)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Tests function reconvert_sklearn.
+"""
+import unittest
+import numpy
+from numpy.testing import assert_almost_equal
+from sklearn.datasets import load_iris
+from sklearn.decomposition import PCA
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import make_pipeline, make_union
+from sklearn.preprocessing import StandardScaler
+from onnxruntime import InferenceSession
+from skl2onnx import convert_sklearn, reconvert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+
+
+class TestReconvert(unittest.TestCase):
+
+    def test_reconvert_last_step(self):
+        X, y = load_iris(return_X_y=True)
+        pipe = make_pipeline(StandardScaler(), PCA(3),
+                             LogisticRegression(solver='liblinear'))
+        pipe.fit(X, y)
+        types = [('input', FloatTensorType([None, 4]))]
+        onx, topology = convert_sklearn(pipe, 'pipe', types,
+                                        intermediate=True)
+        self.assertRaises(ValueError, reconvert_sklearn, onx,
+                          topology.__class__(topology.raw_model), pipe)
+
+        for n_jobs in [None, 2]:
+            pipe.steps[-1][1].fit(pipe[:2].transform(X[::2]), y[::2])
+            onx, topology = reconvert_sklearn(onx, topology, pipe,
+                                              n_jobs=n_jobs)
+            expected = convert_sklearn(pipe, 'pipe', types)
+            self.assertEqual(onx.SerializeToString(),
+                             expected.SerializeToString())
+
+    def test_reconvert_declared_operators(self):
+        X, y = load_iris(return_X_y=True)
+        X = X.astype(numpy.float32)
+        voting = VotingClassifier(
+            [('lr', LogisticRegression(solver='liblinear')),
+             ('rf', RandomForestClassifier(n_estimators=3))],
+            voting='soft', flatten_transform=False)
+        pipe = make_pipeline(StandardScaler(), voting)
+        pipe.fit(X, y)
+        types = [('input', FloatTensorType([None, 4]))]
+        onx, topology = convert_sklearn(pipe, 'pipe', types,
+                                        intermediate=True)
+        pipe.steps[0][1].fit(X[::3] * 2)
+        onx2, topology2 = reconvert_sklearn(onx, topology, pipe)
+        expected = convert_sklearn(pipe, 'pipe', types)
+        self.assertEqual(len(onx2.graph.node), len(expected.graph.node))
+        # The voting classifier and the operators its converter
+        # declared are copied.
+        names = set(node.name for node in onx.graph.node)
+        self.assertEqual(
+            len([node for node in onx2.graph.node if node.name in names]),
+            len(onx.graph.node))
+
+        got = InferenceSession(onx2.SerializeToString()).run(
+            None, {'input': X})
+        exp = InferenceSession(expected.SerializeToString()).run(
+            None, {'input': X})
+        assert_almost_equal(exp[0], got[0])
+        assert_almost_equal(pipe.predict_proba(X),
+                            numpy.array([[d[k] for k in sorted(d)]
+                                         for d in got[1]]),
+                            decimal=5)
+
+    def test_reconvert_duplicated_initializers(self):
+        X = load_iris().data.astype(numpy.float32)
+        union = make_union(PCA(2), PCA(2)).fit(X)
+        types = [('input', FloatTensorType([None, 4]))]
+        onx, topology = convert_sklearn(union, 'union', types,
+                                        intermediate=True)
+        # The second PCA uses the initializers of the first one.
+        self.assertEqual(len(onx.graph.initializer), 2)
+        union.transformer_list[0][1].fit(X * 2)
+        onx2, topology2 = reconvert_sklearn(onx, topology, union)
+        got = InferenceSession(onx2.SerializeToString()).run(
+            None, {'input': X})
+        assert_almost_equal(union.transform(X), got[0], decimal=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
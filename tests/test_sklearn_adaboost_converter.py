@@ -6,11 +6,13 @@
 
 import unittest
 from distutils.version import StrictVersion
+from numpy.testing import assert_almost_equal
 import onnx
 import onnxruntime
+from onnxruntime import InferenceSession
 from sklearn.ensemble import AdaBoostClassifier, AdaBoostRegressor
 from sklearn.linear_model import LinearRegression, LogisticRegression
-from sklearn.tree import DecisionTreeClassifier
+from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType, Int64TensorType
 from skl2onnx.common.data_types import onnx_built_with_ml
@@ -49,6 +51,33 @@ class TestSklearnAdaBoostModels(unittest.TestCase):
             "<= StrictVersion('0.2.1')",
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    @unittest.skipIf((StrictVersion(onnx.__version__) <
+                      StrictVersion("1.5.0")),
+                     reason="not available")
+    def test_ada_boost_classifier_single_tree_ensemble(self):
+        for n_classes in [2, 3]:
+            for algorithm in ['SAMME', 'SAMME.R']:
+                model, X_test = fit_classification_model(AdaBoostClassifier(
+                    n_estimators=30, algorithm=algorithm, random_state=42,
+                    base_estimator=DecisionTreeClassifier(
+                        max_depth=3, random_state=42)), n_classes)
+                model_onnx = convert_sklearn(
+                    model, "AdaBoost classification",
+                    [("input", FloatTensorType((None, X_test.shape[1])))],
+                    options={id(model): {'zipmap': False}})
+                op_types = [n.op_type for n in model_onnx.graph.node]
+                self.assertEqual(op_types.count('TreeEnsembleClassifier'), 1)
+                got = InferenceSession(model_onnx.SerializeToString()).run(
+                    None, {'input': X_test})
+                proba = model.predict_proba(X_test)
+                assert_almost_equal(proba, got[1], decimal=5)
+                # SAMME predicts with hard votes before scikit-learn 0.22,
+                # the converted model follows the probabilities.
+                self.assertEqual(model.classes_[proba.argmax(axis=1)].tolist(),
+                                 got[0].tolist())
+
     @unittest.skipIf(not onnx_built_with_ml(),
                      reason="Requires ONNX-ML extension.")
     @unittest.skipIf((StrictVersion(onnx.__version__) <
@@ -260,6 +289,29 @@ class TestSklearnAdaBoostModels(unittest.TestCase):
             verbose=False
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    @unittest.skipIf((StrictVersion(onnxruntime.__version__) <
+                      StrictVersion("0.5.9999")),
+                     reason="not available")
+    def test_ada_boost_regressor_median(self):
+        model, X = fit_regression_model(
+            AdaBoostRegressor(n_estimators=50, random_state=42,
+                              base_estimator=DecisionTreeRegressor(
+                                  max_depth=3)))
+        for opset in [10, 11]:
+            model_onnx = convert_sklearn(
+                model, "AdaBoost regression",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                target_opset=opset)
+            op_types = [n.op_type for n in model_onnx.graph.node]
+            self.assertNotIn('RNN', op_types)
+            self.assertNotIn('GatherElements', op_types)
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})
+            assert_almost_equal(model.predict(X), got[0].ravel(),
+                                decimal=3)
+
 
 if __name__ == "__main__":
     unittest.main()
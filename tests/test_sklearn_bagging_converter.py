@@ -13,6 +13,8 @@ from sklearn.ensemble import (
     GradientBoostingRegressor,
 )
 from sklearn.linear_model import SGDClassifier, SGDRegressor
+from numpy.testing import assert_almost_equal
+from onnxruntime import InferenceSession
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType, Int64TensorType
 from test_utils import (
@@ -232,6 +234,39 @@ class TestSklearnBaggingConverter(unittest.TestCase):
             "<= StrictVersion('0.2.1')",
         )
 
+    def test_bagging_classifier_trees_max_features(self):
+        for n_classes in [2, 3]:
+            model, X = fit_classification_model(
+                BaggingClassifier(n_estimators=20, max_features=0.3,
+                                  bootstrap_features=True,
+                                  max_samples=0.05, random_state=0),
+                n_classes, label_string=True)
+            model_onnx = convert_sklearn(
+                model, "bagging classifier",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                options={id(model): {'zipmap': False}})
+            # All trees end up in the same node.
+            self.assertEqual(
+                [n.op_type for n in model_onnx.graph.node].count(
+                    'TreeEnsembleClassifier'), 1)
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})
+            assert_almost_equal(model.predict_proba(X), got[1], decimal=5)
+            self.assertEqual(model.predict(X).tolist(), got[0].tolist())
+
+    def test_bagging_regressor_trees_max_features(self):
+        model, X = fit_regression_model(
+            BaggingRegressor(n_estimators=20, max_features=0.5,
+                             bootstrap_features=True, random_state=0))
+        model_onnx = convert_sklearn(
+            model, "bagging regressor",
+            [("input", FloatTensorType([None, X.shape[1]]))])
+        self.assertEqual([n.op_type for n in model_onnx.graph.node],
+                         ['TreeEnsembleRegressor'])
+        got = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'input': X})
+        assert_almost_equal(model.predict(X), got[0].ravel(), decimal=3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -3,10 +3,14 @@ Tests scikit-learn's CalibratedClassifierCV converters
 """
 
 import unittest
+import warnings
 from distutils.version import StrictVersion
 import numpy as np
+from numpy.testing import assert_almost_equal
+from onnx import numpy_helper
 from sklearn.calibration import CalibratedClassifierCV
-from sklearn.datasets import load_digits, load_iris
+from sklearn.datasets import load_digits, load_iris, make_classification
+from sklearn.ensemble import RandomForestClassifier
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.neighbors import KNeighborsClassifier
 import onnxruntime
@@ -133,6 +137,60 @@ class TestSklearnCalibratedClassifierCVConverters(unittest.TestCase):
             raise AssertionError("Issue with model\n{}".format(
                 str(model_onnx))) from e
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_model_calibrated_classifier_cv_folds(self):
+        for n_classes in [2, 3]:
+            X, y = make_classification(1000, 10, n_informative=6,
+                                       n_classes=n_classes, random_state=0)
+            X = X.astype(np.float32)
+            for method in ['isotonic', 'sigmoid']:
+                with self.subTest(n_classes=n_classes, method=method):
+                    model = CalibratedClassifierCV(
+                        RandomForestClassifier(n_estimators=5, max_depth=4,
+                                               random_state=0),
+                        cv=5, method=method).fit(X, y)
+                    model_onnx = convert_sklearn(
+                        model, "scikit-learn CalibratedClassifierCV",
+                        [("input", FloatTensorType([None, X.shape[1]]))],
+                        options={id(model): {'zipmap': False}})
+                    sess = onnxruntime.InferenceSession(
+                        model_onnx.SerializeToString())
+                    got = sess.run(None, {'input': X})
+                    assert_almost_equal(model.predict_proba(X), got[1],
+                                        decimal=4)
+                    assert_almost_equal(model.predict(X), got[0])
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_model_calibrated_classifier_cv_equal_thresholds(self):
+        X, y = make_classification(200, 10, random_state=0)
+        X = X.astype(np.float32)
+        model = CalibratedClassifierCV(
+            RandomForestClassifier(n_estimators=5, max_depth=4,
+                                   random_state=0),
+            cv=3, method='isotonic').fit(X, y)
+        # Recent versions of scikit-learn keep both ends of a jump.
+        for cal in model.calibrated_classifiers_:
+            for iso in cal.calibrators_:
+                iso._necessary_X_ = np.insert(
+                    iso._necessary_X_, 1, iso._necessary_X_[1])
+                iso._necessary_y_ = np.insert(
+                    iso._necessary_y_, 1, iso._necessary_y_[0])
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', RuntimeWarning)
+            model_onnx = convert_sklearn(
+                model, "scikit-learn CalibratedClassifierCV",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                options={id(model): {'zipmap': False}})
+        for init in model_onnx.graph.initializer:
+            value = numpy_helper.to_array(init)
+            if value.dtype.kind == 'f':
+                self.assertFalse(np.isnan(value).any())
+        got = onnxruntime.InferenceSession(
+            model_onnx.SerializeToString()).run(None, {'input': X})
+        self.assertFalse(np.isnan(got[1]).any())
+
 
 if __name__ == "__main__":
     unittest.main()
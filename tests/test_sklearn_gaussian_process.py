@@ -768,6 +768,29 @@ class TestSklearnGaussianProcess(unittest.TestCase):
         self.assertTrue(model_onnx is not None)
         self.check_outputs(gp, model_onnx, X_test, {})
 
+    @unittest.skipIf(
+        StrictVersion(ort_version) <= StrictVersion(THRESHOLD2),
+        reason="onnxruntime %s" % THRESHOLD)
+    def test_gpr_fitted_float64_gemm(self):
+        data = load_iris()
+        X = data.data
+        y = data.target
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, random_state=0)
+        for kernel in [RBF(), ExpSineSquared(), RationalQuadratic()]:
+            gp = GaussianProcessRegressor(kernel=kernel, alpha=100.)
+            gp.fit(X_train, y_train)
+            gp.predict(X_test, return_std=True)
+            model_onnx = to_onnx(
+                gp, initial_types=[('X', DoubleTensorType([None, None]))],
+                dtype=np.float64,
+                options={GaussianProcessRegressor: {'optim': 'gemm',
+                                                    'return_std': True}})
+            self.assertIn('MatMul', str(model_onnx))
+            self.assertNotIn('Scan', str(model_onnx))
+            self.check_outputs(gp, model_onnx, X_test,
+                               {'return_std': True}, decimal=4)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@ Tests scikit-learn's KNeighbours Classifier and Regressor converters.
 import unittest
 from distutils.version import StrictVersion
 import numpy
+from numpy.testing import assert_almost_equal
 from sklearn import datasets
 from sklearn.model_selection import train_test_split
 from sklearn.neighbors import KNeighborsRegressor, KNeighborsClassifier
@@ -14,6 +15,7 @@ from onnxruntime import InferenceSession
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType, Int64TensorType
 from skl2onnx.common.data_types import onnx_built_with_ml
+import skl2onnx.operator_converters.nearest_neighbours as nn
 from test_utils import dump_data_and_model, fit_classification_model
 
 
@@ -57,6 +59,116 @@ class TestNearestNeighbourConverter(unittest.TestCase):
             model, model_onnx,
             basename="SklearnKNeighborsRegressor")
 
+    @unittest.skipIf(
+        StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
+        reason="not available")
+    def test_model_knn_regressor_gemm(self):
+        model, X = self._fit_model(KNeighborsRegressor(n_neighbors=2))
+        model_onnx = convert_sklearn(
+            model, "KNN regressor", [("input", FloatTensorType([None, 4]))],
+            options={id(model): {'optim': 'gemm'}})
+        self.assertIn('MatMul', str(model_onnx))
+        self.assertNotIn('Scan', str(model_onnx))
+        dump_data_and_model(
+            X.astype(numpy.float32)[:7],
+            model, model_onnx,
+            basename="SklearnKNeighborsRegressorGemm")
+
+    @unittest.skipIf(
+        StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
+        reason="not available")
+    def test_model_knn_regressor_block_size(self):
+        model, X = self._fit_model(
+            KNeighborsRegressor(n_neighbors=5, weights='distance'))
+        X = X.astype(numpy.float32)
+        types = [("input", FloatTensorType([None, 4]))]
+        exp = InferenceSession(convert_sklearn(
+            model, "KNN regressor", types).SerializeToString()).run(
+                None, {'input': X})[0]
+        assert_almost_equal(model.predict(X).ravel(), exp.ravel(),
+                            decimal=3)
+        for block_size in [1, 7, numpy.int64(50)]:
+            model_onnx = convert_sklearn(
+                model, "KNN regressor", types,
+                options={id(model): {'block_size': block_size}})
+            self.assertIn('GatherElements', str(model_onnx))
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})[0]
+            assert_almost_equal(exp, got, decimal=5)
+        self.assertRaises(RuntimeError, convert_sklearn, model,
+                          "KNN regressor", types, target_opset=10,
+                          options={id(model): {'block_size': 7}})
+        for block_size in ['7', 7., True, 0]:
+            self.assertRaises(ValueError, convert_sklearn, model,
+                              "KNN regressor", types,
+                              options={id(model): {'block_size': block_size}})
+
+    @unittest.skipIf(
+        StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
+        reason="not available")
+    def test_model_knn_regressor_ivf(self):
+        rs = numpy.random.RandomState(0)
+        centers = rs.randn(10, 4) * 10
+        X = (centers[rs.randint(0, 10, 1000)] +
+             rs.randn(1000, 4)).astype(numpy.float32)
+        y = rs.randn(1000)
+        types = [("input", FloatTensorType([None, 4]))]
+        for metric in ['minkowski', 'manhattan']:
+            model = KNeighborsRegressor(
+                n_neighbors=3, weights='distance', metric=metric).fit(X, y)
+            exp = model.predict(X[:50])
+            # Every list is probed, the results are exact.
+            model_onnx = convert_sklearn(
+                model, "KNN regressor", types,
+                options={id(model): {'n_lists': 10, 'n_probe': 10}})
+            self.assertIn('Gemm', str(model_onnx))
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X[:50]})[0]
+            assert_almost_equal(exp, got.ravel(), decimal=4)
+            model_onnx = convert_sklearn(
+                model, "KNN regressor", types,
+                options={id(model): {'n_lists': 10, 'n_probe': 2}})
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X[:50]})[0]
+            self.assertGreater(
+                numpy.mean(numpy.abs(exp - got.ravel()) < 1e-4), 0.9)
+
+        self.assertRaises(RuntimeError, convert_sklearn, model,
+                          "KNN regressor", types, target_opset=10,
+                          options={id(model): {'n_lists': 10}})
+        self.assertRaises(ValueError, convert_sklearn, model,
+                          "KNN regressor", types,
+                          options={id(model): {'n_lists': 10,
+                                               'block_size': 100}})
+        model = KNeighborsRegressor(n_neighbors=3).fit(X[:4], y[:4])
+        self.assertRaises(ValueError, convert_sklearn, model,
+                          "KNN regressor", types,
+                          options={id(model): {'n_lists': 4}})
+
+    @unittest.skipIf(
+        StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
+        reason="not available")
+    def test_model_knn_classifier_block_size_ties(self):
+        # Duplicated neighbours must be chosen in the same order
+        # with or without blocks.
+        X = numpy.array([[0, 0], [1, 1], [0, 0], [1, 1], [2, 2],
+                         [0, 0], [3, 3], [1, 1], [0, 0], [2, 2]],
+                        dtype=numpy.float32)
+        y = numpy.array([0, 1, 1, 0, 1, 0, 1, 1, 1, 0])
+        model = KNeighborsClassifier(n_neighbors=3).fit(X, y)
+        types = [("input", FloatTensorType([None, 2]))]
+        exp = InferenceSession(convert_sklearn(
+            model, "KNN classifier", types).SerializeToString()).run(
+                None, {'input': X})
+        for block_size in [2, 3, 4]:
+            model_onnx = convert_sklearn(
+                model, "KNN classifier", types,
+                options={id(model): {'block_size': block_size}})
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})
+            assert_almost_equal(exp[0], got[0])
+            self.assertEqual(exp[1], got[1])
+
     @unittest.skipIf(
         StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
         reason="not available")
@@ -198,6 +310,36 @@ class TestNearestNeighbourConverter(unittest.TestCase):
             X.astype(numpy.float32)[:7], model, model_onnx,
             basename="SklearnKNeighborsClassifierWeightsDistance")
 
+    @unittest.skipIf(
+        StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
+        reason="not available")
+    def test_model_knn_classifier_many_classes(self):
+        rs = numpy.random.RandomState(0)
+        X = rs.randn(600, 4).astype(numpy.float32)
+        types = [('input', FloatTensorType([None, 4]))]
+        for weights in ['uniform', 'distance']:
+            sizes = []
+            for nb_classes, max_classes in [(3, 256), (150, 256),
+                                            (150, 10)]:
+                y = numpy.arange(600) % nb_classes
+                model = KNeighborsClassifier(weights=weights).fit(X, y)
+                default = nn.MAX_CLASSES_IDENTITY
+                nn.MAX_CLASSES_IDENTITY = max_classes
+                try:
+                    model_onnx = convert_sklearn(
+                        model, 'KNN classifier', types,
+                        options={id(model): {'zipmap': False}})
+                finally:
+                    nn.MAX_CLASSES_IDENTITY = default
+                sizes.append(len(model_onnx.graph.node))
+                got = InferenceSession(model_onnx.SerializeToString()).run(
+                    None, {'input': X[:100]})
+                assert_almost_equal(model.predict_proba(X[:100]), got[1],
+                                    decimal=5)
+                self.assertEqual(model.predict(X[:100]).tolist(),
+                                 got[0].tolist())
+            self.assertEqual(sizes[0], sizes[1])
+
     @unittest.skipIf(
         StrictVersion(onnxruntime.__version__) < StrictVersion("0.5.0"),
         reason="not available")
@@ -1,6 +1,9 @@
 import unittest
+from numpy.testing import assert_almost_equal
+from onnxruntime import InferenceSession
 from sklearn.linear_model import LogisticRegression, LinearRegression
 from sklearn.multiclass import OneVsRestClassifier
+from sklearn.tree import DecisionTreeClassifier
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import (
     FloatTensorType,
@@ -130,6 +133,60 @@ class TestOneVsRestClassifierConverter(unittest.TestCase):
             "<= StrictVersion('0.2.1')",
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_linear_single_gemm(self):
+        for estimator in [LogisticRegression(solver='liblinear'),
+                          LogisticRegression(solver='lbfgs',
+                                             multi_class='multinomial')]:
+            model, X = fit_classification_model(
+                OneVsRestClassifier(estimator), 5)
+            model_onnx = convert_sklearn(
+                model, "ovr classification",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                options={id(model): {'zipmap': False}})
+            op_types = [n.op_type for n in model_onnx.graph.node]
+            self.assertEqual(op_types.count('Gemm'), 1)
+            self.assertNotIn('LinearClassifier', op_types)
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})
+            assert_almost_equal(model.predict_proba(X), got[1], decimal=5)
+            self.assertEqual(model.predict(X).tolist(), got[0].tolist())
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_linear_single_gemm_string(self):
+        # No other node requires an opset above the one of Gemm.
+        model, X = fit_classification_model(
+            OneVsRestClassifier(LogisticRegression(solver='liblinear')), 3,
+            label_string=True)
+        model_onnx = convert_sklearn(
+            model, "ovr classification",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'zipmap': False}})
+        got = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'input': X})
+        self.assertEqual(model.predict(X).tolist(), got[0].tolist())
+        assert_almost_equal(model.predict_proba(X), got[1], decimal=5)
+
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_ovr_heterogeneous(self):
+        model, X = fit_classification_model(
+            OneVsRestClassifier(LogisticRegression()), 3)
+        model.estimators_[1] = DecisionTreeClassifier(max_depth=3).fit(
+            X, model.predict(X) == model.classes_[1])
+        model_onnx = convert_sklearn(
+            model, "ovr classification",
+            [("input", FloatTensorType([None, X.shape[1]]))],
+            options={id(model): {'zipmap': False}})
+        op_types = [n.op_type for n in model_onnx.graph.node]
+        self.assertNotIn('Gemm', op_types)
+        self.assertEqual(op_types.count('LinearClassifier'), 2)
+        got = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'input': X})
+        assert_almost_equal(model.predict_proba(X), got[1], decimal=5)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -14,6 +14,11 @@ from sklearn.ensemble import (
 )
 from skl2onnx.common.data_types import onnx_built_with_ml, FloatTensorType
 from skl2onnx import convert_sklearn
+from skl2onnx.common.tree_ensemble import (
+    add_node, add_trees_to_attribute_pairs,
+    get_default_tree_classifier_attribute_pairs,
+    sklearn_threshold, sklearn_thresholds
+)
 from test_utils import (
     dump_one_class_classification,
     dump_binary_classification,
@@ -187,6 +192,45 @@ class TestSklearnTreeEnsembleModels(unittest.TestCase):
                           "StrictVersion(onnxruntime.__version__)"
                           " <= StrictVersion('0.2.1')")
 
+    def test_sklearn_thresholds(self):
+        rnd = numpy.random.RandomState(0)
+        values = numpy.hstack([rnd.randn(200) * 10 ** e
+                               for e in range(-5, 6)] + [[0.]])
+        for dtype in [numpy.float32, numpy.float64]:
+            exp = [sklearn_threshold(v, dtype, 'BRANCH_LEQ')
+                   for v in values]
+            got = sklearn_thresholds(values, dtype)
+            self.assertEqual(exp, got.tolist())
+
+    def test_add_trees_to_attribute_pairs(self):
+        data = load_iris()
+        model = RandomForestClassifier(n_estimators=5, random_state=0)
+        model.fit(data.data, data.target)
+        for dtype in [numpy.float32, numpy.float64]:
+            exp = get_default_tree_classifier_attribute_pairs()
+            for tree_id, est in enumerate(model.estimators_):
+                tree = est.tree_
+                for i in range(tree.node_count):
+                    if (tree.children_left[i] > i or
+                            tree.children_right[i] > i):
+                        add_node(exp, True, tree_id, 0.2, i,
+                                 tree.feature[i], 'BRANCH_LEQ',
+                                 tree.threshold[i], tree.children_left[i],
+                                 tree.children_right[i], tree.value[i], 0,
+                                 True, True, dtype)
+                    else:
+                        add_node(exp, True, tree_id, 0.2, i, 0, 'LEAF', 0.,
+                                 0, 0, tree.value[i], 0, True, True, dtype)
+            got = get_default_tree_classifier_attribute_pairs()
+            add_trees_to_attribute_pairs(
+                got, True, [est.tree_ for est in model.estimators_],
+                list(range(5)), 0.2, 0, True, True, dtype=dtype)
+            for k, v in exp.items():
+                if isinstance(v, list):
+                    self.assertEqual(len(v), len(got[k]))
+                    self.assertEqual([float(x) if k != 'nodes_modes' else x
+                                      for x in v], got[k])
+
 
 if __name__ == "__main__":
     unittest.main()
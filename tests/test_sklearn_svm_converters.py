@@ -4,6 +4,7 @@ Tests scikit-linear converter.
 import unittest
 from distutils.version import StrictVersion
 import numpy
+from numpy.testing import assert_almost_equal
 from sklearn.datasets import load_iris
 from sklearn.svm import SVC, SVR, NuSVC, NuSVR, OneClassSVM
 from sklearn import __version__ as sk__version__
@@ -15,7 +16,7 @@ from skl2onnx.shape_calculators.support_vector_machines import (
     calculate_sklearn_svm_output_shapes
 )
 import onnx
-from onnxruntime import __version__ as ort_version
+from onnxruntime import InferenceSession, __version__ as ort_version
 from test_utils import dump_data_and_model, fit_regression_model
 
 
@@ -112,19 +113,10 @@ class TestSklearnSVM(unittest.TestCase):
             model, "SVC", [("input", FloatTensorType([None, X.shape[1]]))])
         nodes = model_onnx.graph.node
         self.assertIsNotNone(nodes)
-        svc_node = nodes[0]
-        self._check_attributes(
-            svc_node,
-            {
-                "coefficients": None,
-                "kernel_params": None,
-                "kernel_type": "LINEAR",
-                "post_transform": None,
-                "rho": None,
-                "support_vectors": None,
-                "vectors_per_class": None,
-            },
-        )
+        # The support vectors are replaced by the primal coefficients.
+        op_types = [node.op_type for node in nodes]
+        self.assertIn('Gemm', op_types)
+        self.assertNotIn('SVMClassifier', op_types)
         dump_data_and_model(
             X,
             model,
@@ -171,19 +163,10 @@ class TestSklearnSVM(unittest.TestCase):
             model, "SVC", [("input", FloatTensorType([None, X.shape[1]]))])
         nodes = model_onnx.graph.node
         self.assertIsNotNone(nodes)
-        svc_node = nodes[0]
-        self._check_attributes(
-            svc_node,
-            {
-                "coefficients": None,
-                "kernel_params": None,
-                "kernel_type": "LINEAR",
-                "post_transform": None,
-                "rho": None,
-                "support_vectors": None,
-                "vectors_per_class": None,
-            },
-        )
+        # The support vectors are replaced by the primal coefficients.
+        op_types = [node.op_type for node in nodes]
+        self.assertIn('Gemm', op_types)
+        self.assertNotIn('SVMClassifier', op_types)
         dump_data_and_model(
             X,
             model,
@@ -200,19 +183,10 @@ class TestSklearnSVM(unittest.TestCase):
             model, "SVC", [("input", FloatTensorType([None, X.shape[1]]))])
         nodes = model_onnx.graph.node
         self.assertIsNotNone(nodes)
-        svc_node = nodes[0]
-        self._check_attributes(
-            svc_node,
-            {
-                "coefficients": None,
-                "kernel_params": None,
-                "kernel_type": "LINEAR",
-                "post_transform": None,
-                "rho": None,
-                "support_vectors": None,
-                "vectors_per_class": None,
-            },
-        )
+        # The support vectors are replaced by the primal coefficients.
+        op_types = [node.op_type for node in nodes]
+        self.assertIn('Gemm', op_types)
+        self.assertNotIn('SVMClassifier', op_types)
         dump_data_and_model(
             X,
             model,
@@ -228,17 +202,10 @@ class TestSklearnSVM(unittest.TestCase):
             model, "SVR", [("input", FloatTensorType([None, X.shape[1]]))])
         nodes = model_onnx.graph.node
         self.assertIsNotNone(nodes)
-        self._check_attributes(
-            nodes[0],
-            {
-                "coefficients": None,
-                "kernel_params": None,
-                "kernel_type": "LINEAR",
-                "post_transform": None,
-                "rho": None,
-                "support_vectors": None,
-            },
-        )
+        # The support vectors are replaced by the primal coefficients.
+        op_types = [node.op_type for node in nodes]
+        self.assertIn('Gemm', op_types)
+        self.assertNotIn('SVMRegressor', op_types)
         dump_data_and_model(X,
                             model,
                             model_onnx,
@@ -491,6 +458,55 @@ class TestSklearnSVM(unittest.TestCase):
                           " < StrictVersion('0.5.0')"
         )
 
+    def test_convert_svm_linear_primal(self):
+        iris = load_iris()
+        X = iris.data[:, :3]
+        X32 = X[::5].astype(numpy.float32)
+        types = [("input", FloatTensorType([None, 3]))]
+        for nbclass in [2, 3, 4]:
+            y = iris.target.copy()
+            if nbclass == 2:
+                y[y == 2] = 1
+            elif nbclass == 4:
+                y[-10:] = 3
+            for cl in [SVC(kernel='linear'), NuSVC(kernel='linear', nu=0.1)]:
+                for labels in [y, numpy.array(['cl%d' % i for i in y])]:
+                    model = cl.fit(X, labels)
+                    model_onnx = convert_sklearn(
+                        model, "SVC", types,
+                        options={id(model): {'zipmap': False}})
+                    got = InferenceSession(
+                        model_onnx.SerializeToString()).run(
+                            None, {'input': X32})
+                    raw = model._decision_function(
+                        X32.astype(numpy.float64)).reshape((X32.shape[0],
+                                                            -1))
+                    if nbclass == 2:
+                        raw = numpy.hstack([raw, -raw])
+                    self.assertEqual(model.predict(X32).tolist(),
+                                     got[0].tolist())
+                    assert_almost_equal(raw, got[1], decimal=4)
+
+        y = iris.target.astype(numpy.float64)
+        for model in [SVR(kernel='linear'), NuSVR(kernel='linear')]:
+            model.fit(X, y)
+            for typ, Xt in [(FloatTensorType, X32),
+                            (Int64TensorType, X32.astype(numpy.int64))]:
+                model_onnx = convert_sklearn(
+                    model, "SVR", [("input", typ([None, 3]))])
+                got = InferenceSession(model_onnx.SerializeToString()).run(
+                    None, {'input': Xt})
+                assert_almost_equal(model.predict(Xt).reshape((-1, 1)),
+                                    got[0], decimal=4)
+
+        model = OneClassSVM(kernel='linear').fit(X)
+        model_onnx = convert_sklearn(model, "OCSVM", types)
+        got = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'input': X32})
+        self.assertEqual(model.predict(X32).tolist(), got[0].ravel().tolist())
+        assert_almost_equal(model.decision_function(X32).reshape((-1, 1)),
+                            got[1], decimal=3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,14 @@
 import unittest
 from distutils.version import StrictVersion
 import numpy
+from numpy.testing import assert_almost_equal
 import onnx
+from onnxruntime import InferenceSession
 from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.linear_model import LogisticRegression
+from sklearn.naive_bayes import GaussianNB
 from sklearn.tree import DecisionTreeClassifier
-from sklearn.ensemble import VotingClassifier
+from sklearn.ensemble import RandomForestClassifier, VotingClassifier
 from skl2onnx import convert_sklearn
 from skl2onnx.common.data_types import FloatTensorType
 from skl2onnx.proto import onnx_proto
@@ -15,6 +18,7 @@ from test_utils import (
     dump_multiple_classification,
     dump_binary_classification,
     dump_data_and_model,
+    fit_classification_model,
 )
 
 
@@ -298,6 +302,38 @@ class TestVotingClassifierConverter(unittest.TestCase):
                           " <= StrictVersion('0.2.1')",
         )
 
+    @unittest.skipIf(not onnx_built_with_ml(),
+                     reason="Requires ONNX-ML extension.")
+    def test_voting_soft_fused(self):
+        for n_classes in [2, 3]:
+            model, X = fit_classification_model(VotingClassifier(
+                voting="soft",
+                flatten_transform=False,
+                weights=numpy.array([1., 2., 3., 4., 5., 6.]),
+                estimators=[
+                    ("lr", LogisticRegression(solver="liblinear")),
+                    ("lr2", LogisticRegression(solver="liblinear", C=0.1)),
+                    ("lrm", LogisticRegression(solver="lbfgs",
+                                               multi_class="multinomial")),
+                    ("rf", RandomForestClassifier(n_estimators=5,
+                                                  max_depth=4)),
+                    ("dt", DecisionTreeClassifier(max_depth=3)),
+                    ("nb", GaussianNB()),
+                ]), n_classes)
+            model_onnx = convert_sklearn(
+                model, "voting",
+                [("input", FloatTensorType([None, X.shape[1]]))],
+                options={id(model): {'zipmap': False}})
+            op_types = [n.op_type for n in model_onnx.graph.node]
+            self.assertEqual(op_types.count('TreeEnsembleClassifier'), 1)
+            self.assertEqual(op_types.count('Gemm'), 1)
+            # The multinomial regression is converted alone.
+            self.assertEqual(op_types.count('LinearClassifier'), 1)
+            got = InferenceSession(model_onnx.SerializeToString()).run(
+                None, {'input': X})
+            assert_almost_equal(model.predict_proba(X), got[1], decimal=5)
+            self.assertEqual(model.predict(X).tolist(), got[0].tolist())
+
 
 if __name__ == "__main__":
     unittest.main()
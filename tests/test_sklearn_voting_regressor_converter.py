@@ -2,7 +2,11 @@
 
 import unittest
 import numpy
-from sklearn.linear_model import LinearRegression
+from numpy.testing import assert_almost_equal
+from onnxruntime import InferenceSession
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.neighbors import KNeighborsRegressor
 try:
     from sklearn.ensemble import VotingRegressor
 except ImportError:
@@ -63,6 +67,26 @@ class TestVotingRegressorConverter(unittest.TestCase):
             comparable_outputs=[0]
         )
 
+    @unittest.skipIf(VotingRegressor is None,
+                     reason="new in 0.21")
+    def test_model_voting_regression_fused(self):
+        model, X = fit_regression_model(VotingRegressor([
+            ('lr', LinearRegression()),
+            ('ridge', Ridge()),
+            ('dt', DecisionTreeRegressor(max_depth=4)),
+            ('rf', RandomForestRegressor(n_estimators=5, max_depth=4)),
+            ('knn', KNeighborsRegressor()),
+        ], weights=[1., 2., 3., 4., 5.]))
+        model_onnx = convert_sklearn(
+            model, "voting regression",
+            [("input", FloatTensorType([None, X.shape[1]]))])
+        op_types = [n.op_type for n in model_onnx.graph.node]
+        self.assertEqual(op_types.count('TreeEnsembleRegressor'), 1)
+        self.assertEqual(op_types.count('LinearRegressor'), 1)
+        got = InferenceSession(model_onnx.SerializeToString()).run(
+            None, {'input': X.astype(numpy.float32)})
+        assert_almost_equal(model.predict(X), got[0].ravel(), decimal=3)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,8 +2,17 @@
 Tests scikit-learn's binarizer converter.
 """
 
+import os
+import subprocess
+import sys
 import unittest
 from skl2onnx import supported_converters
+from skl2onnx._supported_operators import _sklearn_operator_names
+from skl2onnx.common._registration import (
+    _converter_modules, _converter_pool,
+    _shape_calculator_modules, _shape_calculator_pool,
+    load_all_converters
+)
 
 
 class TestSupportedConverters(unittest.TestCase):
@@ -17,6 +26,40 @@ class TestSupportedConverters(unittest.TestCase):
         assert "BernoulliNB" in names
         assert len(names) > 35
 
+    def test_manifest(self):
+        names = supported_converters(False)
+        load_all_converters()
+        self.assertEqual(set(_converter_modules),
+                         set(_shape_calculator_modules))
+        for name, module in _converter_modules.items():
+            self.assertIn(name, names)
+            self.assertEqual(
+                _converter_pool[name].__module__,
+                'skl2onnx.operator_converters.' + module)
+            self.assertIn(name, _shape_calculator_pool)
+        aliases = set(_sklearn_operator_names.values())
+        self.assertEqual(aliases - set(_converter_modules), set())
+
+    def test_lazy_loading(self):
+        # A new process is needed, other tests already loaded
+        # every converter.
+        script = "\n".join([
+            "import sys",
+            "import skl2onnx",
+            "from sklearn.linear_model import LogisticRegression",
+            "from skl2onnx.common.data_types import FloatTensorType",
+            "model = LogisticRegression().fit([[0, 1], [1, 0]], [0, 1])",
+            "skl2onnx.convert_sklearn(",
+            "    model, initial_types=[('X', FloatTensorType([None, 2]))])",
+            "print(sorted(m.split('.')[-1] for m in sys.modules",
+            "             if m.startswith('skl2onnx.operator_converters.')))",
+        ])
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.check_output([sys.executable, "-c", script],
+                                      cwd=root)
+        self.assertEqual(out.decode().strip(),
+                         str(['linear_classifier', 'zip_map']))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -9,6 +9,7 @@ from sklearn import datasets
 from skl2onnx.common.data_types import FloatTensorType
 from skl2onnx import convert_sklearn, update_registered_converter
 from skl2onnx.algebra.onnx_ops import OnnxIdentity
+from skl2onnx.common._topology import Topology
 
 
 class IdentityTransformer(BaseEstimator, TransformerMixin):
@@ -70,6 +71,43 @@ class TestTopologyPrune(unittest.TestCase):
                   if node.op_type == "Identity"]
         assert len(idnode) == 2
 
+    def test_topological_order(self):
+        topology = Topology(None)
+        scope = topology.declare_scope('order')
+        n = 50
+        variables = [scope.declare_local_variable('v%d' % i,
+                                                  FloatTensorType())
+                     for i in range(n + 1)]
+        # The chain is declared backward.
+        for i in range(n, 0, -1):
+            op = scope.declare_local_operator('op%d' % i)
+            op.inputs.append(variables[i - 1])
+            op.outputs.append(variables[i])
+        label = scope.declare_local_operator('tensorToLabel')
+        label.inputs.append(variables[0])
+        label.outputs.append(scope.declare_local_variable('label'))
+        other = scope.declare_local_operator('other')
+        other.inputs.append(variables[0])
+        other.outputs.append(scope.declare_local_variable('other'))
+
+        names = []
+        for op in topology.topological_operator_iterator():
+            names.append(op.type)
+            if op.type == 'op%d' % n:
+                # converters may declare operators while iterating
+                new_op = scope.declare_local_operator('new')
+                new_op.inputs.append(variables[n])
+                new_op.outputs.append(scope.declare_local_variable('new'))
+        self.assertEqual(names[:3], ['op1', 'other', 'tensorToLabel'])
+        self.assertEqual(names[3:], ['op%d' % i for i in range(2, n + 1)] +
+                         ['new'])
+
+        # The second iteration replays the first order.
+        names2 = [op.type for op in topology.topological_operator_iterator()]
+        self.assertEqual(names, names2)
+        self.assertTrue(all(op.is_evaluated for op in
+                            topology.unordered_operator_iterator()))
+
 
 if __name__ == "__main__":
     unittest.main()